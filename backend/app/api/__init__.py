@@ -1,2 +1,3 @@
 from .user import router as user_router
-from .property import router as property_router
\ No newline at end of file
+from .property import router as property_router
+from .market import router as market_router
\ No newline at end of file
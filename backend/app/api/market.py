@@ -0,0 +1,35 @@
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app.core import get_db
+from app.crud.market import get_market_stats
+from app.crud.sales import get_recent_sales_in_zip
+from app.schemas.market import MarketStatsResponse, RecentSale
+
+router = APIRouter(prefix="/market", tags=["Market"])
+
+@router.get("/zip/{zip_code}", response_model=MarketStatsResponse)
+def get_zip_market_stats(zip_code: str, db: Session = Depends(get_db)):
+    stats = get_market_stats(db, "zip", zip_code)
+    if not stats:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No market data for this ZIP code")
+    return stats
+
+@router.get("/zip/{zip_code}/sales", response_model=List[RecentSale])
+def get_zip_recent_sales(
+        zip_code: str,
+        since: Optional[date] = Query(None, description="Only sales on or after this date (YYYY-MM-DD)"),
+        limit: int = Query(50, ge=1, le=200),
+        db: Session = Depends(get_db)
+):
+    """Most recent recorded sales in a ZIP code, newest first (every sale, not just each property's last)."""
+    return get_recent_sales_in_zip(db, zip_code, since=since, limit=limit)
+
+@router.get("/county/{county_key}", response_model=MarketStatsResponse)
+def get_county_market_stats(county_key: str, db: Session = Depends(get_db)):
+    """`county_key` is the state FIPS code followed by the county FIPS code (e.g. 48453)."""
+    stats = get_market_stats(db, "county", county_key)
+    if not stats:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No market data for this county")
+    return stats
@@ -1,27 +1,79 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import secrets
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.core import get_db
+from app.core import get_db, get_async_db
+from app.core.database import SessionLocal, engine
+from app.core.http_cache import etag_for, last_modified_for, is_not_modified, set_cache_headers, \
+    not_modified_response
+from app.models.property import Property
 from app.schemas.property import PropertyBase, PropertyCreate, PropertyUpdate, PropertyAnalysisRequest, \
-    PropertyAnalysisResponse
+    PropertyAnalysisResponse, PropertySummary, PropertyFacets, PropertyMetrics, RankedProperty, NearbyProperty, \
+    PropertyClusters, AddressSuggestion, PropertySaleEvent, PropertySalesHistory, dump_property_fields
 from app.crud.property import (
-    get_all_properties,
+    SCALAR_FIELDS,
+    SUMMARY_FIELDS,
+    SEARCH_FIELDS,
+    PROPERTY_FIELDS,
+    RANKING_METRICS,
+    parse_property_fields,
+    iter_property_chunks,
+    get_property_facets,
+    get_top_properties,
+    get_properties_nearby,
+    get_properties_within,
+    get_all_properties_async,
+    get_property_versions_async,
     get_property_by_id,
+    get_properties_by_ids,
+    get_property_detail_async,
+    search_properties_cached_async,
+    find_properties_by_address_async,
+    get_cache_stats,
     create_property,
     update_property,
     delete_property,
     find_properties_by_address,
     find_property_by_components
 )
-from app.utils.property_analysis import PropertyAnalyzer
-from app.utils.ai_investment_analysis import ai_investment_analysis
-from app.schemas.investment import AddressAnalysisRequest, InvestmentAnalysisResponse
+from app.crud.autocomplete import address_index, address_label
+from app.crud.geo_cluster import get_clusters
+from app.crud.market import get_market_stats, get_recent_sales, county_key_for
+from app.crud.refresh import get_refreshed_estimates
+from app.crud.sales import get_property_sales, property_appreciation
+from app.schemas.analysis_report import MarketAnalysis
+from app.utils.geo import parse_bbox
+from app.utils.property_analysis import PropertyAnalyzer, analysis_flight, analysis_flight_key
+from app.services.refresh_scheduler import refresh_scheduler
+from app.utils.ai_investment_analysis import ai_investment_analysis, ai_investment_analysis_batch
+from app.schemas.investment import AddressAnalysisRequest, InvestmentAnalysisResponse, SensitivityRequest, \
+    SensitivityResponse, SimulationRequest, SimulationResponse, SimulationResult, \
+    PortfolioSimulationRequest, PortfolioSimulationResponse, PortfolioAnalysisRequest, PortfolioAnalysisItem, \
+    PortfolioAnalysisResponse
 from app.utils.investment_metrics import analyze_investment, generate_investment_report
+from app.utils.property_export import EXPORT_FORMATS, iter_ndjson, iter_csv, iter_parquet
+from app.utils.sensitivity import compute_sensitivity_grid
+from app.utils.monte_carlo import simulation_inputs, run_simulation, run_portfolio_simulation
 
 router = APIRouter(prefix="/properties", tags=["Properties"])
 
-@router.get("/", response_model=List[PropertyBase])
-def get_properties(
+def resolve_fields(fields: Optional[str]) -> Optional[List[str]]:
+    try:
+        return parse_property_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+def projected_response(properties, fields: List[str]) -> JSONResponse:
+    # Sparse fieldsets bypass response_model so only the selected columns are sent
+    return JSONResponse(content=jsonable_encoder([dump_property_fields(p, fields) for p in properties]))
+
+@router.get("/", response_model=List[PropertySummary])
+async def get_properties(
+        request: Request,
+        response: Response,
         skip: int = 0,
         limit: int = 25,
         city: Optional[str] = None,
@@ -30,25 +82,359 @@ def get_properties(
         min_price: Optional[float] = None,
         max_price: Optional[float] = None,
         bedrooms: Optional[int] = None,
-        db: Session = Depends(get_db)
+        max_carrying_cost: Optional[float] = None,
+        fields: Optional[str] = None,
+        db: AsyncSession = Depends(get_async_db)
 ):
-    properties = get_all_properties(
-        db=db, skip=skip, limit=limit, city=city, state=state,
-        property_type=property_type, min_price=min_price,
-        max_price=max_price, bedrooms=bedrooms
+    field_list = resolve_fields(fields)
+    filters = dict(
+        city=city, state=state, property_type=property_type,
+        min_price=min_price, max_price=max_price, bedrooms=bedrooms,
+        max_carrying_cost=max_carrying_cost
     )
-    return [PropertyBase.model_validate(p) for p in properties]
 
-@router.get("/search", response_model=List[PropertyBase])
-def search_properties_by_address(
+    # Cheap (id, updated_at) probe first; a matching ETag skips the row fetch entirely
+    versions = await get_property_versions_async(db, skip=skip, limit=limit, **filters)
+    etag = etag_for(versions, variant=request.url.query)
+    last_modified = last_modified_for(versions)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+
+    properties = await get_all_properties_async(db, skip=skip, limit=limit, fields=field_list, **filters)
+    if field_list:
+        projected = projected_response(properties, field_list)
+        set_cache_headers(projected, etag, last_modified)
+        return projected
+    set_cache_headers(response, etag, last_modified)
+    # response_model validates the ORM rows once; no manual model_validate pass
+    return properties
+
+@router.get("/search", response_model=List[PropertySummary])
+async def search_properties_by_address(
         address: str,
         limit: int = 10,
-        db: Session = Depends(get_db)
+        fields: Optional[str] = None,
+        db: AsyncSession = Depends(get_async_db)
 ):
     if not address.strip():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Address parameter required")
-    results = find_properties_by_address(db, address, limit)
-    return [PropertyBase.model_validate(p) for p in results]
+    field_list = resolve_fields(fields)
+    cached = await search_properties_cached_async(db, address, limit, fields=field_list)
+    return Response(content=cached["body"], media_type="application/json")
+
+@router.get("/autocomplete", response_model=List[AddressSuggestion])
+async def autocomplete_addresses(
+        q: str,
+        limit: int = Query(10, ge=1, le=20),
+        db: AsyncSession = Depends(get_async_db)
+):
+    """Typeahead suggestions: addresses with a token starting with each typed term, most saved first.
+
+    Served from the mapped address index snapshot (scripts/build_address_index.py); until
+    one has been loaded, falls back to the database address search.
+    """
+    if not q.strip():
+        return []
+    if address_index.ready:
+        return address_index.suggest(q, limit)
+    properties = await find_properties_by_address_async(db, q, limit, fields=["id", *SEARCH_FIELDS])
+    suggestions = []
+    for p in properties:
+        label = address_label({name: getattr(p, name) for name in SEARCH_FIELDS})
+        if label:
+            suggestions.append({"id": p.id, "address": label})
+    return suggestions
+
+@router.get("/cache/stats")
+def get_property_cache_stats():
+    return [*get_cache_stats(), analysis_flight.stats(), address_index.stats()]
+
+@router.get("/facets", response_model=PropertyFacets)
+def get_facets(
+        city: Optional[str] = None,
+        state: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        bedrooms: Optional[int] = None,
+        max_carrying_cost: Optional[float] = None,
+        price_bucket: float = Query(50000, gt=0),
+        sqft_bucket: float = Query(250, gt=0),
+        db: Session = Depends(get_db)
+):
+    return get_property_facets(
+        db=db, city=city, state=state, property_type=property_type,
+        min_price=min_price, max_price=max_price, bedrooms=bedrooms,
+        max_carrying_cost=max_carrying_cost, price_bucket=price_bucket, sqft_bucket=sqft_bucket
+    )
+
+@router.get("/top", response_model=List[RankedProperty])
+def get_top_ranked_properties(
+        metric: str = "cap_rate",
+        limit: int = Query(50, ge=1, le=200),
+        city: Optional[str] = None,
+        state: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        bedrooms: Optional[int] = None,
+        max_carrying_cost: Optional[float] = None,
+        fields: Optional[str] = None,
+        property_management_rate: Optional[float] = Query(None, ge=0, le=1),
+        maintenance_repairs_rate: Optional[float] = Query(None, ge=0, le=1),
+        vacancy_allowance_rate: Optional[float] = Query(None, ge=0, le=1),
+        insurance_rate: Optional[float] = Query(None, ge=0, le=1),
+        property_tax_rate: Optional[float] = Query(None, ge=0, le=1),
+        utilities_rate: Optional[float] = Query(None, ge=0, le=1),
+        db: Session = Depends(get_db)
+):
+    """Deal screener: best properties by cap_rate, noi or rent_to_value under the browse filters.
+
+    Any *_rate parameter switches from the stored default-assumption metrics to a
+    re-scored scan under those rates.
+    """
+    if metric not in RANKING_METRICS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"metric must be one of: {', '.join(RANKING_METRICS)}"
+        )
+    field_list = resolve_fields(fields) or list(SUMMARY_FIELDS)
+    overrides = {
+        key: value for key, value in dict(
+            property_management_rate=property_management_rate,
+            maintenance_repairs_rate=maintenance_repairs_rate,
+            vacancy_allowance_rate=vacancy_allowance_rate,
+            insurance_rate=insurance_rate,
+            property_tax_rate=property_tax_rate,
+            utilities_rate=utilities_rate,
+        ).items() if value is not None
+    }
+
+    ranked = get_top_properties(
+        db=db, metric=metric, limit=limit, overrides=overrides or None, fields=field_list,
+        city=city, state=state, property_type=property_type,
+        min_price=min_price, max_price=max_price, bedrooms=bedrooms,
+        max_carrying_cost=max_carrying_cost
+    )
+    return JSONResponse(content=jsonable_encoder([
+        {
+            "rank": rank,
+            "metrics": PropertyMetrics(**metrics).model_dump(by_alias=True),
+            "property": dump_property_fields(property_obj, field_list),
+        }
+        for rank, (property_obj, metrics) in enumerate(ranked, start=1)
+    ]))
+
+@router.get("/nearby", response_model=List[NearbyProperty])
+def get_nearby_properties(
+        lat: float = Query(..., ge=-90, le=90),
+        lng: float = Query(..., ge=-180, le=180),
+        radius_miles: float = Query(1.0, gt=0, le=100),
+        limit: int = Query(50, ge=1, le=500),
+        city: Optional[str] = None,
+        state: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        bedrooms: Optional[int] = None,
+        max_carrying_cost: Optional[float] = None,
+        fields: Optional[str] = None,
+        db: Session = Depends(get_db)
+):
+    """Closest properties to (lat, lng) within radius_miles, nearest first."""
+    field_list = resolve_fields(fields) or list(SUMMARY_FIELDS)
+    nearby = get_properties_nearby(
+        db=db, latitude=lat, longitude=lng, radius_miles=radius_miles, limit=limit, fields=field_list,
+        city=city, state=state, property_type=property_type,
+        min_price=min_price, max_price=max_price, bedrooms=bedrooms,
+        max_carrying_cost=max_carrying_cost
+    )
+    return JSONResponse(content=jsonable_encoder([
+        {"distanceMiles": round(distance, 3), "property": dump_property_fields(property_obj, field_list)}
+        for property_obj, distance in nearby
+    ]))
+
+@router.get("/within", response_model=List[PropertySummary])
+def get_properties_in_bbox(
+        bbox: str = Query(..., description="west,south,east,north in decimal degrees"),
+        limit: int = Query(500, ge=1, le=5000),
+        city: Optional[str] = None,
+        state: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        bedrooms: Optional[int] = None,
+        max_carrying_cost: Optional[float] = None,
+        fields: Optional[str] = None,
+        db: Session = Depends(get_db)
+):
+    """Properties inside a map viewport (bbox), up to `limit`, by id."""
+    try:
+        box = parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    field_list = resolve_fields(fields) or list(SUMMARY_FIELDS)
+    properties = get_properties_within(
+        db=db, bbox=box, limit=limit, fields=field_list,
+        city=city, state=state, property_type=property_type,
+        min_price=min_price, max_price=max_price, bedrooms=bedrooms,
+        max_carrying_cost=max_carrying_cost
+    )
+    return projected_response(properties, field_list)
+
+@router.get("/clusters", response_model=PropertyClusters)
+def get_property_clusters(
+        bbox: str = Query(..., description="west,south,east,north in decimal degrees"),
+        zoom: int = Query(..., ge=0, le=22),
+        db: Session = Depends(get_db)
+):
+    """Map clusters for a viewport: property count, centroid and median sale price per geohash cell.
+
+    Served from precomputed aggregates, so browse filters do not apply; zoom in and use
+    /within for individual (filterable) properties.
+    """
+    try:
+        box = parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return get_clusters(db, box, zoom)
+
+@router.get("/export")
+def export_properties(
+        export_format: str = Query("ndjson", alias="format"),
+        city: Optional[str] = None,
+        state: Optional[str] = None,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        bedrooms: Optional[int] = None,
+        max_carrying_cost: Optional[float] = None,
+        fields: Optional[str] = None,
+        chunk_size: int = Query(5000, ge=100, le=50000)
+):
+    export_format = export_format.lower()
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format. Use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    if export_format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Parquet export requires pyarrow")
+
+    field_list = resolve_fields(fields) or list(SCALAR_FIELDS)
+
+    def chunks():
+        # The stream outlives the request dependencies, so it owns its own session
+        db = SessionLocal()
+        try:
+            yield from iter_property_chunks(
+                db, field_list, chunk_size=chunk_size, city=city, state=state,
+                property_type=property_type, min_price=min_price,
+                max_price=max_price, bedrooms=bedrooms,
+                max_carrying_cost=max_carrying_cost
+            )
+        finally:
+            db.close()
+
+    if export_format == "csv":
+        body = iter_csv(chunks(), field_list)
+    elif export_format == "parquet":
+        sql_types = [Property.__table__.columns[name].type for name in field_list]
+        body = iter_parquet(chunks(), field_list, sql_types)
+    else:
+        body = iter_ndjson(chunks(), field_list)
+
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="properties.{export_format}"'}
+    )
+
+def _ai_unavailable(error: str) -> dict:
+    return {
+        "investment_analysis": {
+            "summary": "AI analysis unavailable.",
+            "recommendation": {
+                "decision": "N/A",
+                "justification": "Gemini call failed or API key missing."
+            },
+            "potential_risks": ["External AI service failure"],
+            "recommendations": ["Verify GOOGLE_GENAI_KEY", "Retry later", "Check network logs"],
+            "error": error
+        }
+    }
+
+def _simulation_settings(payload) -> dict:
+    distributions = None
+    if payload.distributions:
+        distributions = {name: spec.model_dump() for name, spec in payload.distributions.items()}
+    return {
+        "distributions": distributions,
+        "draws": payload.draws,
+        "seed": payload.seed if payload.seed is not None else secrets.randbits(32),
+        "cap_rate_threshold": payload.cap_rate_threshold,
+    }
+
+@router.post("/simulation", response_model=PortfolioSimulationResponse)
+def simulate_portfolio(payload: PortfolioSimulationRequest, db: Session = Depends(get_db)):
+    """Monte Carlo cap rate distributions for several properties, run on the shared simulation pool."""
+    properties = {p.id: p for p in get_properties_by_ids(db, payload.property_ids, PROPERTY_FIELDS)}
+    missing = [pid for pid in payload.property_ids if pid not in properties]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Properties not found: {missing}"
+        )
+
+    overrides_dict = payload.overrides.model_dump(exclude_none=True) if payload.overrides else None
+    inputs_list = [
+        simulation_inputs(PropertyBase.model_validate(properties[pid]).model_dump(by_alias=True), overrides_dict)
+        for pid in payload.property_ids
+    ]
+    settings = _simulation_settings(payload)
+    results = run_portfolio_simulation(inputs_list, **settings)
+
+    return PortfolioSimulationResponse(
+        seed=settings["seed"],
+        results=[
+            SimulationResult(property_id=pid, **result)
+            for pid, result in zip(payload.property_ids, results)
+        ]
+    )
+
+@router.post("/analysis", response_model=PortfolioAnalysisResponse)
+def analyze_portfolio(payload: PortfolioAnalysisRequest, db: Session = Depends(get_db)):
+    """DB-only cap rates plus AI analyses for several properties, packed into batched Gemini requests."""
+    properties = {p.id: p for p in get_properties_by_ids(db, payload.property_ids, PROPERTY_FIELDS)}
+    missing = [pid for pid in payload.property_ids if pid not in properties]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Properties not found: {missing}"
+        )
+
+    overrides_dict = payload.overrides.model_dump(exclude_none=True) if payload.overrides else None
+    property_ids = list(dict.fromkeys(payload.property_ids))
+    analyses = {}
+    for pid in property_ids:
+        prop_dict = PropertyBase.model_validate(properties[pid]).model_dump(by_alias=True)
+        analyses[pid] = (prop_dict, analyze_investment(prop_dict, overrides=overrides_dict))
+
+    ai_results = dict(ai_investment_analysis_batch(
+        (pid, prop_dict, analysis["cap_rate_percent"]) for pid, (prop_dict, analysis) in analyses.items()
+    ))
+    return PortfolioAnalysisResponse(results=[
+        PortfolioAnalysisItem(
+            property_id=pid,
+            cap_rate_percent=analyses[pid][1]["cap_rate_percent"],
+            recommendation=analyses[pid][1]["recommendation"],
+            ai_analysis=ai_results[pid] if "error" not in ai_results[pid] else _ai_unavailable(ai_results[pid]["error"]),
+        )
+        for pid in property_ids
+    ])
 
 @router.post("/analyze-by-address", response_model=InvestmentAnalysisResponse)
 def analyze_property_by_address(
@@ -96,14 +482,22 @@ def analyze_property_by_address(
     )
 
 @router.get("/{property_id}", response_model=PropertyBase)
-def get_property(property_id: int, db: Session = Depends(get_db)):
-    property_obj = get_property_by_id(db, property_id)
-    if not property_obj:
+async def get_property(property_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    # Cached entries carry their own ETag, so a revalidation hit never touches the DB
+    detail = await get_property_detail_async(db, property_id)
+    if not detail:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Property not found"
         )
-    return PropertyBase.model_validate(property_obj)
+    # Buffered in memory; ranks the property for the background RentCast refresh
+    refresh_scheduler.record_view(property_id)
+    if is_not_modified(request, detail["etag"], detail["last_modified"]):
+        return not_modified_response(detail["etag"], detail["last_modified"])
+
+    cached_response = Response(content=detail["body"], media_type="application/json")
+    set_cache_headers(cached_response, detail["etag"], detail["last_modified"])
+    return cached_response
 
 @router.post("/", response_model=PropertyBase, status_code=status.HTTP_201_CREATED)
 def create_new_property(property_data: PropertyCreate, db: Session = Depends(get_db)):
@@ -133,6 +527,127 @@ def delete_existing_property(property_id: int, db: Session = Depends(get_db)):
             detail="Property not found"
         )
 
+@router.get("/{property_id}/market", response_model=MarketAnalysis)
+def get_property_market(property_id: int, db: Session = Depends(get_db)):
+    property_obj = get_property_by_id(db, property_id)
+    if not property_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+
+    # Most local region with a usable median wins: ZIP, then county
+    stats = None
+    for region_type, key in (
+        ("zip", property_obj.zip_code),
+        ("county", county_key_for(property_obj.state_fips, property_obj.county_fips)),
+    ):
+        candidate = get_market_stats(db, region_type, key) if key else None
+        if candidate and candidate.median_price_per_sqft:
+            stats = candidate
+            break
+
+    avg_rent = None
+    if stats and stats.median_rent_per_sqft and property_obj.square_footage:
+        avg_rent = round(stats.median_rent_per_sqft * property_obj.square_footage, 2)
+
+    comps = {}
+    if property_obj.zip_code:
+        for comp in get_recent_sales(db, property_obj.zip_code, exclude_id=property_obj.id):
+            comps[str(comp.id)] = comp.last_sale_price
+
+    return MarketAnalysis(
+        property_id=str(property_obj.id),
+        avg_rent=avg_rent,
+        avg_price_per_sqft=stats.median_price_per_sqft if stats else None,
+        neighborhood_trend=stats.neighborhood_trend if stats else None,
+        comps=comps or None
+    )
+
+@router.get("/{property_id}/sales", response_model=PropertySalesHistory)
+def get_property_sale_history(property_id: int, db: Session = Depends(get_db)):
+    """Recorded sales oldest first, with the property's own and its market's annual appreciation."""
+    property_obj = get_property_by_id(db, property_id)
+    if not property_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+
+    sales = get_property_sales(db, property_id)
+    market_rate = None
+    for region_type, key in (
+        ("zip", property_obj.zip_code),
+        ("county", county_key_for(property_obj.state_fips, property_obj.county_fips)),
+    ):
+        candidate = get_market_stats(db, region_type, key) if key else None
+        if candidate and candidate.annual_appreciation_pct is not None:
+            market_rate = candidate.annual_appreciation_pct
+            break
+
+    return PropertySalesHistory(
+        property_id=property_id,
+        sales=[PropertySaleEvent.model_validate(sale) for sale in sales],
+        annual_appreciation_pct=property_appreciation(sales),
+        market_appreciation_pct=market_rate
+    )
+
+@router.post("/{property_id}/sensitivity", response_model=SensitivityResponse)
+def analyze_property_sensitivity(
+        property_id: int,
+        payload: SensitivityRequest,
+        db: Session = Depends(get_db)
+):
+    """Cap rate across a grid of purchase price, rent, vacancy and management inputs."""
+    prop = get_property_by_id(db, property_id)
+    if not prop:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+
+    prop_dict = PropertyBase.model_validate(prop).model_dump(by_alias=True)
+    overrides_dict = payload.overrides.model_dump(exclude_none=True) if payload.overrides else None
+    ranges = {
+        axis: spec.model_dump()
+        for axis, spec in (
+            ("purchase_price", payload.purchase_price),
+            ("monthly_rent", payload.monthly_rent),
+            ("vacancy_allowance_rate", payload.vacancy_allowance_rate),
+            ("property_management_rate", payload.property_management_rate),
+        )
+        if spec is not None
+    }
+
+    try:
+        grid = compute_sensitivity_grid(prop_dict, ranges, overrides=overrides_dict)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return SensitivityResponse(property_id=prop.id, **grid)
+
+@router.post("/{property_id}/simulation", response_model=SimulationResponse)
+def simulate_property(property_id: int, payload: SimulationRequest, db: Session = Depends(get_db)):
+    """Monte Carlo cap rate distribution; the same seed reproduces the same result."""
+    prop = get_property_by_id(db, property_id)
+    if not prop:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+
+    prop_dict = PropertyBase.model_validate(prop).model_dump(by_alias=True)
+    overrides_dict = payload.overrides.model_dump(exclude_none=True) if payload.overrides else None
+    inputs = simulation_inputs(prop_dict, overrides_dict, monthly_rent_override=payload.monthly_rent)
+    settings = _simulation_settings(payload)
+
+    try:
+        result = run_simulation(inputs, **settings)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return SimulationResponse(property_id=prop.id, seed=settings["seed"], **result)
+
 @router.post("/{property_id}/analysis", response_model=PropertyAnalysisResponse)
 def analyze_property_investment(
         property_id: int,
@@ -146,40 +661,42 @@ def analyze_property_investment(
             detail="Property not found"
         )
 
-    analyzer = PropertyAnalyzer()
     property_dict = PropertyBase.model_validate(property_obj).model_dump()
+    # Estimates stored by the background refresh; the analysis only calls RentCast without them
+    refreshed = get_refreshed_estimates(db, property_obj.id)
 
-    financial_analysis = analyzer.analyze_property(
-        property_dict,
-        analysis_request.calculation_mode,
-        analysis_request.custom_expenses,
-        analysis_request.cap_rate_threshold
-    )
-
-    # AI analysis guard: if missing key or failure, return graceful placeholder
-    try:
-        ai_analysis = ai_investment_analysis(
+    def run_analysis() -> dict:
+        analyzer = PropertyAnalyzer()
+        financial_analysis = analyzer.analyze_property(
             property_dict,
-            financial_analysis["cap_rates"].get("mid", 0)
+            analysis_request.calculation_mode,
+            analysis_request.custom_expenses,
+            analysis_request.cap_rate_threshold,
+            refreshed=refreshed
         )
-    except Exception as e:
-        ai_analysis = {
-            "investment_analysis": {
-                "summary": "AI analysis unavailable.",
-                "recommendation": {
-                    "decision": "N/A",
-                    "justification": "Gemini call failed or API key missing."
-                },
-                "potential_risks": ["External AI service failure"],
-                "recommendations": ["Verify GOOGLE_GENAI_KEY", "Retry later", "Check network logs"],
-                "error": str(e)
-            }
-        }
+
+        # AI analysis guard: if missing key or failure, return graceful placeholder
+        try:
+            ai_analysis = ai_investment_analysis(
+                property_dict,
+                financial_analysis["cap_rates"].get("mid", 0)
+            )
+        except Exception as e:
+            ai_analysis = _ai_unavailable(str(e))
+        # JSON-safe so the result can be handed to requests waiting in other workers
+        return jsonable_encoder({"financial_analysis": financial_analysis, "ai_analysis": ai_analysis})
+
+    version = f"{property_obj.updated_at}:{refreshed['refreshed_at'] if refreshed else None}"
+    key = analysis_flight_key(
+        property_obj.id, version, analysis_request.calculation_mode,
+        analysis_request.custom_expenses, analysis_request.cap_rate_threshold
+    )
+    result, _ = analysis_flight.do_shared(key, run_analysis, engine)
 
     return PropertyAnalysisResponse(
         property_data=PropertyBase.model_validate(property_obj),
-        financial_analysis=financial_analysis,
-        ai_analysis=ai_analysis,
+        financial_analysis=result["financial_analysis"],
+        ai_analysis=result["ai_analysis"],
         success=True,
         message="Analysis completed successfully"
     )
\ No newline at end of file
@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from typing import List
-from app.core import get_db
+from typing import List, Optional
+from app.core import get_db, get_async_db
 from app.models import User, Property
 from app.schemas import UserCreate, UserResponse, UserUpdate
-from app.schemas.property import PropertyBase
+from app.schemas.property import PropertySummary
+from app.api.property import resolve_fields, projected_response
+from app.core.http_cache import etag_for, last_modified_for, is_not_modified, set_cache_headers, \
+    not_modified_response
+from app.crud.property import get_properties_by_ids_async, get_property_versions_by_ids_async
 from app.crud import (
     create_user,
     get_user_by_id,
     get_user_by_firebase_id,
+    get_user_by_id_async,
+    get_user_by_firebase_id_async,
     update_user,
     delete_user
 )
@@ -49,8 +56,8 @@ def get_users_route(skip: int = 0, limit: int = 100, db: Session = Depends(get_d
     return users
 
 @router.get("/firebase/{firebase_id}", response_model=UserResponse)
-def get_user_by_firebase_id_route(firebase_id: str, db: Session = Depends(get_db)):
-    user = get_user_by_firebase_id(db, firebase_id)
+async def get_user_by_firebase_id_route(firebase_id: str, db: AsyncSession = Depends(get_async_db)):
+    user = await get_user_by_firebase_id_async(db, firebase_id)
 
     if not user:
         raise HTTPException(
@@ -61,8 +68,8 @@ def get_user_by_firebase_id_route(firebase_id: str, db: Session = Depends(get_db
     return user
 
 @router.get("/{id}", response_model=UserResponse)
-def get_user_route(id: int, db: Session = Depends(get_db)):
-    user = get_user_by_id(db, id)
+async def get_user_route(id: int, db: AsyncSession = Depends(get_async_db)):
+    user = await get_user_by_id_async(db, id)
 
     if not user:
         raise HTTPException(
@@ -125,22 +132,35 @@ def add_favorite_property(
     db.refresh(user)
     return UserResponse.model_validate(user)
 
-@router.get("/{user_id}/favorites", response_model=List[PropertyBase])
-def get_favorite_properties(
+@router.get("/{user_id}/favorites", response_model=List[PropertySummary])
+async def get_favorite_properties(
         user_id: int,
-        db: Session = Depends(get_db)
+        request: Request,
+        response: Response,
+        fields: Optional[str] = None,
+        db: AsyncSession = Depends(get_async_db)
 ):
-    user = get_user_by_id(db, user_id)
+    user = await get_user_by_id_async(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     if not user.favorite_properties:
         return []
 
-    properties = db.query(Property).filter(
-        Property.id.in_(user.favorite_properties)
-    ).all()
-    return [PropertyBase.model_validate(p) for p in properties]
+    field_list = resolve_fields(fields)
+    versions = await get_property_versions_by_ids_async(db, user.favorite_properties)
+    etag = etag_for(versions, variant=request.url.query)
+    last_modified = last_modified_for(versions)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+
+    properties = await get_properties_by_ids_async(db, user.favorite_properties, fields=field_list)
+    if field_list:
+        projected = projected_response(properties, field_list)
+        set_cache_headers(projected, etag, last_modified)
+        return projected
+    set_cache_headers(response, etag, last_modified)
+    return properties
 
 @router.delete("/{user_id}/favorites/{property_id}")
 def remove_favorite_property(
@@ -1,3 +1,3 @@
 from .config import settings
-from .database import Base, get_db
+from .database import Base, get_db, get_async_db
 from .firebase_utils import firebase_creds_path
\ No newline at end of file
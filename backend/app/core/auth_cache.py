@@ -0,0 +1,108 @@
+import hashlib
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+from cachetools import TLRUCache
+from firebase_admin import auth
+
+# Verified ID-token claims keyed by SHA-256 of the token. Entries expire at the token's
+# own `exp`, so a cached token is never accepted past the point verify_id_token would
+# reject it. Revocation is not re-checked (verify_id_token is called without
+# check_revoked, so behaviour is unchanged).
+TOKEN_CACHE_SIZE = 10_000
+
+# Google's signing certs for Firebase ID tokens (same URL firebase_admin verifies against)
+ID_TOKEN_CERT_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+CERT_REFRESH_FALLBACK_SECONDS = 3600
+CERT_REFRESH_MIN_SECONDS = 60
+
+
+class VerifiedTokenCache:
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE):
+        self._cache = TLRUCache(maxsize=maxsize, ttu=lambda _key, claims, _now: claims["exp"], timer=time.time)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self.key_for(token)
+        with self._lock:
+            claims = self._cache.get(key)
+            if claims is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return claims
+
+    def put(self, token: str, claims: Dict[str, Any]):
+        if not isinstance(claims.get("exp"), (int, float)):
+            return
+        with self._lock:
+            self._cache[self.key_for(token)] = claims
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"name": "verified_tokens", "size": len(self._cache), "maxsize": self._cache.maxsize,
+                    "hits": self.hits, "misses": self.misses}
+
+
+token_cache = VerifiedTokenCache()
+
+
+def verify_id_token_cached(token: str) -> Dict[str, Any]:
+    """auth.verify_id_token with a per-token cache; raises exactly like verify_id_token on a miss."""
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
+    claims = auth.verify_id_token(token)
+    token_cache.put(token, claims)
+    return claims
+
+
+class CertRefresher:
+    """Re-fetches the ID-token signing certs shortly before their HTTP cache entry goes stale.
+
+    firebase_admin caches the certs with CacheControl according to the response's
+    max-age and otherwise refetches them inline on the first verification after expiry.
+    Refreshing through its own cached session (with Cache-Control: no-cache, which
+    forces a refetch that is stored again) keeps that request off the hot path.
+    """
+
+    def __init__(self):
+        self._thread = None
+
+    def _verifier_request(self):
+        # Private in firebase_admin; a failure here is caught by _run and verification fetches inline
+        client = auth._get_client(None)
+        return client._token_verifier.request
+
+    def refresh_once(self) -> float:
+        """Fetch the certs now; returns seconds until the next refresh is due."""
+        request = self._verifier_request()
+        response = request(url=ID_TOKEN_CERT_URL, method="GET", headers={"Cache-Control": "no-cache"})
+        match = re.search(r"max-age=(\d+)", response.headers.get("cache-control", ""))
+        max_age = int(match.group(1)) if match else CERT_REFRESH_FALLBACK_SECONDS
+        # Refresh at 80% of the lifetime so the cached copy never goes stale
+        return max(CERT_REFRESH_MIN_SECONDS, max_age * 0.8)
+
+    def _run(self):
+        while True:
+            try:
+                delay = self.refresh_once()
+            except Exception as e:
+                print(f"Firebase cert refresh failed, verification will fetch inline: {str(e)}")
+                delay = CERT_REFRESH_MIN_SECONDS * 5
+            threading.Event().wait(delay)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="firebase-cert-refresh", daemon=True)
+            self._thread.start()
+
+
+cert_refresher = CertRefresher()
@@ -0,0 +1,160 @@
+import json
+import os
+import select
+import threading
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+from cachetools import TTLCache
+from sqlalchemy import text
+
+
+class ReadThroughCache:
+    """Bounded TTL cache with hit/miss counters, safe to share between request threads."""
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 300):
+        self.name = name
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+            generation = self._generation
+        # Load outside the lock so a slow query does not serialize other readers
+        value = loader()
+        with self._lock:
+            # Skip the store if a write invalidated the cache while we were loading
+            if generation == self._generation:
+                self._cache[key] = value
+        return value
+
+    async def get_or_load_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """get_or_load for coroutine loaders; the lock is only held for dict operations."""
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+            generation = self._generation
+        value = await loader()
+        with self._lock:
+            if generation == self._generation:
+                self._cache[key] = value
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._generation += 1
+            self._cache.pop(key, None)
+
+    def evict_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Drop every entry for which predicate(key, value) is true; returns the number evicted."""
+        with self._lock:
+            self._generation += 1
+            stale = [k for k, v in list(self._cache.items()) if predicate(k, v)]
+            for k in stale:
+                self._cache.pop(k, None)
+            return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": self.name,
+                "size": len(self._cache),
+                "maxsize": self._cache.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class CacheInvalidationBus:
+    """Fans cache invalidation events out to every worker process.
+
+    Handlers always run locally. When a channel name is configured, events are also
+    sent with Postgres NOTIFY and a daemon thread LISTENs for events from other
+    workers, so no extra broker is needed.
+    """
+
+    def __init__(self):
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.channel = ""
+        self._engine = None
+        self._handlers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+        self._thread = None
+
+    def subscribe(self, event: str, handler: Callable[[Dict[str, Any]], None]):
+        self._handlers.setdefault(event, []).append(handler)
+
+    def _dispatch(self, event: str, payload: Dict[str, Any]):
+        for handler in self._handlers.get(event, []):
+            try:
+                handler(payload)
+            except Exception as e:
+                print(f"Cache invalidation handler failed for {event}: {str(e)}")
+
+    def publish(self, event: str, payload: Dict[str, Any]):
+        self._dispatch(event, payload)
+        if not self.channel or self._engine is None:
+            return
+        message = json.dumps({"origin": self.origin, "event": event, "payload": payload}, default=str)
+        try:
+            with self._engine.begin() as conn:
+                conn.execute(text("SELECT pg_notify(:channel, :message)"), {"channel": self.channel, "message": message})
+        except Exception as e:
+            # Other workers still converge through their cache TTLs
+            print(f"Cache invalidation NOTIFY failed: {str(e)}")
+
+    def start(self, engine, channel: str, listen: bool = True):
+        """Enable cross-worker delivery on `channel` (no-op when channel is empty).
+
+        Pass listen=False from publish-only processes such as the loader scripts.
+        """
+        if not channel:
+            return
+        self.channel = channel
+        self._engine = engine
+        if listen and self._thread is None:
+            self._thread = threading.Thread(target=self._listen, name="cache-invalidation-listener", daemon=True)
+            self._thread.start()
+
+    def _listen(self):
+        while True:
+            raw = None
+            try:
+                raw = self._engine.raw_connection()
+                dbapi_conn = raw.driver_connection
+                dbapi_conn.autocommit = True
+                with dbapi_conn.cursor() as cur:
+                    cur.execute(f'LISTEN "{self.channel}"')
+                while True:
+                    if select.select([dbapi_conn], [], [], 30) == ([], [], []):
+                        continue
+                    dbapi_conn.poll()
+                    while dbapi_conn.notifies:
+                        note = dbapi_conn.notifies.pop(0)
+                        message = json.loads(note.payload)
+                        if message.get("origin") != self.origin:
+                            self._dispatch(message["event"], message.get("payload", {}))
+            except Exception as e:
+                print(f"Cache invalidation listener error, reconnecting: {str(e)}")
+                threading.Event().wait(5)
+            finally:
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
+
+
+invalidation_bus = CacheInvalidationBus()
@@ -6,8 +6,53 @@ load_dotenv()
 class Settings:
     PROJECT_NAME: str = "Aegis Realty"
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    # Async routes derive a postgresql+asyncpg:// URL from DATABASE_URL unless this is set
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+    ASYNC_DB_POOL_SIZE: int = int(os.getenv("ASYNC_DB_POOL_SIZE", "20"))
+    ASYNC_DB_MAX_OVERFLOW: int = int(os.getenv("ASYNC_DB_MAX_OVERFLOW", "20"))
     FIREBASE_CREDENTIALS: str = os.getenv("FIREBASE_CREDENTIALS", "")
     GOOGLE_GENAI_KEY: str = os.getenv("GOOGLE_GENAI_KEY", "")
+    # Estimated-token ceiling for one investment-analysis prompt (instructions + property data)
+    GEMINI_PROMPT_TOKEN_BUDGET: int = int(os.getenv("GEMINI_PROMPT_TOKEN_BUDGET", "1200"))
+    # Answer Gemini calls with the offline stub model (local development and tests)
+    GEMINI_USE_STUB: bool = os.getenv("GEMINI_USE_STUB", "").lower() in ("1", "true", "yes")
     RENTCAST_API_KEY: str = os.getenv("RENTCAST_API_KEY", "")
+    # Point the client and loader at scripts/rentcast_simulator.py for offline load tests,
+    # with a call limit and counter file of their own so simulated calls never spend the real quota
+    RENTCAST_BASE_URL: str = os.getenv("RENTCAST_BASE_URL", "https://api.rentcast.io/v1")
+    RENTCAST_MONTHLY_CALL_LIMIT: int = int(os.getenv("RENTCAST_MONTHLY_CALL_LIMIT", "50"))
+    RENTCAST_RATE_LIMIT_FILE: str = os.getenv("RENTCAST_RATE_LIMIT_FILE", "rentcast_rate_limit.json")
+    # Outbound dependency limits: per-call deadlines, retries for idempotent RentCast GETs,
+    # and the circuit breakers that make callers fail fast to the DB-only fallback
+    RENTCAST_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("RENTCAST_CONNECT_TIMEOUT_SECONDS", "3.05"))
+    RENTCAST_READ_TIMEOUT_SECONDS: float = float(os.getenv("RENTCAST_READ_TIMEOUT_SECONDS", "10"))
+    RENTCAST_RETRIES: int = int(os.getenv("RENTCAST_RETRIES", "2"))
+    GEMINI_TIMEOUT_SECONDS: float = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30"))
+    BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+    BREAKER_RESET_SECONDS: float = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+    # Identical concurrent POST /properties/{id}/analysis requests share one computation;
+    # followers wait up to the first value, and the shared result stays readable for the second
+    ANALYSIS_COALESCE_WAIT_SECONDS: float = float(os.getenv("ANALYSIS_COALESCE_WAIT_SECONDS", "90"))
+    ANALYSIS_RESULT_TTL_SECONDS: float = float(os.getenv("ANALYSIS_RESULT_TTL_SECONDS", "15"))
+    # Per-worker AUTOCOMMIT connections reserved for the cross-worker advisory locks, and how
+    # many of them may wait on another worker at once (further waiters compute for themselves)
+    ANALYSIS_COALESCE_MAX_CONNECTIONS: int = int(os.getenv("ANALYSIS_COALESCE_MAX_CONNECTIONS", "8"))
+    ANALYSIS_COALESCE_MAX_WAITERS: int = int(os.getenv("ANALYSIS_COALESCE_MAX_WAITERS", "4"))
+    # Background RentCast refresh of stale, popular properties (app/services/refresh_scheduler.py):
+    # the share of the client's monthly call budget it may spend (the rest stays available to
+    # interactive analyses), and how long refreshed estimates are trusted by analyses
+    RENTCAST_REFRESH_ENABLED: bool = os.getenv("RENTCAST_REFRESH_ENABLED", "true").lower() in ("1", "true", "yes")
+    RENTCAST_REFRESH_BUDGET_SHARE: float = float(os.getenv("RENTCAST_REFRESH_BUDGET_SHARE", "0.8"))
+    RENTCAST_REFRESH_MAX_AGE_DAYS: int = int(os.getenv("RENTCAST_REFRESH_MAX_AGE_DAYS", "180"))
+    # Processes in the pool shared by portfolio Monte Carlo simulations; below 2 runs them inline
+    SIMULATION_POOL_WORKERS: int = int(os.getenv("SIMULATION_POOL_WORKERS", "2"))
+    # Autocomplete snapshot written by scripts/build_address_index.py and mapped by every worker
+    # (shared pages, ~100 bytes per address), the addresses it keeps (most popular first), and
+    # how often workers check for a newer file
+    AUTOCOMPLETE_SNAPSHOT_PATH: str = os.getenv("AUTOCOMPLETE_SNAPSHOT_PATH", "address_index.snapshot")
+    AUTOCOMPLETE_MAX_ENTRIES: int = int(os.getenv("AUTOCOMPLETE_MAX_ENTRIES", "3000000"))
+    AUTOCOMPLETE_RELOAD_SECONDS: float = float(os.getenv("AUTOCOMPLETE_RELOAD_SECONDS", "30"))
+    # Postgres NOTIFY channel for cross-worker cache invalidation; empty = in-process only
+    CACHE_INVALIDATION_CHANNEL: str = os.getenv("CACHE_INVALIDATION_CHANNEL", "")
 
 settings = Settings()
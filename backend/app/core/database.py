@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import settings
 
@@ -7,9 +8,34 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def async_database_url(url: str) -> str:
+	"""Same database through asyncpg. The app runs on Postgres only (advisory locks,
+	ON CONFLICT upserts, percentile_cont), so other URLs are rejected here rather than
+	failing later inside the async driver or pool."""
+	for prefix in ("postgresql+asyncpg://", "postgresql+psycopg2://", "postgresql://", "postgres://"):
+		if url.startswith(prefix):
+			return "postgresql+asyncpg://" + url[len(prefix):]
+	raise ValueError(f"DATABASE_URL must be a PostgreSQL URL, got scheme {url.split('://')[0]!r}")
+
+
+# Used by the async read routes; requests await the DB instead of holding a threadpool worker.
+# The engine connects lazily, so importing this module never requires the database.
+async_engine = create_async_engine(
+	settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL),
+	pool_size=settings.ASYNC_DB_POOL_SIZE,
+	max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
 def get_db():
 	db = SessionLocal()
 	try:
 		yield db
 	finally:
-		db.close()
\ No newline at end of file
+		db.close()
+
+
+async def get_async_db():
+	async with AsyncSessionLocal() as db:
+		yield db
@@ -1,8 +1,8 @@
 from fastapi import Header, HTTPException, Depends
-from firebase_admin import auth
 from typing import Optional
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal
+from app.core.auth_cache import verify_id_token_cached
 
 # Global auth setting - change to True for production
 REQUIRE_AUTH = False
@@ -21,7 +21,8 @@ def get_current_user(required: bool = REQUIRE_AUTH):
 
         try:
             token = authorization.split("Bearer ")[1]
-            return auth.verify_id_token(token)
+            # Repeat requests with the same token are a hash + dict lookup
+            return verify_id_token_cached(token)
         except Exception as e:
             if required:
                 raise HTTPException(status_code=401, detail="Invalid token")
@@ -0,0 +1,59 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional, Tuple
+from fastapi import Request, Response, status
+
+# Browsers and React Query may reuse a cached body, but must revalidate it first.
+CACHE_CONTROL = "private, no-cache"
+
+
+def etag_for(versions: Iterable[Tuple[int, Optional[datetime]]], variant: str = "") -> str:
+    """Weak ETag over (id, updated_at) pairs plus the response variant (e.g. the query string)."""
+    digest = hashlib.sha1(variant.encode("utf-8"))
+    for property_id, updated_at in versions:
+        digest.update(f"{property_id}:{updated_at.isoformat() if updated_at else ''};".encode("utf-8"))
+    return f'W/"{digest.hexdigest()[:20]}"'
+
+
+def last_modified_for(versions: Iterable[Tuple[int, Optional[datetime]]]) -> Optional[datetime]:
+    stamps = [updated_at for _, updated_at in versions if updated_at]
+    return max(stamps) if stamps else None
+
+
+def _http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since against the current version."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [t.strip() for t in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        current = last_modified if last_modified.tzinfo else last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return current.replace(microsecond=0) <= since
+    return False
+
+
+def set_cache_headers(response: Response, etag: str, last_modified: Optional[datetime]):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if last_modified:
+        response.headers["Last-Modified"] = _http_date(last_modified)
+
+
+def not_modified_response(etag: str, last_modified: Optional[datetime]) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag, last_modified)
+    return response
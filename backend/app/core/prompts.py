@@ -1,44 +1,251 @@
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+# Static part of the investment prompt. It is identical for every property, so it is sent
+# inline as the system instruction, where Gemini's implicit prefix caching applies,
+# instead of being repeated in front of each property's data.
+_ANALYSIS_RUBRIC = """You are a real estate investment analyst. Your task is to provide a comprehensive analysis of a property based on the provided data.
+
+The property data is a compact summary: one field per line, missing fields omitted, long histories (sales, assessments, taxes) summarized.
+
+Instructions:
+1.  **Summary of the Property:** Provide a brief, professional summary of the property and its key features.
+2.  **Investment Recommendation:** Based on the provided Cap Rate, give a clear decision on whether this is a good investment. Justify your decision with a short explanation.
+3.  **Potential Risks:** Identify any potential risks or red flags that an investor should be aware of, based on the property data.
+4.  **Recommendations:** Offer a few recommendations on how an investor could improve the property's value or increase its rental income."""
+
+INVESTMENT_ANALYSIS_INSTRUCTIONS = _ANALYSIS_RUBRIC + """
+
+Output formatting:
+- The output must be pure, raw JSON.
+- Do not return the JSON wrapped in quotes or with escaped characters like \\n or ".
+- Do not include any Markdown, plain text, explanations, commentary, or symbols like asterisks or hash signs.
+- Do not wrap the JSON in markdown-style code blocks (e.g., triple backticks ``` or ```json).
+- Format must be valid and parseable by standard JSON parsers.
+- The JSON object should have the following structure:
+{
+    "summary": "...",
+    "recommendation": {
+        "decision": "Invest" or "Do Not Invest",
+        "justification": "..."
+    },
+    "potential_risks": [
+        "...",
+        "...",
+        "..."
+    ],
+    "recommendations": [
+        "...",
+        "...",
+        "..."
+    ]
+}
+
+If you cannot provide the requested information, respond with an empty JSON object.
+Start your response with { and end with }. Nothing else."""
+
+# Several properties per request; the JSON shape is enforced by the response schema
+INVESTMENT_BATCH_INSTRUCTIONS = _ANALYSIS_RUBRIC + """
+
+You will receive several properties, each introduced by a line "Property <id>:".
+Analyze each property independently and return one array item per property, with that
+property's id in property_id and its analysis in result. Do not skip, merge or invent properties."""
+
+# Upper bound for the whole prompt (instructions + property block), in estimated tokens
+DEFAULT_PROMPT_TOKEN_BUDGET = 1200
+# Per-property share of a batched prompt (the instructions are paid once per batch)
+DEFAULT_BATCH_PROPERTY_TOKEN_BUDGET = 250
+# History entries kept verbatim before the rest is folded into a one-line summary
+HISTORY_RECENT_ENTRIES = 3
+# Gemini averages roughly 4 characters per token on English/numeric text
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate used for budgeting; the API reports the exact count."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _get(data: Dict[str, Any], alias: str, name: str):
+    value = data.get(alias)
+    return value if value is not None else data.get(name)
+
+
+def _money(value) -> Optional[str]:
+    if not isinstance(value, (int, float)):
+        return None
+    return f"${value:,.0f}"
+
+
+def _year_month(value) -> str:
+    return str(value)[:7] if value else "?"
+
+
+def _join(parts: List[Optional[str]], sep: str = " | ") -> Optional[str]:
+    kept = [p for p in parts if p]
+    return sep.join(kept) if kept else None
+
+
+def summarize_sale_history(sale_history) -> Optional[str]:
+    """Most recent sales verbatim, older ones folded into a count and the overall change."""
+    if not isinstance(sale_history, dict) or not sale_history:
+        return None
+    events = []
+    for key, entry in sale_history.items():
+        if not isinstance(entry, dict):
+            continue
+        price = entry.get("price")
+        events.append((str(entry.get("date") or key)[:10], price if isinstance(price, (int, float)) else None))
+    if not events:
+        return None
+    events.sort(reverse=True)
+    recent = "; ".join(f"{_year_month(d)} {_money(p) or 'price n/a'}" for d, p in events[:HISTORY_RECENT_ENTRIES])
+    line = f"{len(events)} recorded, latest first: {recent}"
+    priced = [(d, p) for d, p in events if p]
+    if len(priced) >= 2:
+        (last_date, last), (first_date, first) = priced[0], priced[-1]
+        line += f"; {(last - first) / first * 100:+.0f}% since {first_date[:4]}"
+    return line
+
+
+def _yearly_entries(history, value_key: str) -> List[Tuple[int, float]]:
+    entries = []
+    if not isinstance(history, dict):
+        return entries
+    for year, entry in history.items():
+        value = entry.get(value_key) if isinstance(entry, dict) else None
+        try:
+            year = int(year)
+        except (TypeError, ValueError):
+            continue
+        if isinstance(value, (int, float)):
+            entries.append((year, float(value)))
+    entries.sort()
+    return entries
+
+
+def summarize_yearly_history(history, value_key: str) -> Optional[str]:
+    """Latest year's value plus the average yearly change across the recorded span."""
+    entries = _yearly_entries(history, value_key)
+    if not entries:
+        return None
+    last_year, last = entries[-1]
+    line = f"{last_year} {_money(last)}"
+    first_year, first = entries[0]
+    if last_year > first_year and first > 0:
+        growth = ((last / first) ** (1 / (last_year - first_year)) - 1) * 100
+        line += f" ({growth:+.1f}%/yr since {first_year}, {len(entries)} years on record)"
+    return line
+
+
+def summarize_features(features) -> Optional[str]:
+    if not isinstance(features, dict):
+        return None
+    parts = []
+    for key, value in features.items():
+        if value is None or value is False or value == "" or isinstance(value, (dict, list)):
+            continue
+        parts.append(key if value is True else f"{key} {value}")
+    return ", ".join(parts) or None
+
+
+def property_prompt_sections(property_data: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(label, value) lines for the prompt, most important first; empty fields are dropped.
+
+    Owner names, mailing addresses, assessor/legal identifiers and raw JSON are left out:
+    they add tokens without informing the analysis.
+    """
+    d = property_data
+    sqft = _get(d, "squareFootage", "square_footage")
+    lot = _get(d, "lotSize", "lot_size")
+    beds, baths = d.get("bedrooms"), d.get("bathrooms")
+    owner_occupied = _get(d, "ownerOccupied", "owner_occupied")
+    hoa_annual = _get(d, "annualHoa", "annual_hoa")
+    tax_year = _get(d, "latestTaxYear", "latest_tax_year")
+    annual_tax = _get(d, "annualTax", "annual_tax")
+    last_sale_price = _get(d, "lastSalePrice", "last_sale_price")
+    rent = _money(_get(d, "estimatedMonthlyRent", "estimated_monthly_rent"))
+
+    sections = [
+        ("address", _get(d, "formattedAddress", "formatted_address")
+            or _join([_get(d, "addressLine1", "address_line1"), d.get("city"), d.get("state"), _get(d, "zipCode", "zip_code")], ", ")),
+        ("type", _get(d, "propertyType", "property_type")),
+        ("size", _join([
+            f"{beds} bd" if beds is not None else None,
+            f"{baths:g} ba" if isinstance(baths, (int, float)) else None,
+            f"{sqft:,} sqft" if isinstance(sqft, (int, float)) else None,
+            f"lot {lot:,} sqft" if isinstance(lot, (int, float)) else None,
+        ])),
+        ("year built", _get(d, "yearBuilt", "year_built")),
+        ("last sale", f"{_year_month(_get(d, 'lastSaleDate', 'last_sale_date'))} {_money(last_sale_price)}"
+            if _money(last_sale_price) else None),
+        ("estimated value", _money(_get(d, "estimatedValue", "estimated_value"))),
+        ("estimated rent", f"{rent}/mo" if rent else None),
+        ("annual tax", _join([_money(annual_tax), f"({tax_year})" if tax_year else None], " ") if _money(annual_tax) else None),
+        ("hoa", f"{_money(hoa_annual)}/yr" if isinstance(hoa_annual, (int, float)) and hoa_annual > 0 else None),
+        ("monthly carrying cost", _money(_get(d, "monthlyCarryingCost", "monthly_carrying_cost"))),
+        ("owner occupied", ("yes" if owner_occupied else "no") if owner_occupied is not None else None),
+        ("location", _join([d.get("county") and f"{d['county']} County", d.get("subdivision"), d.get("zoning") and f"zoning {d['zoning']}"], ", ")),
+        ("sales", summarize_sale_history(_get(d, "saleHistory", "sale_history"))),
+        ("tax assessments", summarize_yearly_history(_get(d, "taxAssessments", "tax_assessments"), "value")),
+        ("property taxes", summarize_yearly_history(_get(d, "propertyTaxes", "property_taxes"), "total")),
+        ("features", summarize_features(d.get("features"))),
+    ]
+    return [(label, str(value)) for label, value in sections if value not in (None, "")]
+
+
+def render_property_block(
+        property_data: Dict[str, Any],
+        cap_rate,
+        token_budget: int,
+        header: str = "Property Data:"
+) -> Tuple[str, List[str]]:
+    """Compact data block for one property and the labels dropped to fit `token_budget`.
+
+    Lowest-priority lines are dropped (and the last remaining line truncated) until the
+    estimated size fits. The address and the cap rate are always kept.
+    """
+    metrics = f"Key Metrics:\n- Capitalization Rate (Cap Rate): {cap_rate}%"
+    lines = [f"{label}: {value}" for label, value in property_prompt_sections(property_data)]
+
+    def render(kept: List[str]) -> str:
+        return header + "\n" + "\n".join(kept) + "\n\n" + metrics
+
+    dropped = []
+    while len(lines) > 1 and estimate_tokens(render(lines)) > token_budget:
+        dropped.append(lines.pop().split(":", 1)[0])
+    block = render(lines)
+    overflow = (estimate_tokens(block) - token_budget) * CHARS_PER_TOKEN
+    if overflow > 0 and lines:
+        lines[-1] = lines[-1][:max(0, len(lines[-1]) - overflow - 3)] + "..."
+        block = render(lines)
+    return block, dropped
+
+
+def build_investment_prompt(
+        property_data: Dict[str, Any],
+        cap_rate,
+        token_budget: int = DEFAULT_PROMPT_TOKEN_BUDGET
+) -> Dict[str, Any]:
+    """Split prompt for one property: the static instructions and a compact data block,
+    together sized to fit `token_budget`."""
+    available = token_budget - estimate_tokens(INVESTMENT_ANALYSIS_INSTRUCTIONS)
+    contents, dropped = render_property_block(property_data, cap_rate, available)
+    return {
+        "instructions": INVESTMENT_ANALYSIS_INSTRUCTIONS,
+        "contents": contents,
+        "estimated_tokens": estimate_tokens(INVESTMENT_ANALYSIS_INSTRUCTIONS) + estimate_tokens(contents),
+        "dropped_sections": dropped,
+    }
+
+
+def build_batch_block(property_id: int, property_data: Dict[str, Any], cap_rate,
+                      token_budget: int = DEFAULT_BATCH_PROPERTY_TOKEN_BUDGET) -> str:
+    """One property's section of a batched prompt (see INVESTMENT_BATCH_INSTRUCTIONS)."""
+    block, _ = render_property_block(property_data, cap_rate, token_budget, header=f"Property {property_id}:")
+    return block
+
+
 def generate_investment_prompt(property_data, cap_rate):
-    return f"""
-    You are a real estate investment analyst. Your task is to provide a comprehensive analysis of a property based on the provided data.
-
-    Property Data:
-    {property_data}
-
-    Key Metrics:
-    - Capitalization Rate (Cap Rate): {cap_rate}%
-
-    Instructions:
-    1.  **Summary of the Property:** Provide a brief, professional summary of the property and its key features.
-    2.  **Investment Recommendation:** Based on the provided Cap Rate, give a clear decision on whether this is a good investment. Justify your decision with a short explanation.
-    3.  **Potential Risks:** Identify any potential risks or red flags that an investor should be aware of, based on the property data.
-    4.  **Recommendations:** Offer a few recommendations on how an investor could improve the property's value or increase its rental income.
-
-    Output formatting:
-    - The output must be pure, raw JSON.
-    - Do not return the JSON wrapped in quotes or with escaped characters like \n or ".
-    - Do not include any Markdown, plain text, explanations, commentary, or symbols like asterisks or hash signs.
-    - Do not wrap the JSON in markdown-style code blocks (e.g., triple backticks ``` or ```json).
-    - Format must be valid and parseable by standard JSON parsers.
-    - The JSON object should have the following structure:
-    {{
-        "summary": "...",
-        "recommendation": {{
-            "decision": "Invest" or "Do Not Invest",
-            "justification": "..."
-        }},
-        "potential_risks": [
-            "...",
-            "...",
-            "..."
-        ],
-        "recommendations": [
-            "...",
-            "...",
-            "..."
-        ]
-    }}
-
-    If you cannot provide the requested information, respond with an empty JSON object.
-    Start your response with {{ and end with }}. Nothing else.
-    """
\ No newline at end of file
+    prompt = build_investment_prompt(property_data, cap_rate)
+    return f"{prompt['instructions']}\n\n{prompt['contents']}"
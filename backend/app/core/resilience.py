@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit open after repeated failures; retry in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker, safe to share between request threads.
+
+    closed: calls go through; `failure_threshold` failures in a row open the circuit.
+    open: calls fail immediately with CircuitOpenError for `reset_timeout` seconds.
+    half_open: one trial call is let through; success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+
+    def before_call(self):
+        with self._lock:
+            if self._state == "open":
+                retry_in = self._opened_at + self.reset_timeout - time.monotonic()
+                if retry_in > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, retry_in)
+                self._state = "half_open"
+                self._trial_in_flight = False
+            if self._state == "half_open":
+                if self._trial_in_flight:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, 0)
+                self._trial_in_flight = True
+            self.calls += 1
+
+    def record_success(self):
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self, error: BaseException):
+        with self._lock:
+            self.failures += 1
+            self._failures += 1
+            self.last_error = str(error)[:200]
+            self._trial_in_flight = False
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return self._state
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self._failures,
+                "calls": self.calls,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "last_error": self.last_error,
+            }
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def call_with_breaker(
+        breaker: CircuitBreaker,
+        fn: Callable[[], Any],
+        retries: int = 0,
+        retry_on: Tuple[Type[BaseException], ...] = (),
+        is_failure: Callable[[BaseException], bool] = lambda e: True,
+        backoff_base: float = 0.5,
+        backoff_max: float = 4.0,
+        is_retryable: Callable[[BaseException], bool] = lambda e: True
+) -> Any:
+    """Call fn() through `breaker`, retrying up to `retries` times on `retry_on` errors.
+
+    Only pass retries for idempotent calls. Errors for which is_failure() is false (e.g.
+    a 404 or a 400 from the dependency) are re-raised without counting against the
+    breaker, since they say nothing about the dependency's health. Errors for which
+    is_retryable() is false (e.g. a quota 429) count as failures but are not retried.
+    """
+    breaker.before_call()
+    attempt = 0
+    while True:
+        try:
+            result = fn()
+        except BaseException as e:
+            if not is_failure(e):
+                breaker.record_success()
+                raise
+            if attempt < retries and isinstance(e, retry_on) and is_retryable(e):
+                time.sleep(backoff_delay(attempt, backoff_base, backoff_max))
+                attempt += 1
+                continue
+            breaker.record_failure(e)
+            raise
+        breaker.record_success()
+        return result
+
+
+class BreakerRegistry:
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0) -> CircuitBreaker:
+        with self._lock:
+            if name not in self._breakers:
+                self._breakers[name] = CircuitBreaker(name, failure_threshold, reset_timeout)
+            return self._breakers[name]
+
+    def stats(self):
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return [b.stats() for b in breakers]
+
+
+breakers = BreakerRegistry()
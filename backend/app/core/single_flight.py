@@ -0,0 +1,189 @@
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Tuple
+from sqlalchemy import create_engine, text
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one fn() per key at a time; concurrent callers share its result.
+
+    In-process coalescing always applies. With a Postgres engine, do_shared() also
+    coalesces across workers: the first worker takes a session advisory lock on the key
+    and publishes its result to the analysis_results table, and workers that find the
+    lock held wait for it and read that result instead of recomputing. The locks are
+    taken on a small AUTOCOMMIT pool of their own (max_connections per worker), and at
+    most max_waiters of those wait on other workers at once; past that a caller computes
+    for itself.
+    """
+
+    def __init__(self, name: str, wait_timeout: float = 90.0, result_ttl: float = 15.0,
+                 max_connections: int = 8, max_waiters: int = 4):
+        self.name = name
+        self.wait_timeout = wait_timeout
+        self.result_ttl = result_ttl
+        self.max_connections = max_connections
+        self._waiters = threading.BoundedSemaphore(max_waiters)
+        self._lock_engine = None
+        self._lock_engine_for = None
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+        self.coalesced_across_workers = 0
+        self.waiters_over_cap = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """(result, shared); shared is True when another caller's execution was reused."""
+        return self._coalesce(key, lambda: (self._count_execution(fn), False))
+
+    def do_shared(self, key: str, fn: Callable[[], Any], engine) -> Tuple[Any, bool]:
+        """do() across workers as well; fn() must return a JSON-serializable value."""
+        if engine is None or engine.dialect.name != "postgresql":
+            return self.do(key, fn)
+        return self._coalesce(key, lambda: self._across_workers(key, fn, engine))
+
+    def _coalesce(self, key: Hashable, run: Callable[[], Tuple[Any, bool]]) -> Tuple[Any, bool]:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            if not call.done.wait(self.wait_timeout):
+                # The leader is stuck well past its own dependency deadlines; stop waiting on it
+                return run()
+            if call.error is not None:
+                raise call.error
+            with self._lock:
+                self.coalesced += 1
+            return call.result, True
+        try:
+            call.result, shared = run()
+            return call.result, shared
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _count_execution(self, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.executions += 1
+        return fn()
+
+    def _lock_pool(self, engine):
+        """Dedicated AUTOCOMMIT engine for the advisory locks, so a leader never holds an
+        app-pool connection (or an open transaction) while fn() runs."""
+        with self._lock:
+            if self._lock_engine is None or self._lock_engine_for is not engine:
+                self._lock_engine = create_engine(
+                    engine.url,
+                    isolation_level="AUTOCOMMIT",
+                    pool_size=self.max_connections,
+                    max_overflow=0,
+                    pool_timeout=1,
+                    pool_pre_ping=True,
+                )
+                self._lock_engine_for = engine
+            return self._lock_engine
+
+    def _across_workers(self, key: str, fn: Callable[[], Any], engine) -> Tuple[Any, bool]:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        lock_id = int.from_bytes(bytes.fromhex(digest[:16]), "big", signed=True)
+        try:
+            conn = self._lock_pool(engine).connect()
+        except Exception as e:
+            print(f"Single-flight {self.name}: no lock connection, coalescing in-process only: {str(e)}")
+            return self._count_execution(fn), False
+        # The session-level advisory lock lives on this connection until it is released
+        with conn:
+            cached = self._read(conn, digest)
+            if cached is not None:
+                return self._shared(cached)
+            if conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": lock_id}).scalar():
+                try:
+                    # A worker may have published and released between the read and the lock
+                    cached = self._read(conn, digest)
+                    if cached is not None:
+                        return self._shared(cached)
+                    result = self._count_execution(fn)
+                    self._write(conn, digest, result)
+                    return result, False
+                finally:
+                    try:
+                        conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": lock_id})
+                    except Exception:
+                        # Closing the session is what releases the lock now
+                        conn.invalidate()
+            # Another worker is computing this key; block until it releases the lock,
+            # unless this worker already has max_waiters connections parked on other keys
+            if not self._waiters.acquire(blocking=False):
+                with self._lock:
+                    self.waiters_over_cap += 1
+                return self._count_execution(fn), False
+            try:
+                conn.execute(text(f"SET lock_timeout = '{int(self.wait_timeout * 1000)}ms'"))
+                conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": lock_id})
+                conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": lock_id})
+            except Exception as e:
+                print(f"Single-flight {self.name}: gave up waiting on another worker: {str(e)}")
+            finally:
+                self._waiters.release()
+            cached = self._read(conn, digest)
+            if cached is not None:
+                return self._shared(cached)
+            # The other worker failed (or its result already expired): compute here
+            return self._count_execution(fn), False
+
+    def _shared(self, result: Any) -> Tuple[Any, bool]:
+        with self._lock:
+            self.coalesced_across_workers += 1
+        return result, True
+
+    def _read(self, conn, digest: str):
+        row = conn.execute(
+            text("SELECT result FROM analysis_results WHERE key = :key AND created_at >= :since"),
+            {"key": digest, "since": datetime.utcnow() - timedelta(seconds=self.result_ttl)}
+        ).first()
+        if row is None:
+            return None
+        return json.loads(row[0]) if isinstance(row[0], str) else row[0]
+
+    def _write(self, conn, digest: str, result: Any):
+        try:
+            now = datetime.utcnow()
+            conn.execute(text("DELETE FROM analysis_results WHERE created_at < :before"),
+                         {"before": now - timedelta(seconds=self.result_ttl)})
+            conn.execute(
+                text("INSERT INTO analysis_results (key, result, created_at) VALUES (:key, CAST(:result AS JSON), :now) "
+                     "ON CONFLICT (key) DO UPDATE SET result = EXCLUDED.result, created_at = EXCLUDED.created_at"),
+                {"key": digest, "result": json.dumps(result, default=str), "now": now}
+            )
+        except Exception as e:
+            # Waiting workers will simply compute for themselves
+            print(f"Single-flight {self.name}: could not publish result: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            coalesced = self.coalesced + self.coalesced_across_workers
+            requests = self.executions + coalesced
+            return {
+                "name": self.name,
+                "in_flight": len(self._calls),
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "coalesced_across_workers": self.coalesced_across_workers,
+                "waiters_over_cap": self.waiters_over_cap,
+                "dedup_rate": round(coalesced / requests, 4) if requests else 0.0,
+            }
@@ -1,2 +1,5 @@
 from .user import get_user_by_id, get_user_by_email, get_user_by_firebase_id, create_user, update_user, update_user_approval, delete_user
-from .property import get_all_properties, get_property_by_id, create_property, update_property, delete_property
\ No newline at end of file
+from .user import get_user_by_id_async, get_user_by_email_async, get_user_by_firebase_id_async
+from .property import get_all_properties, get_property_by_id, create_property, update_property, delete_property
+from .property import get_all_properties_async, get_property_by_id_async
+from .market import get_market_stats, refresh_market_stats, refresh_market_stats_for
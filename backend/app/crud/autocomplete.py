@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.cache import invalidation_bus
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.property import Property
+from app.crud.user import get_favorite_counts
+from app.utils.address_index import AddressIndex, build_snapshot
+
+LOAD_BATCH_SIZE = 10_000
+
+
+def address_label(values: Dict[str, Any]) -> Optional[str]:
+    """Display address for a property's address columns (formatted_address when present)."""
+    if values.get("formatted_address"):
+        return values["formatted_address"]
+    region = " ".join(v for v in (values.get("state"), values.get("zip_code")) if v)
+    parts = [values.get("address_line1"), values.get("address_line2"), values.get("city"), region]
+    return ", ".join(p for p in parts if p) or None
+
+
+def iter_address_entries(db: Session) -> Iterator[Tuple[int, str, int]]:
+    """(property id, display address, popularity) for every property, streamed in batches."""
+    # Popularity: how many users have saved each property
+    popularity = get_favorite_counts(db)
+    stmt = select(
+        Property.id, Property.formatted_address, Property.address_line1, Property.address_line2,
+        Property.city, Property.state, Property.zip_code
+    ).execution_options(yield_per=LOAD_BATCH_SIZE)
+    for row in db.execute(stmt):
+        label = address_label(row._mapping)
+        if label:
+            yield row.id, label, popularity.get(row.id, 0)
+
+
+def write_address_snapshot(path: str = settings.AUTOCOMPLETE_SNAPSHOT_PATH):
+    """Build a snapshot from the properties table and write it to path for the workers to map.
+
+    Run from scripts/build_address_index.py (on a schedule), never in a web worker.
+    """
+    built_at = time.time()
+    db = SessionLocal()
+    try:
+        snapshot = build_snapshot(iter_address_entries(db), settings.AUTOCOMPLETE_MAX_ENTRIES, built_at)
+    finally:
+        db.close()
+    snapshot.write(path)
+    return snapshot
+
+
+def load_address_snapshot() -> bool:
+    """Map the latest snapshot file if it changed; False when there is none yet."""
+    path = settings.AUTOCOMPLETE_SNAPSHOT_PATH
+    if not os.path.exists(path):
+        return False
+    try:
+        return address_index.open(path)
+    except Exception as e:
+        print(f"Address index load failed, autocomplete keeps its current snapshot: {str(e)}")
+        return False
+
+
+def _watch_address_snapshot():
+    while True:
+        load_address_snapshot()
+        time.sleep(settings.AUTOCOMPLETE_RELOAD_SECONDS)
+
+
+def watch_address_snapshot_in_background():
+    """Load the snapshot file now and whenever the builder replaces it."""
+    threading.Thread(target=_watch_address_snapshot, name="address-index-watch", daemon=True).start()
+
+
+address_index = AddressIndex()
+
+
+def _on_property_write(payload: Dict[str, Any]):
+    search_values = payload.get("search_values")
+    if search_values is None:
+        address_index.remove(payload["id"])
+    else:
+        address_index.upsert(payload["id"], address_label(search_values))
+
+
+invalidation_bus.subscribe("property_write", _on_property_write)
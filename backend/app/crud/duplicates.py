@@ -0,0 +1,122 @@
+from itertools import groupby
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import and_, func, or_, select, text
+from sqlalchemy.orm import Session
+from app.models.property import Property
+from app.utils.dedup import blocking_key, choose_survivor, find_duplicates_in, merge_values
+
+# Columns the duplicate detector compares; enough to block and match without the JSON blobs
+MATCH_FIELDS = ("id", "formatted_address", "address_line1", "address_line2", "zip_code",
+                "assessor_id", "latitude", "longitude")
+# Never copied from a duplicate onto the surviving row (the survivor keeps its own address,
+# so a unit-less row does not pick up one duplicate's unit number)
+MERGE_EXCLUDED_FIELDS = ("id", "updated_at", "geohash", "city_key", "state_key", "property_type_key",
+                         "formatted_address", "address_line1", "address_line2")
+AUDIT_BATCH_SIZE = 5000
+
+
+def find_near_duplicates(db: Session, record: Property) -> List[Tuple[Property, str]]:
+    """Stored properties that duplicate a new (unsaved) Property, with the matching rule.
+
+    Candidates come from indexed lookups on the record's 5-digit ZIP (ZIP+4 rows
+    included) and assessor ID, narrowed in SQL to its street number and compared on
+    MATCH_FIELDS only; just the matches are loaded as full rows.
+    """
+    key = blocking_key(record)
+    clauses = []
+    if key:
+        zip_code, number = key
+        clauses.append(and_(
+            func.left(Property.zip_code, 5) == zip_code,
+            # A superset of the block ("12" also finds "123 ..."); blocking_key decides below
+            func.ltrim(func.coalesce(func.nullif(Property.address_line1, ""), Property.formatted_address))
+            .ilike(f"{number}%"),
+        ))
+    if record.assessor_id:
+        clauses.append(Property.assessor_id == record.assessor_id)
+    if not clauses:
+        return []
+    rows = db.execute(select(*[getattr(Property, name) for name in MATCH_FIELDS]).where(or_(*clauses)))
+    candidates = [
+        c for c in (dict(row._mapping) for row in rows)
+        if (record.assessor_id and c["assessor_id"] == record.assessor_id) or (key and blocking_key(c) == key)
+    ]
+    matches = find_duplicates_in(record, candidates)
+    if not matches:
+        return []
+    full = {p.id: p for p in db.query(Property).filter(Property.id.in_([c["id"] for c, _ in matches])).all()}
+    return [(full[c["id"]], reason) for c, reason in matches if c["id"] in full]
+
+
+def mergeable_fields() -> List[str]:
+    return [c.key for c in Property.__table__.columns if c.key not in MERGE_EXCLUDED_FIELDS]
+
+
+def merge_into(survivor: Property, duplicate: Property) -> List[str]:
+    """Fill the survivor's empty fields from a duplicate; returns the names filled (not committed)."""
+    filled = merge_values(survivor, [duplicate], mergeable_fields())
+    for name, value in filled.items():
+        setattr(survivor, name, value)
+    return sorted(filled)
+
+
+def iter_duplicate_blocks(db: Session) -> Iterator[List[Dict[str, Any]]]:
+    """Blocks (same 5-digit ZIP and street number) of two or more properties, streamed ZIP by ZIP.
+
+    One ordered pass over the table; memory is bounded by the largest ZIP code.
+    """
+    stmt = (
+        select(*[getattr(Property, name) for name in MATCH_FIELDS])
+        .where(Property.zip_code.isnot(None))
+        .order_by(func.left(Property.zip_code, 5), Property.id)
+        .execution_options(yield_per=AUDIT_BATCH_SIZE)
+    )
+    rows = (dict(row._mapping) for row in db.execute(stmt))
+    # ZIP and ZIP+4 spellings of one ZIP are adjacent in this order and share a group
+    for _, zip_rows in groupby(rows, key=lambda r: r["zip_code"][:5]):
+        blocks: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for row in zip_rows:
+            key = blocking_key(row)
+            if key:
+                blocks.setdefault(key, []).append(row)
+        for block in blocks.values():
+            if len(block) > 1:
+                yield block
+
+
+def merge_duplicate_group(db: Session, property_ids: List[int]) -> Optional[Dict[str, Any]]:
+    """Keep the most complete property of a duplicate group and delete the rest.
+
+    Empty fields on the survivor are filled from the duplicates and users' favorites are
+    pointed at the survivor. Returns {"survivor", "removed", "filled"}; not committed.
+    """
+    rows = db.query(Property).filter(Property.id.in_(property_ids)).all()
+    if len(rows) < 2:
+        return None
+    fields = mergeable_fields()
+    survivor = choose_survivor(rows, fields)
+    duplicates = [r for r in rows if r.id != survivor.id]
+    filled = merge_values(survivor, duplicates, fields)
+    removed = [d.id for d in duplicates]
+    for duplicate in duplicates:
+        db.delete(duplicate)
+    # Delete first so unique columns (assessor_id) can move to the survivor
+    db.flush()
+    for name, value in filled.items():
+        setattr(survivor, name, value)
+    _repoint_favorites(db, removed, survivor.id)
+    return {"survivor": survivor.id, "removed": removed, "filled": sorted(filled)}
+
+
+def _repoint_favorites(db: Session, old_ids: List[int], new_id: int):
+    # One pass per affected user: removed ids become the survivor, and each id is kept
+    # once, in the position of its first occurrence, so a user who saved both does not
+    # count twice toward get_favorite_counts. Failures fail the merge with it.
+    db.execute(
+        text("UPDATE users SET favorite_properties = ARRAY("
+             "SELECT f.id FROM (SELECT CASE WHEN u.id = ANY(CAST(:old AS INTEGER[])) THEN :new ELSE u.id END AS id, "
+             "u.pos FROM unnest(favorite_properties) WITH ORDINALITY AS u(id, pos)) AS f "
+             "GROUP BY f.id ORDER BY min(f.pos)) "
+             "WHERE favorite_properties && CAST(:old AS INTEGER[])"),
+        {"old": list(old_ids), "new": new_id}
+    )
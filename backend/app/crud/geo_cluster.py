@@ -0,0 +1,121 @@
+import math
+from typing import Any, Dict, Optional
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.orm import Session
+from app.models.geo_cluster import (
+    GeoCluster, CLUSTER_PRECISIONS, STORED_CLUSTER_PRECISIONS, UNPRICED_BUCKET, apply_cluster_deltas, bucket_price,
+    cluster_deltas
+)
+from app.models.property import Property
+from app.utils.geo import BBox, count_cells, covering_ranges, geohash_bounds, geohash_cell_size
+
+# Target cluster cell width as a fraction of a 256px map tile at the requested zoom
+CLUSTER_CELL_TILE_FRACTION = 0.25
+# Coarsen the precision rather than return more cells than this for one viewport
+MAX_CLUSTER_CELLS = 2048
+REBUILD_BATCH_SIZE = 5000
+
+
+def precision_for_zoom(zoom: int) -> int:
+    """Cluster precision whose cell width is closest to the target width at a web-map zoom level."""
+    target = 360.0 / 2 ** zoom * CLUSTER_CELL_TILE_FRACTION
+    return min(CLUSTER_PRECISIONS, key=lambda p: abs(math.log(geohash_cell_size(p)[1] / target)))
+
+
+def _intersects(a: BBox, b: BBox) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _median_price(buckets: Dict[int, int]) -> Optional[float]:
+    priced = sorted((bucket, count) for bucket, count in buckets.items() if bucket != UNPRICED_BUCKET)
+    total = sum(count for _, count in priced)
+    if not total:
+        return None
+    seen = 0
+    for bucket, count in priced:
+        seen += count
+        if seen * 2 >= total:
+            return round(bucket_price(bucket), -2)
+
+
+def get_clusters(db: Session, bbox: BBox, zoom: int) -> Dict[str, Any]:
+    """Property clusters for a map viewport: count, centroid and median sale price per cell.
+
+    Reads the precomputed geo_clusters rows for the viewport's cells with one range scan
+    on the (geohash_precision, cell, price_bucket) primary key; precisions below the
+    stored ones are summed from the coarsest stored rows by cell prefix. Median prices
+    come from log-spaced bucket counts, so they are approximate (about +-5%).
+    """
+    precision = precision_for_zoom(zoom)
+    while precision > 1 and count_cells(bbox, precision) > MAX_CLUSTER_CELLS:
+        precision -= 1
+
+    ranges = [
+        and_(GeoCluster.cell >= lower, GeoCluster.cell < upper) if upper else GeoCluster.cell >= lower
+        for lower, upper in covering_ranges(bbox, max_precision=precision)
+    ]
+    if precision in STORED_CLUSTER_PRECISIONS:
+        query = (
+            select(GeoCluster.cell, GeoCluster.price_bucket, GeoCluster.property_count,
+                   GeoCluster.latitude_sum, GeoCluster.longitude_sum)
+            .where(GeoCluster.geohash_precision == precision, GeoCluster.property_count > 0, or_(*ranges))
+        )
+    else:
+        cell = func.substr(GeoCluster.cell, 1, precision)
+        query = (
+            select(cell, GeoCluster.price_bucket, func.sum(GeoCluster.property_count),
+                   func.sum(GeoCluster.latitude_sum), func.sum(GeoCluster.longitude_sum))
+            .where(GeoCluster.geohash_precision == STORED_CLUSTER_PRECISIONS[0],
+                   GeoCluster.property_count > 0, or_(*ranges))
+            .group_by(cell, GeoCluster.price_bucket)
+        )
+    rows = db.execute(query).all()
+
+    cells: Dict[str, Dict[str, Any]] = {}
+    for cell, bucket, count, lat_sum, lon_sum in rows:
+        entry = cells.get(cell)
+        if entry is None:
+            # The covering ranges are coarser than the cells; skip cells outside the viewport
+            if not _intersects(geohash_bounds(cell), bbox):
+                continue
+            entry = cells[cell] = {"count": 0, "lat_sum": 0.0, "lon_sum": 0.0, "buckets": {}}
+        entry["count"] += count
+        entry["lat_sum"] += lat_sum
+        entry["lon_sum"] += lon_sum
+        entry["buckets"][bucket] = count
+
+    clusters = [
+        {
+            "cell": cell,
+            "count": entry["count"],
+            "latitude": round(entry["lat_sum"] / entry["count"], 6),
+            "longitude": round(entry["lon_sum"] / entry["count"], 6),
+            "median_price": _median_price(entry["buckets"]),
+        }
+        for cell, entry in sorted(cells.items())
+    ]
+    return {"precision": precision, "total": sum(c["count"] for c in clusters), "clusters": clusters}
+
+
+def rebuild_geo_clusters(connection, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """Recompute every geo_clusters row from the properties table; returns the rows written.
+
+    Incremental maintenance happens in the Property write listeners; this is for repairing
+    drift after writes that bypassed the ORM. Properties are read in id-ordered pages and
+    each page's merged deltas are added onto the table, so memory stays bounded by the page.
+    """
+    connection.execute(delete(GeoCluster))
+    last_id = 0
+    while True:
+        page = connection.execute(
+            select(Property.id, Property.latitude, Property.longitude, Property.last_sale_price)
+            .where(Property.id > last_id, Property.latitude.isnot(None), Property.longitude.isnot(None))
+            .order_by(Property.id).limit(batch_size)
+        ).all()
+        if not page:
+            break
+        apply_cluster_deltas(connection, [
+            delta for row in page for delta in cluster_deltas(row.latitude, row.longitude, row.last_sale_price, 1)
+        ])
+        last_id = page[-1].id
+    return connection.execute(select(func.count()).select_from(GeoCluster)).scalar()
@@ -0,0 +1,375 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional, Dict, Any, Callable, Iterable, List, Tuple
+from sqlalchemy import Float, and_, cast, func, select, text
+from sqlalchemy.orm import Session
+from app.core.cache import invalidation_bus
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud.sales import MIN_HOLD_DAYS
+from app.models.market import MarketStats
+from app.models.property import Property
+from app.models.refresh import PropertyRefresh
+from app.models.sale import PropertySale
+
+# Minimum number of priced sales before a region's medians are trusted by the heuristics.
+MIN_SAMPLE_SIZE = 5
+
+# Trend thresholds on year-over-year change in median price/sqft.
+TREND_UP_PCT = 3.0
+TREND_DOWN_PCT = -3.0
+
+# Resales within this many years feed the regional appreciation rate
+APPRECIATION_WINDOW_YEARS = 10
+
+
+def county_key_for(state_fips: Optional[str], county_fips: Optional[str]) -> Optional[str]:
+    if not state_fips or not county_fips:
+        return None
+    return f"{state_fips}{county_fips}"
+
+
+def regions_for(properties: Iterable[Any]) -> Tuple[set, set]:
+    """Collect the ZIP codes and county keys touched by a set of properties (ORM objects or dicts)."""
+    zip_codes, county_keys = set(), set()
+    for p in properties:
+        get = p.get if isinstance(p, dict) else lambda k, _p=p: getattr(_p, k, None)
+        if get("zip_code"):
+            zip_codes.add(get("zip_code"))
+        key = county_key_for(get("state_fips"), get("county_fips"))
+        if key:
+            county_keys.add(key)
+    return zip_codes, county_keys
+
+
+def _region_appreciation(db: Session, sales_filter, by_property: bool = False) -> Optional[float]:
+    """Median annualized appreciation (percent) across the region's repeat sales.
+
+    A repeat sale is a priced sale paired with the same property's previous priced sale,
+    at least MIN_HOLD_DAYS earlier; pairing uses a window over property_sales, so no
+    sale_history JSON is parsed. `by_property` joins properties for filters on its columns.
+    """
+    window = {"partition_by": PropertySale.property_id, "order_by": PropertySale.sale_date}
+    pairs = select(
+        PropertySale.sale_date,
+        PropertySale.price,
+        func.lag(PropertySale.sale_date).over(**window).label("prev_date"),
+        func.lag(PropertySale.price).over(**window).label("prev_price"),
+    ).where(PropertySale.price > 0, sales_filter)
+    if by_property:
+        pairs = pairs.join(Property, Property.id == PropertySale.property_id)
+    pairs = pairs.subquery()
+
+    held_days = cast(pairs.c.sale_date - pairs.c.prev_date, Float)
+    rate = func.power(pairs.c.price / pairs.c.prev_price, 365.25 / held_days) - 1.0
+    since = date.today() - timedelta(days=round(365.25 * APPRECIATION_WINDOW_YEARS))
+    count, median = db.query(func.count(), func.percentile_cont(0.5).within_group(rate)).filter(
+        pairs.c.prev_price > 0, held_days >= MIN_HOLD_DAYS, pairs.c.sale_date >= since
+    ).one()
+    if not median or count < MIN_SAMPLE_SIZE:
+        return None
+    return round(float(median) * 100.0, 2)
+
+
+def _region_rent_per_sqft(db: Session, region_filter) -> Optional[float]:
+    """Median monthly rent per sqft across the region's stored RentCast rent estimates."""
+    since = datetime.utcnow() - timedelta(days=settings.RENTCAST_REFRESH_MAX_AGE_DAYS)
+    count, median = db.query(
+        func.count(),
+        func.percentile_cont(0.5).within_group(PropertyRefresh.rent / Property.square_footage),
+    ).join(Property, Property.id == PropertyRefresh.property_id).filter(
+        region_filter,
+        PropertyRefresh.rent > 0,
+        Property.square_footage > 0,
+        PropertyRefresh.refreshed_at >= since,
+    ).one()
+    if not median or count < MIN_SAMPLE_SIZE:
+        return None
+    return round(float(median), 3)
+
+
+def _compute_region(db: Session, region_filter) -> Dict[str, Any]:
+    today = date.today()
+    one_year_ago = today - timedelta(days=365)
+    two_years_ago = today - timedelta(days=730)
+
+    priced = and_(Property.last_sale_price > 0, Property.square_footage > 0)
+    ppsf = Property.last_sale_price / Property.square_footage
+    recent = Property.last_sale_date >= one_year_ago
+    prior = and_(Property.last_sale_date >= two_years_ago, Property.last_sale_date < one_year_ago)
+
+    row = db.query(
+        func.count(Property.id),
+        func.max(Property.state),
+        func.count(Property.id).filter(priced),
+        func.percentile_cont(0.5).within_group(ppsf).filter(priced),
+        func.count(Property.id).filter(recent),
+        func.percentile_cont(0.5).within_group(ppsf).filter(and_(priced, recent)),
+        func.percentile_cont(0.5).within_group(ppsf).filter(and_(priced, prior)),
+    ).filter(region_filter).one()
+
+    count, state, priced_count, median_ppsf, sales_12m, recent_ppsf, prior_ppsf = row
+
+    trend_pct = None
+    trend = None
+    if recent_ppsf and prior_ppsf:
+        trend_pct = round((float(recent_ppsf) - float(prior_ppsf)) / float(prior_ppsf) * 100.0, 2)
+        if trend_pct >= TREND_UP_PCT:
+            trend = "Up"
+        elif trend_pct <= TREND_DOWN_PCT:
+            trend = "Down"
+        else:
+            trend = "Stable"
+
+    return {
+        "state": state,
+        "property_count": count,
+        "median_price_per_sqft": round(float(median_ppsf), 2) if median_ppsf and priced_count >= MIN_SAMPLE_SIZE else None,
+        "median_rent_per_sqft": _region_rent_per_sqft(db, region_filter),
+        "sales_last_12_months": sales_12m,
+        "sales_per_month": round(sales_12m / 12.0, 2),
+        "price_trend_pct": trend_pct,
+        "neighborhood_trend": trend,
+    }
+
+
+def _upsert_region(db: Session, region_type: str, region_key: str, values: Dict[str, Any]):
+    """Insert or overwrite one region's row in a single statement, so concurrent refreshes
+    of the same region cannot collide on the unique (region_type, region_key) constraint."""
+    columns = list(values)
+    db.execute(
+        text(
+            f"INSERT INTO market_stats (region_type, region_key, updated_at, {', '.join(columns)}) "
+            f"VALUES (:region_type, :region_key, :updated_at, {', '.join(':' + c for c in columns)}) "
+            "ON CONFLICT (region_type, region_key) DO UPDATE SET updated_at = EXCLUDED.updated_at, "
+            + ", ".join(f"{c} = EXCLUDED.{c}" for c in columns)
+        ),
+        {"region_type": region_type, "region_key": region_key, "updated_at": datetime.utcnow(), **values},
+    )
+
+
+def refresh_market_stats(db: Session, zip_codes: Iterable[str] = (), county_keys: Iterable[str] = ()) -> int:
+    """Recompute stats for just the given regions (a few indexed aggregates per region).
+
+    Property writes do not call this directly; they queue their regions on a
+    RegionRefreshQueue. Failures are logged and swallowed: stats are derived data.
+    Callers broadcast "market_stats_refresh" once dependent data is updated too.
+    """
+    refreshed = 0
+    try:
+        for zip_code in set(zip_codes):
+            values = _compute_region(db, Property.zip_code == zip_code)
+            values["annual_appreciation_pct"] = _region_appreciation(db, PropertySale.zip_code == zip_code)
+            _upsert_region(db, "zip", zip_code, values)
+            refreshed += 1
+        for key in set(county_keys):
+            state_fips, county_fips = key[:2], key[2:]
+            region_filter = and_(Property.state_fips == state_fips, Property.county_fips == county_fips)
+            values = _compute_region(db, region_filter)
+            values["annual_appreciation_pct"] = _region_appreciation(db, region_filter, by_property=True)
+            _upsert_region(db, "county", key, values)
+            refreshed += 1
+        if refreshed:
+            db.commit()
+    except Exception as e:
+        print(f"Market stats refresh failed: {str(e)}")
+        db.rollback()
+        return 0
+    return refreshed
+
+
+def refresh_market_stats_for(db: Session, properties: Iterable[Any]) -> int:
+    zip_codes, county_keys = regions_for(properties)
+    return refresh_market_stats(db, zip_codes, county_keys)
+
+
+def get_market_stats(db: Session, region_type: str, region_key: str) -> Optional[MarketStats]:
+    return db.query(MarketStats).filter(
+        MarketStats.region_type == region_type,
+        MarketStats.region_key == region_key
+    ).first()
+
+
+def get_recent_sales(db: Session, zip_code: str, exclude_id: Optional[int] = None, limit: int = 5) -> List[Property]:
+    query = db.query(Property).filter(
+        Property.zip_code == zip_code,
+        Property.last_sale_price > 0,
+        Property.last_sale_date.isnot(None)
+    )
+    if exclude_id is not None:
+        query = query.filter(Property.id != exclude_id)
+    return query.order_by(Property.last_sale_date.desc()).limit(limit).all()
+
+
+class RegionRefreshQueue:
+    """Coalesces the regions touched by property writes and refreshes them off the request path.
+
+    enqueue() only adds region keys to an in-memory set. A daemon thread, started on the
+    first enqueue, waits `delay` seconds so a burst of writes to one ZIP costs a single
+    refresh, then hands the pending regions to `refresh(db, zip_codes, county_keys)`.
+    """
+
+    def __init__(self, refresh: Callable[[Session, set, set], Any], delay: float = 30.0):
+        self.refresh = refresh
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._zip_codes: set = set()
+        self._county_keys: set = set()
+        self._thread = None
+        self.refreshed = 0
+        self.failures = 0
+
+    def enqueue(self, zip_codes: Iterable[str] = (), county_keys: Iterable[str] = ()):
+        with self._lock:
+            self._zip_codes.update(z for z in zip_codes if z)
+            self._county_keys.update(k for k in county_keys if k)
+            if not self._zip_codes and not self._county_keys:
+                return
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="market-stats-refresh", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def enqueue_for(self, properties: Iterable[Any]):
+        self.enqueue(*regions_for(properties))
+
+    def drain(self) -> int:
+        """Refresh every pending region now; returns the number of regions handed to refresh."""
+        with self._lock:
+            zip_codes, self._zip_codes = self._zip_codes, set()
+            county_keys, self._county_keys = self._county_keys, set()
+        if not zip_codes and not county_keys:
+            return 0
+        db = SessionLocal()
+        try:
+            self.refresh(db, zip_codes, county_keys)
+            self.refreshed += len(zip_codes) + len(county_keys)
+        except Exception as e:
+            # Retried with the next batch rather than on a timer, so a broken DB is not hammered
+            print(f"Region refresh failed, requeueing {len(zip_codes) + len(county_keys)} regions: {str(e)}")
+            db.rollback()
+            self.failures += 1
+            with self._lock:
+                self._zip_codes |= zip_codes
+                self._county_keys |= county_keys
+            return 0
+        finally:
+            db.close()
+        return len(zip_codes) + len(county_keys)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            threading.Event().wait(self.delay)
+            self.drain()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._zip_codes) + len(self._county_keys)
+        return {"name": "market_stats_refresh", "pending_regions": pending,
+                "refreshed_regions": self.refreshed, "failures": self.failures}
+
+
+class MarketStatsSnapshot:
+    """In-memory copy of the whole market_stats table for the estimation heuristics.
+
+    The table has one row per ZIP/county, so it fits comfortably in memory. Only the
+    first read in a process loads it inline. After `ttl` seconds, or once a
+    "market_stats_refresh" event from any worker invalidates it, a background thread
+    reloads it while readers keep getting the previous copy.
+    """
+
+    def __init__(self, ttl: float = 900):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._first_load = threading.Lock()
+        self._data: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None
+        self._loaded_at = 0.0
+        self._stale = False
+        self._reloading = False
+
+    def invalidate(self):
+        with self._lock:
+            self._stale = True
+
+    def _load(self) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            rows = db.query(MarketStats).all()
+            return {
+                (r.region_type, r.region_key): {
+                    "median_price_per_sqft": r.median_price_per_sqft,
+                    "median_rent_per_sqft": r.median_rent_per_sqft,
+                    "neighborhood_trend": r.neighborhood_trend,
+                    "price_trend_pct": r.price_trend_pct,
+                    "annual_appreciation_pct": r.annual_appreciation_pct,
+                }
+                for r in rows
+            }
+        finally:
+            db.close()
+
+    def _reload(self):
+        try:
+            data = self._load()
+        except Exception as e:
+            print(f"Could not load market stats, keeping the previous copy: {str(e)}")
+            data = None
+        with self._lock:
+            if data is not None or self._data is None:
+                self._data = data or {}
+            # A failed load is retried after the next ttl, not on every read
+            self._loaded_at = time.monotonic()
+            self._reloading = False
+
+    def reload(self):
+        """Reload inline, for callers that need their own refresh visible right away."""
+        with self._lock:
+            self._reloading = True
+            self._stale = False
+        self._reload()
+
+    def get(self, region_type: str, region_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not region_key:
+            return None
+        if self._data is None:
+            with self._first_load:
+                if self._data is None:
+                    self._reload()
+        with self._lock:
+            data = self._data
+            expired = time.monotonic() - self._loaded_at > self.ttl
+            start = not self._reloading and (self._stale or expired)
+            if start:
+                self._reloading = True
+                self._stale = False
+        if start:
+            threading.Thread(target=self._reload, name="market-stats-reload", daemon=True).start()
+        return data.get((region_type, region_key))
+
+
+market_stats_cache = MarketStatsSnapshot()
+
+
+def _on_market_stats_refresh(payload: Dict[str, Any]):
+    market_stats_cache.invalidate()
+
+
+invalidation_bus.subscribe("market_stats_refresh", _on_market_stats_refresh)
+
+
+def lookup_market_stat(property_data: Dict[str, Any], field: str) -> Optional[float]:
+    """Most local known value of `field` for a property: its ZIP first, then its county."""
+    zip_code = property_data.get("zipCode") or property_data.get("zip_code")
+    county_key = county_key_for(
+        property_data.get("stateFips") or property_data.get("state_fips"),
+        property_data.get("countyFips") or property_data.get("county_fips"),
+    )
+    for region_type, key in (("zip", zip_code), ("county", county_key)):
+        stats = market_stats_cache.get(region_type, key)
+        if stats and stats.get(field):
+            return float(stats[field])
+    return None
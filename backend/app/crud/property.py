@@ -1,34 +1,374 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
-from app.models.property import Property
-from app.schemas.property import PropertyCreate, PropertyUpdate
-from typing import Optional, List
+import json
+import math
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import or_, and_, func, select, tuple_, literal, update
+from app.core.cache import ReadThroughCache, invalidation_bus
+from app.core.http_cache import etag_for
+from app.crud.market import RegionRefreshQueue, market_stats_cache, refresh_market_stats, regions_for
+from app.crud.refresh import get_refreshed_estimates_for
+from app.models.property import Property, normalize_filter_value
+from app.utils.geo import BBox, covering_ranges, haversine_miles, radius_bbox
+from app.schemas.property import PropertyBase, PropertyCreate, PropertyUpdate, PropertySummary, \
+    dump_property_fields
+from typing import Optional, List, Iterable, Iterator, Dict, Any, Tuple
 
-def get_all_properties(
-    db: Session,
-    skip: int = 0,
-    limit: int = 100,
+# Large JSON blobs that list views never need; only loaded for detail/analysis.
+HEAVY_JSON_FIELDS = ("features", "hoa", "owners", "tax_assessments", "property_taxes", "sale_history")
+
+# Default projection for list/search views (mirrors PropertySummary).
+SUMMARY_FIELDS = tuple(PropertySummary.model_fields.keys())
+
+# Facet results keyed by the normalized filter set; cleared on every property write.
+facet_cache = ReadThroughCache("property_facets", maxsize=512, ttl=600)
+
+# Serialized GET /properties/{id} bodies keyed by id; evicted per id on writes.
+detail_cache = ReadThroughCache("property_detail", maxsize=4096, ttl=900)
+
+# Serialized search results keyed by (query, limit, fields); evicted when a write
+# touches a returned row or could make a new row match the query.
+search_cache = ReadThroughCache("property_search", maxsize=2048, ttl=300)
+
+# Columns searched by find_properties_by_address.
+SEARCH_FIELDS = ("formatted_address", "address_line1", "address_line2", "city", "state", "zip_code")
+
+# Derived index columns maintained by the model; never part of API payloads.
+INTERNAL_FIELDS = ("city_key", "state_key", "property_type_key", "geohash")
+
+PROPERTY_FIELDS = tuple(c.key for c in Property.__table__.columns if c.key not in INTERNAL_FIELDS)
+
+# Every non-JSON column; default column set for bulk export.
+SCALAR_FIELDS = tuple(f for f in PROPERTY_FIELDS if f not in HEAVY_JSON_FIELDS)
+
+# Stored default-assumption investment metrics (see refresh_investment_metrics).
+METRIC_FIELDS = ("estimated_value", "estimated_monthly_rent", "annual_noi", "cap_rate", "rent_to_value")
+
+# Screener ranking metrics: API name -> column.
+RANKING_METRICS = {"cap_rate": "cap_rate", "noi": "annual_noi", "rent_to_value": "rent_to_value"}
+
+
+def parse_property_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated `fields=` value into validated column names.
+
+    Accepts either column names (last_sale_price) or API aliases (lastSalePrice).
+    Returns None when no projection was requested. Raises ValueError on unknown fields.
+    """
+    if not fields or not fields.strip():
+        return None
+    aliases = {f.alias: name for name, f in PropertyBase.model_fields.items() if f.alias}
+    selected = ["id"]
+    for raw in fields.split(","):
+        name = raw.strip()
+        if not name:
+            continue
+        name = aliases.get(name, name)
+        if name not in PROPERTY_FIELDS:
+            raise ValueError(f"Unknown property field: {raw.strip()}")
+        if name not in selected:
+            selected.append(name)
+    return selected
+
+
+def _project(query, fields: Optional[List[str]]):
+    """Restrict the SELECT list to the given columns (summary columns by default)."""
+    names = fields or SUMMARY_FIELDS
+    return query.options(load_only(*[getattr(Property, name) for name in names], raiseload=True))
+
+
+def apply_property_filters(
+    query,
     city: Optional[str] = None,
     state: Optional[str] = None,
     property_type: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
-    bedrooms: Optional[int] = None
-) -> List[Property]:
-    query = db.query(Property)
+    bedrooms: Optional[int] = None,
+    max_carrying_cost: Optional[float] = None
+):
+    """Apply the shared browse filters to a Query or Select."""
+    # Exact matches on the normalized *_key columns so the composite indexes apply
     if city:
-        query = query.filter(Property.city.ilike(f"%{city}%"))
+        query = query.filter(Property.city_key == normalize_filter_value(city))
     if state:
-        query = query.filter(Property.state.ilike(f"%{state}%"))
+        query = query.filter(Property.state_key == normalize_filter_value(state))
     if property_type:
-        query = query.filter(Property.property_type.ilike(f"%{property_type}%"))
+        query = query.filter(Property.property_type_key == normalize_filter_value(property_type))
     if min_price:
         query = query.filter(Property.last_sale_price >= min_price)
     if max_price:
         query = query.filter(Property.last_sale_price <= max_price)
     if bedrooms:
         query = query.filter(Property.bedrooms == bedrooms)
-    return query.offset(skip).limit(limit).all()
+    if max_carrying_cost is not None:
+        query = query.filter(Property.monthly_carrying_cost <= max_carrying_cost)
+    return query
+
+
+def _properties_page_stmt(skip: int, limit: int, fields: Optional[List[str]], **filters):
+    stmt = apply_property_filters(_project(select(Property), fields), **filters)
+    # Stable ordering so pages (and their ETags) are deterministic
+    return stmt.order_by(Property.id).offset(skip).limit(limit)
+
+def _versions_page_stmt(skip: int, limit: int, **filters):
+    stmt = apply_property_filters(select(Property.id, Property.updated_at), **filters)
+    return stmt.order_by(Property.id).offset(skip).limit(limit)
+
+def _versions_by_ids_stmt(property_ids: List[int]):
+    return select(Property.id, Property.updated_at).where(Property.id.in_(property_ids)).order_by(Property.id)
+
+def _properties_by_ids_stmt(property_ids: List[int], fields: Optional[List[str]]):
+    return _project(select(Property), fields).where(Property.id.in_(property_ids)).order_by(Property.id)
+
+def get_all_properties(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    property_type: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    bedrooms: Optional[int] = None,
+    max_carrying_cost: Optional[float] = None,
+    fields: Optional[List[str]] = None
+) -> List[Property]:
+    stmt = _properties_page_stmt(
+        skip, limit, fields, city=city, state=state, property_type=property_type,
+        min_price=min_price, max_price=max_price, bedrooms=bedrooms,
+        max_carrying_cost=max_carrying_cost
+    )
+    return list(db.execute(stmt).scalars().all())
+
+def get_property_versions(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    property_type: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    bedrooms: Optional[int] = None,
+    max_carrying_cost: Optional[float] = None
+) -> List[tuple]:
+    """(id, updated_at) for exactly the rows get_all_properties would return."""
+    stmt = _versions_page_stmt(
+        skip, limit, city=city, state=state, property_type=property_type,
+        min_price=min_price, max_price=max_price, bedrooms=bedrooms,
+        max_carrying_cost=max_carrying_cost
+    )
+    return [tuple(row) for row in db.execute(stmt).all()]
+
+def get_property_versions_by_ids(db: Session, property_ids: List[int]) -> List[tuple]:
+    if not property_ids:
+        return []
+    return [tuple(row) for row in db.execute(_versions_by_ids_stmt(property_ids)).all()]
+
+
+def iter_property_chunks(
+    db: Session,
+    fields: List[str],
+    chunk_size: int = 5000,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    property_type: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    bedrooms: Optional[int] = None,
+    max_carrying_cost: Optional[float] = None
+) -> Iterator[List[tuple]]:
+    """Yield filtered rows (plain tuples in `fields` order) in chunks of `chunk_size`.
+
+    Uses a server-side cursor (yield_per) so memory stays flat regardless of result size.
+    """
+    stmt = select(*[getattr(Property, name) for name in fields])
+    stmt = apply_property_filters(
+        stmt, city=city, state=state, property_type=property_type,
+        min_price=min_price, max_price=max_price, bedrooms=bedrooms,
+        max_carrying_cost=max_carrying_cost
+    ).order_by(Property.id)
+    result = db.execute(stmt.execution_options(yield_per=chunk_size))
+    for partition in result.partitions():
+        yield [tuple(row) for row in partition]
+
+def get_property_facets(
+    db: Session,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    property_type: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    bedrooms: Optional[int] = None,
+    max_carrying_cost: Optional[float] = None,
+    price_bucket: float = 50000,
+    sqft_bucket: float = 250,
+    max_values: int = 50
+) -> Dict[str, Any]:
+    """Counts per state/city/type/bedrooms, price and sqft histograms and the total.
+
+    Everything comes from a single GROUPING SETS query over the filtered rows; results
+    are cached per filter set until the next property write.
+    """
+    filters = dict(
+        city=city, state=state, property_type=property_type,
+        min_price=min_price, max_price=max_price, bedrooms=bedrooms,
+        max_carrying_cost=max_carrying_cost
+    )
+    key = tuple(
+        normalize_filter_value(v) if isinstance(v, str) else v for v in filters.values()
+    ) + (price_bucket, sqft_bucket, max_values)
+    return facet_cache.get_or_load(
+        key, lambda: _compute_property_facets(db, filters, price_bucket, sqft_bucket, max_values)
+    )
+
+
+def _compute_property_facets(db, filters, price_bucket, sqft_bucket, max_values) -> Dict[str, Any]:
+    # Text facets group on the normalized *_key columns so case/spacing variants share a
+    # bucket; each bucket is labelled with one of its raw values (the smallest)
+    labels = {
+        "states": Property.state,
+        "cities": Property.city,
+        "property_types": Property.property_type,
+    }
+    dims = {
+        "states": Property.state_key,
+        "cities": Property.city_key,
+        "property_types": Property.property_type_key,
+        "bedrooms": Property.bedrooms,
+        # Bucket widths are rendered inline so SELECT and GROUP BY expressions match textually
+        "price_histogram": func.floor(Property.last_sale_price / literal(float(price_bucket), literal_execute=True)),
+        "sqft_histogram": func.floor(Property.square_footage / literal(float(sqft_bucket), literal_execute=True)),
+    }
+    exprs = list(dims.values())
+    label_exprs = [func.min(column) for column in labels.values()]
+    stmt = select(*exprs, *label_exprs, func.grouping(*exprs), func.count())
+    stmt = apply_property_filters(stmt, **filters).group_by(
+        func.grouping_sets(*[tuple_(e) for e in exprs], tuple_())
+    )
+
+    # GROUPING() sets a bit for every dimension NOT in the row's grouping set,
+    # with the first argument as the most significant bit.
+    all_bits = (1 << len(exprs)) - 1
+    set_for_mask = {all_bits ^ (1 << (len(exprs) - 1 - i)): i for i in range(len(exprs))}
+    names = list(dims.keys())
+    widths = {"price_histogram": price_bucket, "sqft_histogram": sqft_bucket}
+
+    facets: Dict[str, Any] = {name: [] for name in names}
+    facets["total"] = 0
+    for row in db.execute(stmt):
+        mask, count = row[-2], row[-1]
+        if mask == all_bits:
+            facets["total"] = count
+            continue
+        i = set_for_mask.get(mask)
+        if i is None or row[i] is None:
+            continue
+        name = names[i]
+        if name in widths:
+            low = float(row[i]) * widths[name]
+            facets[name].append({"min": low, "max": low + widths[name], "count": count})
+        elif name in labels:
+            facets[name].append({"value": row[len(exprs) + list(labels).index(name)], "count": count})
+        else:
+            facets[name].append({"value": row[i], "count": count})
+
+    for name in names:
+        if name in widths:
+            facets[name].sort(key=lambda b: b["min"])
+        else:
+            facets[name] = sorted(facets[name], key=lambda f: -f["count"])[:max_values]
+    return facets
+
+
+def get_top_properties(
+    db: Session,
+    metric: str = "cap_rate",
+    limit: int = 50,
+    overrides: Optional[Dict[str, Any]] = None,
+    fields: Optional[List[str]] = None,
+    **filters
+) -> List[Tuple[Property, Dict[str, Optional[float]]]]:
+    """Best `limit` properties by `metric` under the browse filters, with their metrics.
+
+    Default assumptions rank on the stored metric columns with an ORDER BY ... LIMIT
+    that the (state_key, metric, id) indexes serve directly. Custom expense rates
+    re-score a filtered scan in vectorized chunks and keep a bounded heap.
+    """
+    if metric not in RANKING_METRICS:
+        raise ValueError(f"Unknown ranking metric: {metric}")
+    column_name = RANKING_METRICS[metric]
+    projection = list(dict.fromkeys([*(fields or SUMMARY_FIELDS), *METRIC_FIELDS]))
+
+    if not overrides:
+        column = getattr(Property, column_name)
+        query = apply_property_filters(_project(db.query(Property), projection), **filters)
+        rows = query.filter(column.isnot(None)).order_by(column.desc(), Property.id.desc()).limit(limit).all()
+        return [(p, {name: getattr(p, name) for name in METRIC_FIELDS}) for p in rows]
+
+    # Local import: app.utils modules import app.crud (market stats), so importing them at
+    # module level here would make the two packages circular
+    from app.utils.screener import SCREEN_COLUMNS, top_k_by_scan
+    ranked = top_k_by_scan(iter_property_chunks(db, list(SCREEN_COLUMNS), **filters), column_name, limit, overrides)
+    by_id = {p.id: p for p in get_properties_by_ids(db, [pid for pid, _ in ranked], projection)}
+    return [(by_id[pid], metrics) for pid, metrics in ranked if pid in by_id]
+
+def _within_bbox(query, bbox: BBox):
+    """Restrict to rows inside bbox: geohash prefix ranges (index range scans) plus an exact lat/lon check."""
+    west, south, east, north = bbox
+    ranges = [
+        and_(Property.geohash >= lower, Property.geohash < upper) if upper else Property.geohash >= lower
+        for lower, upper in covering_ranges(bbox)
+    ]
+    return query.filter(
+        or_(*ranges),
+        Property.latitude.between(south, north),
+        Property.longitude.between(west, east)
+    )
+
+def get_properties_within(
+    db: Session,
+    bbox: BBox,
+    limit: int = 500,
+    fields: Optional[List[str]] = None,
+    **filters
+) -> List[Property]:
+    """Properties inside bbox (west, south, east, north) under the browse filters, by id."""
+    projection = list(dict.fromkeys([*(fields or SUMMARY_FIELDS), "latitude", "longitude"]))
+    query = _within_bbox(apply_property_filters(_project(db.query(Property), projection), **filters), bbox)
+    return query.order_by(Property.id).limit(limit).all()
+
+def get_properties_nearby(
+    db: Session,
+    latitude: float,
+    longitude: float,
+    radius_miles: float,
+    limit: int = 50,
+    fields: Optional[List[str]] = None,
+    **filters
+) -> List[Tuple[Property, float]]:
+    """Closest properties within radius_miles under the browse filters, as (property, miles).
+
+    The database narrows to the circle's bounding box through the geohash index and
+    orders by an equirectangular distance, which ranks like great-circle distance at
+    these scales; haversine then gives exact distances and drops the box's corners.
+    """
+    projection = list(dict.fromkeys([*(fields or SUMMARY_FIELDS), "latitude", "longitude"]))
+    query = _within_bbox(
+        apply_property_filters(_project(db.query(Property), projection), **filters),
+        radius_bbox(latitude, longitude, radius_miles)
+    )
+    kx = math.cos(math.radians(latitude))
+    dy = Property.latitude - latitude
+    dx = (Property.longitude - longitude) * kx
+    rows = query.order_by(dy * dy + dx * dx, Property.id).limit(limit).all()
+    nearby = [(p, haversine_miles(latitude, longitude, p.latitude, p.longitude)) for p in rows]
+    return sorted(((p, d) for p, d in nearby if d <= radius_miles), key=lambda item: (item[1], item[0].id))
+
+def get_properties_by_ids(db: Session, property_ids: List[int], fields: Optional[List[str]] = None) -> List[Property]:
+    if not property_ids:
+        return []
+    return list(db.execute(_properties_by_ids_stmt(property_ids, fields)).scalars().all())
 
 def get_property_by_id(db: Session, property_id: int) -> Optional[Property]:
     return db.query(Property).filter(Property.id == property_id).first()
@@ -38,49 +378,245 @@ def create_property(db: Session, property_data: PropertyCreate) -> Property:
     db.add(db_property)
     db.commit()
     db.refresh(db_property)
+    region_refresh_queue.enqueue_for([db_property])
+    refresh_investment_metrics(db, [db_property])
+    _publish_property_write(db_property.id, _search_values(db_property))
     return db_property
 
 def update_property(db: Session, property_id: int, property_data: PropertyUpdate) -> Optional[Property]:
     property_obj = get_property_by_id(db, property_id)
     if property_obj:
+        old_zips, old_counties = regions_for([property_obj])
         update_data = property_data.dict(by_alias=False, exclude_unset=True)
         for key, value in update_data.items():
             setattr(property_obj, key, value)
         db.commit()
         db.refresh(property_obj)
+        new_zips, new_counties = regions_for([property_obj])
+        region_refresh_queue.enqueue(old_zips | new_zips, old_counties | new_counties)
+        refresh_investment_metrics(db, [property_obj])
+        _publish_property_write(property_obj.id, _search_values(property_obj))
         return property_obj
     return None
 
 def delete_property(db: Session, property_id: int) -> bool:
     property_obj = get_property_by_id(db, property_id)
     if property_obj:
+        zip_codes, county_keys = regions_for([property_obj])
         db.delete(property_obj)
         db.commit()
+        region_refresh_queue.enqueue(zip_codes, county_keys)
+        _publish_property_write(property_id, None)
         return True
     return False
 
 
-def find_properties_by_address(db: Session, address_query: str, limit: int = 10) -> List[Property]:
+def refresh_regions(db: Session, zip_codes: Iterable[str] = (), county_keys: Iterable[str] = ()) -> Tuple[int, int]:
+    """Recompute the regions' market stats, then re-score every property in them.
+
+    Tells every worker to reload its stats snapshot (and drop cached property reads when
+    stored metrics changed). Returns (regions refreshed, properties re-scored).
+    """
+    zip_codes, county_keys = set(zip_codes), set(county_keys)
+    refreshed = refresh_market_stats(db, zip_codes, county_keys)
+    if not refreshed:
+        return 0, 0
+    # This worker's snapshot must see the new stats before re-scoring with them
+    market_stats_cache.reload()
+    rescored = refresh_region_metrics(db, zip_codes, county_keys)
+    invalidation_bus.publish("market_stats_refresh", {
+        "zip_codes": sorted(zip_codes), "county_keys": sorted(county_keys), "rescored": rescored
+    })
+    return refreshed, rescored
+
+
+# Regions touched by property writes, refreshed in the background a few seconds later
+region_refresh_queue = RegionRefreshQueue(refresh_regions)
+
+
+def refresh_investment_metrics(db: Session, properties: List[Property]) -> int:
+    """Recompute the stored default-assumption metrics for fully loaded Property rows.
+
+    Uses the current market stats snapshot; refresh_regions re-scores the row's whole
+    region once its queued stats refresh has run.
+    Like the stats refresh, failures are logged and never fail the triggering write.
+    """
+    from app.utils.investment_metrics import investment_metrics_for  # see get_top_properties
+    try:
+        refreshed = get_refreshed_estimates_for(db, [property_obj.id for property_obj in properties])
+        for property_obj in properties:
+            data = {name: getattr(property_obj, name) for name in SCALAR_FIELDS}
+            for name, value in investment_metrics_for(data, refreshed.get(property_obj.id)).items():
+                setattr(property_obj, name, value)
+        db.commit()
+    except Exception as e:
+        print(f"Investment metrics refresh failed: {str(e)}")
+        db.rollback()
+        return 0
+    return len(properties)
+
+
+def _region_filter(zip_codes: Iterable[str], county_keys: Iterable[str]):
+    clauses = [Property.zip_code.in_(list(zip_codes))] if zip_codes else []
+    clauses += [
+        and_(Property.state_fips == key[:2], Property.county_fips == key[2:]) for key in county_keys
+    ]
+    return or_(*clauses)
+
+
+def refresh_region_metrics(db: Session, zip_codes: Iterable[str] = (), county_keys: Iterable[str] = (),
+                           batch_size: int = 2000) -> int:
+    """Re-score the stored metrics of every property in the given regions; returns the rows changed.
+
+    Walks the regions in id-keyset pages of scalar columns (plus their stored RentCast
+    estimates) and writes only the rows whose metrics moved, one executemany UPDATE per page. Failures are logged and swallowed.
+    """
+    from app.utils.investment_metrics import investment_metrics_for  # see get_top_properties
+    zip_codes, county_keys = list(zip_codes), list(county_keys)
+    if not zip_codes and not county_keys:
+        return 0
+    region = _region_filter(zip_codes, county_keys)
+    changed = 0
+    last_id = 0
+    try:
+        while True:
+            rows = db.execute(
+                select(*[getattr(Property, name) for name in SCALAR_FIELDS])
+                .where(region, Property.id > last_id).order_by(Property.id).limit(batch_size)
+            ).mappings().all()
+            if not rows:
+                break
+            refreshed = get_refreshed_estimates_for(db, [row["id"] for row in rows])
+            params = []
+            for row in rows:
+                metrics = investment_metrics_for(dict(row), refreshed.get(row["id"]))
+                if any(row[name] != value for name, value in metrics.items()):
+                    params.append({"id": row["id"], **metrics})
+            if params:
+                db.execute(update(Property), params)
+                db.commit()
+                changed += len(params)
+            last_id = rows[-1]["id"]
+    except Exception as e:
+        print(f"Region metrics refresh failed: {str(e)}")
+        db.rollback()
+    return changed
+
+
+def _search_values(property_obj: Property) -> Dict[str, Optional[str]]:
+    return {name: getattr(property_obj, name) for name in SEARCH_FIELDS}
+
+
+def _search_may_match(query: str, values: Dict[str, Optional[str]]) -> bool:
+    """Python mirror of the ilike '%query%' search, used to decide which cached searches to evict."""
+    if "%" in query or "_" in query:
+        return True  # LIKE wildcards; evict conservatively
+    q = query.lower()
+    return any(v and q in str(v).lower() for v in values.values())
+
+
+def _publish_property_write(property_id: int, search_values: Optional[Dict[str, Optional[str]]]):
+    invalidation_bus.publish("property_write", {"id": property_id, "search_values": search_values})
+
+
+def _on_property_write(payload: Dict[str, Any]):
+    property_id = payload["id"]
+    search_values = payload.get("search_values")
+    detail_cache.invalidate(property_id)
+    search_cache.evict_where(
+        lambda key, entry: property_id in entry["ids"]
+        or (search_values is not None and _search_may_match(key[0], search_values))
+    )
+    facet_cache.clear()
+
+
+def _on_market_stats_refresh(payload: Dict[str, Any]):
+    if payload.get("rescored"):
+        detail_cache.clear()
+        search_cache.clear()
+
+
+def _on_bulk_property_write(payload: Dict[str, Any]):
+    detail_cache.clear()
+    search_cache.clear()
+    facet_cache.clear()
+
+
+invalidation_bus.subscribe("property_write", _on_property_write)
+invalidation_bus.subscribe("property_bulk_write", _on_bulk_property_write)
+invalidation_bus.subscribe("market_stats_refresh", _on_market_stats_refresh)
+
+
+def _encode(payload: Any) -> bytes:
+    return json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode("utf-8")
+
+
+def _detail_entry(property_obj: Optional[Property]) -> Optional[Dict[str, Any]]:
+    if not property_obj:
+        return None
+    version = (property_obj.id, property_obj.updated_at)
+    return {
+        "body": _encode(PropertyBase.model_validate(property_obj).model_dump(by_alias=True)),
+        "etag": etag_for([version]),
+        "last_modified": property_obj.updated_at,
+    }
+
+
+def _search_entry(results: List[Property], fields: Optional[List[str]]) -> Dict[str, Any]:
+    if fields:
+        payload = [dump_property_fields(p, fields) for p in results]
+    else:
+        payload = [PropertySummary.model_validate(p).model_dump(by_alias=True) for p in results]
+    return {"body": _encode(payload), "ids": {p.id for p in results}}
+
+
+def get_property_detail(db: Session, property_id: int) -> Optional[Dict[str, Any]]:
+    """Read-through cached detail view: {"body": JSON bytes, "etag", "last_modified"} or None."""
+    return detail_cache.get_or_load(property_id, lambda: _detail_entry(get_property_by_id(db, property_id)))
+
+
+def search_properties_cached(
+    db: Session,
+    address_query: str,
+    limit: int = 10,
+    fields: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Read-through cached search: {"body": JSON bytes, "ids": set of returned ids}."""
+    q = address_query.strip()
+    key = (q.lower(), limit, tuple(fields) if fields else None)
+
+    return search_cache.get_or_load(key, lambda: _search_entry(find_properties_by_address(db, q, limit, fields=fields), fields))
+
+
+def get_cache_stats() -> List[Dict[str, Any]]:
+    return [detail_cache.stats(), search_cache.stats(), facet_cache.stats()]
+
+
+def _address_search_stmt(q: str, limit: int, fields: Optional[List[str]]):
+    like = f"%{q}%"
+    return _project(select(Property), fields).where(
+        or_(
+            Property.formatted_address.ilike(like),
+            Property.address_line1.ilike(like),
+            Property.address_line2.ilike(like),
+            Property.city.ilike(like),
+            Property.state.ilike(like),
+            Property.zip_code.ilike(like),
+        )
+    ).limit(limit)
+
+
+def find_properties_by_address(
+    db: Session,
+    address_query: str,
+    limit: int = 10,
+    fields: Optional[List[str]] = None
+) -> List[Property]:
     """Fuzzy search across common address fields."""
     q = address_query.strip()
     if not q:
         return []
-    like = f"%{q}%"
-    return (
-        db.query(Property)
-        .filter(
-            or_(
-                Property.formatted_address.ilike(like),
-                Property.address_line1.ilike(like),
-                Property.address_line2.ilike(like),
-                Property.city.ilike(like),
-                Property.state.ilike(like),
-                Property.zip_code.ilike(like),
-            )
-        )
-        .limit(limit)
-        .all()
-    )
+    return list(db.execute(_address_search_stmt(q, limit, fields)).scalars().all())
 
 
 def find_property_by_components(
@@ -110,8 +646,8 @@ def find_property_by_components(
         .filter(
             and_(
                 func.lower(Property.address_line1) == func.lower(s),
-                func.lower(Property.city) == func.lower(c),
-                func.lower(Property.state) == func.lower(st),
+                Property.city_key == normalize_filter_value(c),
+                Property.state_key == normalize_filter_value(st),
                 func.lower(Property.zip_code) == func.lower(z),
             )
         )
@@ -136,3 +672,71 @@ def find_property_by_components(
     )
 
     return candidates[0] if candidates else None
+
+
+# Async variants for the hot read routes. They share the statement builders above, so
+# results are identical to the sync versions; writes stay on the sync Session.
+
+async def get_all_properties_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[List[str]] = None,
+    **filters
+) -> List[Property]:
+    result = await db.execute(_properties_page_stmt(skip, limit, fields, **filters))
+    return list(result.scalars().all())
+
+async def get_property_versions_async(db: AsyncSession, skip: int = 0, limit: int = 100, **filters) -> List[tuple]:
+    result = await db.execute(_versions_page_stmt(skip, limit, **filters))
+    return [tuple(row) for row in result.all()]
+
+async def get_property_versions_by_ids_async(db: AsyncSession, property_ids: List[int]) -> List[tuple]:
+    if not property_ids:
+        return []
+    result = await db.execute(_versions_by_ids_stmt(property_ids))
+    return [tuple(row) for row in result.all()]
+
+async def get_properties_by_ids_async(
+    db: AsyncSession,
+    property_ids: List[int],
+    fields: Optional[List[str]] = None
+) -> List[Property]:
+    if not property_ids:
+        return []
+    result = await db.execute(_properties_by_ids_stmt(property_ids, fields))
+    return list(result.scalars().all())
+
+async def get_property_by_id_async(db: AsyncSession, property_id: int) -> Optional[Property]:
+    result = await db.execute(select(Property).where(Property.id == property_id))
+    return result.scalars().first()
+
+async def find_properties_by_address_async(
+    db: AsyncSession,
+    address_query: str,
+    limit: int = 10,
+    fields: Optional[List[str]] = None
+) -> List[Property]:
+    q = address_query.strip()
+    if not q:
+        return []
+    result = await db.execute(_address_search_stmt(q, limit, fields))
+    return list(result.scalars().all())
+
+async def get_property_detail_async(db: AsyncSession, property_id: int) -> Optional[Dict[str, Any]]:
+    async def load():
+        return _detail_entry(await get_property_by_id_async(db, property_id))
+    return await detail_cache.get_or_load_async(property_id, load)
+
+async def search_properties_cached_async(
+    db: AsyncSession,
+    address_query: str,
+    limit: int = 10,
+    fields: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    q = address_query.strip()
+    key = (q.lower(), limit, tuple(fields) if fields else None)
+
+    async def load():
+        return _search_entry(await find_properties_by_address_async(db, q, limit, fields=fields), fields)
+    return await search_cache.get_or_load_async(key, load)
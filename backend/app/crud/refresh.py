@@ -0,0 +1,195 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.crud.user import get_favorite_counts
+from app.models.property import Property
+from app.models.refresh import PropertyRefresh
+
+# Recent views lose half their weight this often
+REFRESH_VIEW_HALF_LIFE_DAYS = 7.0
+# A property is not refreshed (or retried after a failure) more often than this
+REFRESH_MIN_AGE_DAYS = 30
+# Staleness of a never-refreshed property without a sale date
+UNKNOWN_STALENESS_DAYS = 3650
+# Interest multiplies staleness: score = staleness days * (1 + favorites * w + recent views * w)
+FAVORITE_WEIGHT = 1.0
+VIEW_WEIGHT = 0.25
+# Candidates taken from each of the stalest-by-sale, stalest-by-refresh and most-viewed lists
+CANDIDATES_PER_SOURCE = 200
+
+
+def decayed_views(views: Optional[float], updated_at: Optional[datetime], now: datetime) -> float:
+    if not views or updated_at is None:
+        return 0.0
+    days = max(0.0, (now - updated_at).total_seconds() / 86400.0)
+    return views * 0.5 ** (days / REFRESH_VIEW_HALF_LIFE_DAYS)
+
+
+def get_property_refresh(db: Session, property_id: int) -> Optional[PropertyRefresh]:
+    return db.get(PropertyRefresh, property_id)
+
+
+def _estimates(row: PropertyRefresh, now: datetime) -> Optional[Dict[str, Any]]:
+    if row.refreshed_at is None:
+        return None
+    if now - row.refreshed_at > timedelta(days=settings.RENTCAST_REFRESH_MAX_AGE_DAYS):
+        return None
+    return {
+        "value": row.value,
+        "value_low": row.value_low,
+        "value_high": row.value_high,
+        "rent": row.rent,
+        "rent_low": row.rent_low,
+        "rent_high": row.rent_high,
+        "comparables": row.rent_comparables or [],
+        "refreshed_at": row.refreshed_at,
+    }
+
+
+def get_refreshed_estimates(db: Session, property_id: int, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """Stored RentCast value/rent for a property, or None if never refreshed or older than
+    RENTCAST_REFRESH_MAX_AGE_DAYS. Never calls RentCast."""
+    row = get_property_refresh(db, property_id)
+    return _estimates(row, now or datetime.utcnow()) if row is not None else None
+
+
+def get_refreshed_estimates_for(db: Session, property_ids: Iterable[int],
+                                now: Optional[datetime] = None) -> Dict[int, Dict[str, Any]]:
+    """get_refreshed_estimates for many properties in one query, keyed by property id;
+    properties without current estimates are left out."""
+    now = now or datetime.utcnow()
+    property_ids = list(property_ids)
+    if not property_ids:
+        return {}
+    rows = db.scalars(
+        select(PropertyRefresh)
+        .where(PropertyRefresh.property_id.in_(property_ids), PropertyRefresh.refreshed_at.isnot(None))
+    )
+    estimates = {row.property_id: _estimates(row, now) for row in rows}
+    return {property_id: found for property_id, found in estimates.items() if found}
+
+
+# Decays the stored total to :now and adds the new views in the same statement, so
+# concurrent flushes from several workers each land instead of overwriting one another
+_RECORD_VIEWS = text(
+    "INSERT INTO property_refreshes (property_id, recent_views, views_updated_at) "
+    "VALUES (:property_id, :views, :now) "
+    "ON CONFLICT (property_id) DO UPDATE SET "
+    "recent_views = COALESCE(property_refreshes.recent_views * power(0.5, GREATEST(0, "
+    "extract(epoch FROM (EXCLUDED.views_updated_at - property_refreshes.views_updated_at)) "
+    "/ 86400.0 / :half_life)), 0) + EXCLUDED.recent_views, "
+    "views_updated_at = EXCLUDED.views_updated_at"
+)
+
+
+def _get_or_create(db: Session, property_id: int) -> PropertyRefresh:
+    # Insert-if-missing first: two workers creating the same row would otherwise both
+    # find nothing under FOR UPDATE and one would fail on the primary key
+    db.execute(
+        text("INSERT INTO property_refreshes (property_id, recent_views) VALUES (:property_id, 0) "
+             "ON CONFLICT (property_id) DO NOTHING"),
+        {"property_id": property_id},
+    )
+    return db.get(PropertyRefresh, property_id, with_for_update=True, populate_existing=True)
+
+
+def record_views(db: Session, counts: Dict[int, int], now: Optional[datetime] = None) -> int:
+    """Add buffered view counts to the decayed per-property totals; returns the rows written."""
+    now = now or datetime.utcnow()
+    existing = set(db.scalars(select(Property.id).where(Property.id.in_(list(counts)))))
+    if existing:
+        # Sorted, so concurrent flushes take the row locks in the same order
+        db.execute(_RECORD_VIEWS, [
+            {"property_id": property_id, "views": float(counts[property_id]), "now": now,
+             "half_life": REFRESH_VIEW_HALF_LIFE_DAYS}
+            for property_id in sorted(existing)
+        ])
+    db.commit()
+    return len(existing)
+
+
+def save_refresh(db: Session, property_id: int, value_data: Optional[Dict[str, Any]],
+                 rent_data: Optional[Dict[str, Any]], error: Optional[str] = None,
+                 now: Optional[datetime] = None) -> PropertyRefresh:
+    """Store one refresh attempt: the RentCast payloads that succeeded, and the error if any."""
+    now = now or datetime.utcnow()
+    row = _get_or_create(db, property_id)
+    row.attempted_at = now
+    row.last_error = error
+    if value_data:
+        row.value = value_data.get("price", value_data.get("value"))
+        row.value_low = value_data.get("priceRangeLow", value_data.get("valueRangeLow"))
+        row.value_high = value_data.get("priceRangeHigh", value_data.get("valueRangeHigh"))
+    if rent_data:
+        row.rent = rent_data.get("rent")
+        row.rent_low = rent_data.get("rentRangeLow")
+        row.rent_high = rent_data.get("rentRangeHigh")
+        row.rent_comparables = rent_data.get("comparables") or []
+    if value_data or rent_data:
+        row.refreshed_at = now
+    db.commit()
+    return row
+
+
+def _candidate_ids(db: Session, favorites: Dict[int, int]) -> set:
+    never_refreshed = db.scalars(
+        select(Property.id)
+        .outerjoin(PropertyRefresh, PropertyRefresh.property_id == Property.id)
+        .where(PropertyRefresh.refreshed_at.is_(None))
+        .order_by(Property.last_sale_date.asc().nullsfirst(), Property.id)
+        .limit(CANDIDATES_PER_SOURCE)
+    )
+    oldest_refreshed = db.scalars(
+        select(PropertyRefresh.property_id)
+        .where(PropertyRefresh.refreshed_at.isnot(None))
+        .order_by(PropertyRefresh.refreshed_at)
+        .limit(CANDIDATES_PER_SOURCE)
+    )
+    most_viewed = db.scalars(
+        select(PropertyRefresh.property_id)
+        .where(PropertyRefresh.recent_views > 0)
+        .order_by(PropertyRefresh.recent_views.desc())
+        .limit(CANDIDATES_PER_SOURCE)
+    )
+    return set(never_refreshed) | set(oldest_refreshed) | set(most_viewed) | set(favorites)
+
+
+def _staleness_days(refreshed_at: Optional[datetime], last_sale_date: Optional[date], now: datetime) -> float:
+    if refreshed_at is not None:
+        return (now - refreshed_at).total_seconds() / 86400.0
+    if last_sale_date is not None:
+        return float((now.date() - last_sale_date).days)
+    return float(UNKNOWN_STALENESS_DAYS)
+
+
+def rank_refresh_candidates(db: Session, limit: int = 10, now: Optional[datetime] = None) -> List[Tuple[int, float]]:
+    """(property id, score) of the properties most worth a RentCast refresh, best first.
+
+    Candidates are the stalest properties plus every favorited or recently viewed one;
+    each scores its staleness (days since the last refresh, else since the last sale)
+    scaled up by interest. Properties attempted within REFRESH_MIN_AGE_DAYS are skipped.
+    """
+    now = now or datetime.utcnow()
+    favorites = get_favorite_counts(db)
+    ids = _candidate_ids(db, favorites)
+    if not ids:
+        return []
+    rows = db.execute(
+        select(Property.id, Property.last_sale_date, PropertyRefresh.refreshed_at,
+               PropertyRefresh.attempted_at, PropertyRefresh.recent_views, PropertyRefresh.views_updated_at)
+        .outerjoin(PropertyRefresh, PropertyRefresh.property_id == Property.id)
+        .where(Property.id.in_(list(ids)))
+    ).all()
+
+    min_age = timedelta(days=REFRESH_MIN_AGE_DAYS)
+    scored = []
+    for property_id, last_sale_date, refreshed_at, attempted_at, views, views_updated_at in rows:
+        if attempted_at is not None and now - attempted_at < min_age:
+            continue
+        interest = 1.0 + FAVORITE_WEIGHT * favorites.get(property_id, 0) \
+            + VIEW_WEIGHT * decayed_views(views, views_updated_at, now)
+        scored.append((property_id, round(_staleness_days(refreshed_at, last_sale_date, now) * interest, 2)))
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return scored[:limit]
@@ -0,0 +1,86 @@
+from datetime import date
+from typing import Any, Dict, List, Optional
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+from app.models.property import Property
+from app.models.sale import PropertySale, sale_rows
+
+# Sales closer together than this say more about noise than appreciation
+MIN_HOLD_DAYS = 365
+REBUILD_BATCH_SIZE = 5000
+
+
+def annualized_change_pct(first_price: float, first_date: date, last_price: float, last_date: date) -> Optional[float]:
+    """Compound annual price change between two sales, in percent; None when under MIN_HOLD_DAYS apart."""
+    days = (last_date - first_date).days
+    if days < MIN_HOLD_DAYS or not first_price or not last_price:
+        return None
+    return round(((last_price / first_price) ** (365.25 / days) - 1.0) * 100.0, 2)
+
+
+def property_appreciation(sales: List[PropertySale]) -> Optional[float]:
+    """Annualized appreciation between a property's first and last priced sales."""
+    priced = [s for s in sales if s.price]
+    if len(priced) < 2:
+        return None
+    first, last = priced[0], priced[-1]
+    return annualized_change_pct(first.price, first.sale_date, last.price, last.sale_date)
+
+
+def get_property_sales(db: Session, property_id: int) -> List[PropertySale]:
+    """A property's sales, oldest first (an index range scan on (property_id, sale_date))."""
+    return db.scalars(
+        select(PropertySale).where(PropertySale.property_id == property_id).order_by(PropertySale.sale_date)
+    ).all()
+
+
+def get_recent_sales_in_zip(db: Session, zip_code: str, since: Optional[date] = None,
+                            limit: int = 50) -> List[Dict[str, Any]]:
+    """Most recent sales in a ZIP code with the sold property's address and size, newest first.
+
+    Reads the (zip_code, sale_date) index backwards, so the cost is proportional to `limit`.
+    """
+    query = (
+        select(PropertySale.property_id, PropertySale.sale_date, PropertySale.price,
+               Property.formatted_address, Property.property_type, Property.bedrooms,
+               Property.bathrooms, Property.square_footage)
+        .join(Property, Property.id == PropertySale.property_id)
+        .where(PropertySale.zip_code == zip_code)
+    )
+    if since is not None:
+        query = query.where(PropertySale.sale_date >= since)
+    rows = db.execute(query.order_by(PropertySale.sale_date.desc(), PropertySale.id.desc()).limit(limit)).all()
+    return [
+        {
+            **row._mapping,
+            "price_per_sqft": round(row.price / row.square_footage, 2) if row.price and row.square_footage else None,
+        }
+        for row in rows
+    ]
+
+
+def rebuild_property_sales(connection, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """Recompute every property_sales row from the properties table; returns the rows written.
+
+    Incremental maintenance happens in the Property write listeners; this is for the
+    initial backfill and for repairing drift after writes that bypassed the ORM. Properties
+    are read in id-ordered pages and each page's sales inserted before the next is read,
+    so memory stays bounded by the page.
+    """
+    connection.execute(delete(PropertySale))
+    written = 0
+    last_id = 0
+    while True:
+        page = connection.execute(
+            select(Property.id, Property.zip_code, Property.sale_history, Property.last_sale_date,
+                   Property.last_sale_price)
+            .where(Property.id > last_id).order_by(Property.id).limit(batch_size)
+        ).all()
+        if not page:
+            break
+        rows = [sale for row in page for sale in sale_rows(*row)]
+        if rows:
+            connection.execute(insert(PropertySale), rows)
+            written += len(rows)
+        last_id = page[-1].id
+    return written
@@ -1,7 +1,9 @@
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserCreate
-from typing import Optional
+from typing import Dict, Optional
 
 def get_user_by_firebase_id(db: Session, firebase_id: str) -> Optional[User]:
     return db.query(User).filter(User.firebase_id == firebase_id).first()
@@ -12,6 +14,16 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
 def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
     return db.query(User).filter(User.id == user_id).first()
 
+def get_favorite_counts(db: Session) -> Dict[int, int]:
+    """How many users have saved each favorited property; {} when unavailable (logged)."""
+    try:
+        saved = select(func.unnest(User.favorite_properties).label("property_id")).subquery()
+        return dict(db.execute(select(saved.c.property_id, func.count()).group_by(saved.c.property_id)).all())
+    except Exception as e:
+        db.rollback()
+        print(f"Favorite counts unavailable: {str(e)}")
+        return {}
+
 def create_user(db: Session, user_data: UserCreate, firebase_id: str, display_name: str = None) -> User:
     db_user = User(
         firebase_id=firebase_id,
@@ -52,3 +64,15 @@ def update_user_approval(db: Session, user_id: int, is_approved: bool) -> Option
     return user
 
 
+# Async variants for the read routes
+async def get_user_by_firebase_id_async(db: AsyncSession, firebase_id: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.firebase_id == firebase_id))
+    return result.scalars().first()
+
+async def get_user_by_email_async(db: AsyncSession, email: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
+
+async def get_user_by_id_async(db: AsyncSession, user_id: int) -> Optional[User]:
+    result = await db.execute(select(User).where(User.id == user_id))
+    return result.scalars().first()
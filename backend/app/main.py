@@ -1,15 +1,40 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import firebase_admin
 from firebase_admin import credentials
-from app.core.database import Base, engine
+from app.core.database import Base, engine, async_engine
 from app.core.config import settings
+from app.core.cache import invalidation_bus
+from app.core.auth_cache import cert_refresher
+from app.core.resilience import breakers
 from app.core.firebase_utils import firebase_creds_path
-from app.api import user_router, property_router
+from app.crud.autocomplete import watch_address_snapshot_in_background
+from app.crud.property import region_refresh_queue
+from app.services.refresh_scheduler import refresh_scheduler
+from app.utils.monte_carlo import start_simulation_pool, shutdown_simulation_pool
+from app.api import user_router, property_router, market_router
 
 cred = credentials.Certificate(firebase_creds_path)
 firebase_admin.initialize_app(cred)
-app = FastAPI(title=settings.PROJECT_NAME)
+cert_refresher.start()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Maps the snapshot built by scripts/build_address_index.py; /properties/autocomplete
+    # uses the DB search until one exists
+    watch_address_snapshot_in_background()
+    # Refreshes stale RentCast estimates in the background so analyses never wait on them
+    if settings.RENTCAST_REFRESH_ENABLED and settings.RENTCAST_API_KEY:
+        refresh_scheduler.start()
+    # One bounded pool per web worker for portfolio simulations, instead of one per request
+    start_simulation_pool(settings.SIMULATION_POOL_WORKERS)
+    yield
+    shutdown_simulation_pool()
+    await async_engine.dispose()
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
+invalidation_bus.start(engine, settings.CACHE_INVALIDATION_CHANNEL)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,6 +49,16 @@ app.add_middleware(
 
 app.include_router(property_router, prefix="/api")
 app.include_router(user_router, prefix="/api")
+app.include_router(market_router, prefix="/api")
+
+@app.get("/health/dependencies")
+def get_dependency_health():
+    """Circuit breaker state for the outbound dependencies (RentCast, Gemini) and the background refreshes."""
+    return {
+        "breakers": breakers.stats(),
+        "rentcast_refresh": refresh_scheduler.stats(),
+        "market_stats_refresh": region_refresh_queue.stats(),
+    }
 
 @app.get("/")
 def read_root():
@@ -1,2 +1,7 @@
 from .user import User
-from .property import Property
\ No newline at end of file
+from .property import Property
+from .market import MarketStats
+from .analysis import AnalysisResult
+from .geo_cluster import GeoCluster
+from .refresh import PropertyRefresh
+from .sale import PropertySale
\ No newline at end of file
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, DateTime, JSON
+from datetime import datetime
+from app.core.database import Base
+
+class AnalysisResult(Base):
+    """Short-lived shared result of one coalesced analysis (see app/core/single_flight.py).
+
+    Written by the worker that ran the analysis so workers that waited on the same key
+    can read it instead of repeating the RentCast/Gemini calls. Rows are only read
+    within ANALYSIS_RESULT_TTL_SECONDS and are pruned on write.
+    """
+    __tablename__ = "analysis_results"
+
+    key = Column(String(64), primary_key=True)
+    result = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -0,0 +1,140 @@
+import math
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import Column, Integer, String, Float, PrimaryKeyConstraint, event, inspect, text
+from app.core.database import Base
+from app.models.property import Property
+from app.utils.geo import geohash_encode
+
+# Geohash precisions served as map clusters (1: ~5000km cells ... 7: ~150m cells)
+CLUSTER_PRECISIONS = range(1, 8)
+# Precisions with stored aggregate rows. 1 and 2 are summed from precision-3 rows at read
+# time: their few rows would take every write in a region and serialize concurrent writers
+STORED_CLUSTER_PRECISIONS = range(3, 8)
+
+# Sale prices are counted in log-spaced buckets this far apart, so a cell's median is
+# read from its bucket counts to within about +-5%
+PRICE_BUCKET_RATIO = 1.1
+UNPRICED_BUCKET = -1
+
+
+def price_bucket(price) -> int:
+    if not isinstance(price, (int, float)) or price <= 0:
+        return UNPRICED_BUCKET
+    return int(math.floor(math.log(price) / math.log(PRICE_BUCKET_RATIO)))
+
+
+def bucket_price(bucket: int) -> float:
+    """Geometric midpoint of a price bucket."""
+    return PRICE_BUCKET_RATIO ** (bucket + 0.5)
+
+
+def cluster_keys(geohash: Optional[str], price) -> List[Tuple[int, str, int]]:
+    """(precision, cell, price_bucket) aggregate rows a property with this geohash and price counts toward."""
+    if not geohash:
+        return []
+    bucket = price_bucket(price)
+    return [(precision, geohash[:precision], bucket) for precision in STORED_CLUSTER_PRECISIONS]
+
+
+class GeoCluster(Base):
+    """Per-cell, per-price-bucket property counts and coordinate sums at each stored cluster precision.
+
+    Maintained by the Property write listeners below in the same transaction as the
+    write, so a map view reads its cells with one primary-key range scan.
+    """
+    __tablename__ = "geo_clusters"
+    __table_args__ = (
+        PrimaryKeyConstraint('geohash_precision', 'cell', 'price_bucket'),
+    )
+
+    geohash_precision = Column(Integer, nullable=False)  # == len(cell)
+    cell = Column(String(12), nullable=False)
+    price_bucket = Column(Integer, nullable=False)  # see price_bucket(); -1 without a sale price
+    property_count = Column(Integer, nullable=False, default=0)
+    latitude_sum = Column(Float, nullable=False, default=0.0)
+    longitude_sum = Column(Float, nullable=False, default=0.0)
+
+
+# Property columns whose changes move a property between aggregate rows
+CLUSTER_INPUTS = ("latitude", "longitude", "last_sale_price")
+
+_UPSERT = text(
+    "INSERT INTO geo_clusters (geohash_precision, cell, price_bucket, property_count, latitude_sum, longitude_sum) "
+    "VALUES (:precision, :cell, :price_bucket, :count, :lat, :lon) "
+    "ON CONFLICT (geohash_precision, cell, price_bucket) DO UPDATE SET "
+    "property_count = geo_clusters.property_count + EXCLUDED.property_count, "
+    "latitude_sum = geo_clusters.latitude_sum + EXCLUDED.latitude_sum, "
+    "longitude_sum = geo_clusters.longitude_sum + EXCLUDED.longitude_sum"
+)
+_PRUNE = text(
+    "DELETE FROM geo_clusters WHERE geohash_precision = :precision AND cell = :cell "
+    "AND price_bucket = :price_bucket AND property_count <= 0"
+)
+
+
+def cluster_deltas(latitude, longitude, price, sign: int) -> List[Dict[str, Any]]:
+    """Parameters adding (sign=1) or removing (sign=-1) one property's contribution."""
+    return [
+        {"precision": precision, "cell": cell, "price_bucket": bucket,
+         "count": sign, "lat": sign * latitude, "lon": sign * longitude}
+        for precision, cell, bucket in cluster_keys(geohash_encode(latitude, longitude), price)
+    ]
+
+
+def apply_cluster_deltas(connection, deltas: List[Dict[str, Any]]):
+    """Apply deltas merged per aggregate row and in primary-key order.
+
+    Every writer locks the rows it shares with another in the same order, so concurrent
+    flushes wait on each other instead of deadlocking; a move within a cell nets out.
+    """
+    merged: Dict[Tuple[int, str, int], Dict[str, Any]] = {}
+    for delta in deltas:
+        key = (delta["precision"], delta["cell"], delta["price_bucket"])
+        entry = merged.get(key)
+        if entry is None:
+            merged[key] = dict(delta)
+        else:
+            entry["count"] += delta["count"]
+            entry["lat"] += delta["lat"]
+            entry["lon"] += delta["lon"]
+    params = [merged[key] for key in sorted(merged) if merged[key]["count"] or merged[key]["lat"] or merged[key]["lon"]]
+    if not params:
+        return
+    connection.execute(_UPSERT, params)
+    shrunk = [entry for entry in params if entry["count"] < 0]
+    if shrunk:
+        connection.execute(_PRUNE, shrunk)
+
+
+def apply_cluster_delta(connection, latitude, longitude, price, sign: int):
+    """Add (sign=1) or remove (sign=-1) one property's contribution to the aggregates."""
+    apply_cluster_deltas(connection, cluster_deltas(latitude, longitude, price, sign))
+
+
+def _previous(state, name):
+    history = state.attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else None
+
+
+@event.listens_for(Property, "after_insert")
+def _add_to_clusters(mapper, connection, target):
+    apply_cluster_delta(connection, target.latitude, target.longitude, target.last_sale_price, 1)
+
+
+@event.listens_for(Property, "after_update")
+def _move_between_clusters(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in CLUSTER_INPUTS):
+        return
+    old = [_previous(state, name) for name in CLUSTER_INPUTS]
+    apply_cluster_deltas(
+        connection,
+        cluster_deltas(*old, -1) + cluster_deltas(target.latitude, target.longitude, target.last_sale_price, 1),
+    )
+
+
+@event.listens_for(Property, "after_delete")
+def _remove_from_clusters(mapper, connection, target):
+    apply_cluster_delta(connection, target.latitude, target.longitude, target.last_sale_price, -1)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, UniqueConstraint
+from datetime import datetime
+from app.core.database import Base
+
+class MarketStats(Base):
+    __tablename__ = "market_stats"
+    __table_args__ = (
+        UniqueConstraint('region_type', 'region_key', name='unique_market_region'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    region_type = Column(String, nullable=False)  # "zip" or "county"
+    region_key = Column(String, nullable=False)   # ZIP code, or state FIPS + county FIPS
+    state = Column(String)
+    property_count = Column(Integer, default=0)
+    median_price_per_sqft = Column(Float)
+    median_rent_per_sqft = Column(Float)
+    sales_last_12_months = Column(Integer, default=0)
+    sales_per_month = Column(Float)
+    price_trend_pct = Column(Float)
+    neighborhood_trend = Column(String)  # "Up", "Stable", "Down"
+    annual_appreciation_pct = Column(Float)  # median annualized change between a property's consecutive sales
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
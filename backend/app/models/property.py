@@ -1,26 +1,80 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, Date, JSON, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, Boolean, Date, DateTime, JSON, UniqueConstraint, Index
+from sqlalchemy import event, text
+from sqlalchemy.orm import column_property, validates
+from datetime import datetime
 from app.core.database import Base
+from app.utils.geo import geohash_encode
+
+
+def normalize_filter_value(value):
+    """Canonical form used by the *_key filter columns: trimmed, single-spaced, lowercase."""
+    if value is None:
+        return None
+    return " ".join(str(value).split()).lower() or None
+
+
+def extract_latest_tax(property_taxes):
+    """(latest year, that year's total) from RentCast-shaped propertyTaxes: {"2023": {"total": 3200}, ...}."""
+    if not isinstance(property_taxes, dict) or not property_taxes:
+        return None, None
+    try:
+        year = max(property_taxes.keys(), key=lambda x: int(x))
+    except Exception:
+        return None, None
+    entry = property_taxes.get(year)
+    total = entry.get("total") if isinstance(entry, dict) else None
+    if isinstance(total, (int, float)) and total > 0:
+        return int(year), float(total)
+    return int(year), None
+
+
+def extract_annual_hoa(hoa):
+    monthly = 0
+    if isinstance(hoa, dict):
+        monthly = hoa.get("fee") or hoa.get("monthlyFee") or 0
+    if isinstance(monthly, (int, float)) and monthly > 0:
+        return float(monthly) * 12.0
+    return 0.0
+
 
 class Property(Base):
     __tablename__ = "properties"
     __table_args__ = (
         UniqueConstraint('formatted_address', 'address_line1', 'address_line2', 'city', 'state', 'zip_code', name='unique_full_address'),
-        UniqueConstraint('assessor_id', name='unique_assessor_id')
+        UniqueConstraint('assessor_id', name='unique_assessor_id'),
+        # Composite indexes for the browse filter combinations (state/city/type/bedrooms + price range)
+        Index('ix_properties_state_city_price', 'state_key', 'city_key', 'last_sale_price'),
+        Index('ix_properties_city_price', 'city_key', 'last_sale_price'),
+        Index('ix_properties_state_type_price', 'state_key', 'property_type_key', 'last_sale_price'),
+        Index('ix_properties_type_bedrooms_price', 'property_type_key', 'bedrooms', 'last_sale_price'),
+        Index('ix_properties_last_sale_price', 'last_sale_price'),
+        Index('ix_properties_county_fips', 'state_fips', 'county_fips'),
+        Index('ix_properties_monthly_carrying_cost', 'monthly_carrying_cost'),
+        # Top-k screener: backward scans return the best rows first (id breaks ties)
+        Index('ix_properties_cap_rate', 'cap_rate', 'id'),
+        Index('ix_properties_state_cap_rate', 'state_key', 'cap_rate', 'id'),
+        Index('ix_properties_state_annual_noi', 'state_key', 'annual_noi', 'id'),
+        Index('ix_properties_state_rent_to_value', 'state_key', 'rent_to_value', 'id'),
+        # Radius/bounding-box queries: geohash prefix ranges are B-tree range scans
+        Index('ix_properties_geohash', 'geohash'),
+        # Duplicate detection blocks on the 5-digit ZIP, whether stored as ZIP or ZIP+4
+        Index('ix_properties_zip5', text('left(zip_code, 5)')),
     )
 
     id = Column(Integer, primary_key=True, index=True)
     formatted_address = Column(String, index=True)
     address_line1 = Column(String)
     address_line2 = Column(String)
-    city = Column(String, index=True)
-    state = Column(String, index=True)
+    city = Column(String)
+    state = Column(String)
     state_fips = Column(String)
-    zip_code = Column(String)
+    zip_code = Column(String, index=True)
     county = Column(String)
     county_fips = Column(String)
-    latitude = Column(Float)
-    longitude = Column(Float)
-    property_type = Column(String, index=True)
+    # active_history: geo cluster maintenance needs the previous values on update
+    latitude = column_property(Column(Float), active_history=True)
+    longitude = column_property(Column(Float), active_history=True)
+    property_type = Column(String)
     bedrooms = Column(Integer, index=True)
     bathrooms = Column(Float)
     square_footage = Column(Integer) 
@@ -31,11 +85,56 @@ class Property(Base):
     subdivision = Column(String)
     zoning = Column(String)
     last_sale_date = Column(Date)
-    last_sale_price = Column(Float)
+    last_sale_price = column_property(Column(Float), active_history=True)
     owner_occupied = Column(Boolean)
     features = Column(JSON, nullable=True)
     hoa = Column(JSON, nullable=True)
     owners = Column(JSON, nullable=True)
     tax_assessments = Column(JSON, nullable=True)
     property_taxes = Column(JSON, nullable=True)
-    sale_history = Column(JSON, nullable=True)
\ No newline at end of file
+    sale_history = Column(JSON, nullable=True)
+    # Bumped on every ORM insert/update; drives ETag and Last-Modified on reads
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    # Carrying costs extracted from property_taxes/hoa whenever the row is written
+    latest_tax_year = Column(Integer)
+    annual_tax = Column(Float)
+    annual_hoa = Column(Float)
+    monthly_carrying_cost = Column(Float)  # (annual_tax + annual_hoa) / 12; NULL without tax data
+
+    # Investment metrics under the default assumptions (see crud.property.refresh_investment_metrics)
+    estimated_value = Column(Float)
+    estimated_monthly_rent = Column(Float)
+    annual_noi = Column(Float)
+    cap_rate = Column(Float)        # percent
+    rent_to_value = Column(Float)   # monthly rent / value, percent
+
+    # Normalized copies of city/state/property_type for index-friendly exact filters
+    city_key = Column(String)
+    state_key = Column(String)
+    property_type_key = Column(String)
+
+    # Geohash of (latitude, longitude) at GEOHASH_PRECISION; NULL without coordinates
+    geohash = Column(String(12))
+
+    @validates("city", "state", "property_type")
+    def _sync_filter_key(self, key, value):
+        setattr(self, f"{key}_key", normalize_filter_value(value))
+        return value
+
+
+@event.listens_for(Property, "before_insert")
+@event.listens_for(Property, "before_update")
+def _compute_carrying_costs(mapper, connection, target):
+    target.latest_tax_year, target.annual_tax = extract_latest_tax(target.property_taxes)
+    target.annual_hoa = extract_annual_hoa(target.hoa)
+    if target.annual_tax is not None:
+        target.monthly_carrying_cost = round((target.annual_tax + target.annual_hoa) / 12.0, 2)
+    else:
+        target.monthly_carrying_cost = None
+
+
+@event.listens_for(Property, "before_insert")
+@event.listens_for(Property, "before_update")
+def _compute_geohash(mapper, connection, target):
+    target.geohash = geohash_encode(target.latitude, target.longitude)
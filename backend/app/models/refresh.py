@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, ForeignKey
+from app.core.database import Base
+
+
+class PropertyRefresh(Base):
+    """Background-refreshed RentCast estimates and interest signals for one property.
+
+    Written by the refresh scheduler (app/services/refresh_scheduler.py), never on a
+    request path: analyses read the stored estimates instead of calling RentCast, and
+    property views are buffered in memory and flushed here in batches.
+    """
+    __tablename__ = "property_refreshes"
+
+    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), primary_key=True)
+
+    # RentCast AVM results as of refreshed_at; NULL until the first successful refresh
+    value = Column(Float)
+    value_low = Column(Float)
+    value_high = Column(Float)
+    rent = Column(Float)
+    rent_low = Column(Float)
+    rent_high = Column(Float)
+    rent_comparables = Column(JSON, nullable=True)
+    refreshed_at = Column(DateTime, index=True)
+
+    # Last refresh attempt, successful or not, so a failing property is not retried at once
+    attempted_at = Column(DateTime)
+    last_error = Column(String)
+
+    # Exponentially decayed view count as of views_updated_at (see REFRESH_VIEW_HALF_LIFE_DAYS)
+    recent_views = Column(Float, nullable=False, default=0.0)
+    views_updated_at = Column(DateTime)
@@ -0,0 +1,97 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Index, UniqueConstraint, event, inspect
+from sqlalchemy import delete, insert
+from app.core.database import Base
+from app.models.property import Property
+
+
+def _parse_sale_date(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+def extract_sales(sale_history, last_sale_date=None, last_sale_price=None) -> List[Dict[str, Any]]:
+    """Sale events from RentCast-shaped history ({"2020-06-01": {"event": "Sale", "date": ..., "price": ...}})
+    plus the last sale columns, one per date (priced entries win), oldest first."""
+    by_date: Dict[date, Optional[float]] = {}
+
+    def add(day, price):
+        day = _parse_sale_date(day)
+        if day is None:
+            return
+        price = float(price) if isinstance(price, (int, float)) and price > 0 else None
+        if by_date.get(day) is None:
+            by_date[day] = price
+
+    if isinstance(sale_history, dict):
+        for key, entry in sale_history.items():
+            if not isinstance(entry, dict) or entry.get("event", "Sale") != "Sale":
+                continue
+            add(entry.get("date") or key, entry.get("price"))
+    if last_sale_date:
+        add(last_sale_date, last_sale_price)
+    return [{"sale_date": day, "price": by_date[day]} for day in sorted(by_date)]
+
+
+class PropertySale(Base):
+    """One sale event of a property, normalized out of the sale_history JSON.
+
+    Kept in sync by the Property write listeners below (same transaction as the write),
+    so trend and recent-sales queries are index scans instead of JSON parsing.
+    """
+    __tablename__ = "property_sales"
+    __table_args__ = (
+        # Doubles as the (property_id, sale_date) index for per-property history
+        UniqueConstraint('property_id', 'sale_date', name='unique_property_sale'),
+        Index('ix_property_sales_zip_date', 'zip_code', 'sale_date'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), nullable=False)
+    zip_code = Column(String)  # copy of the property's, for the (zip_code, sale_date) index
+    sale_date = Column(Date, nullable=False)
+    price = Column(Float)  # NULL when the sale price is not disclosed
+
+
+# Property columns the sale rows are derived from
+SALE_INPUTS = ("sale_history", "last_sale_date", "last_sale_price", "zip_code")
+
+
+def sale_rows(property_id: int, zip_code: Optional[str], sale_history, last_sale_date, last_sale_price) -> List[Dict[str, Any]]:
+    return [
+        {"property_id": property_id, "zip_code": zip_code, **sale}
+        for sale in extract_sales(sale_history, last_sale_date, last_sale_price)
+    ]
+
+
+def _write_sales(connection, target, replace: bool):
+    if replace:
+        connection.execute(delete(PropertySale).where(PropertySale.property_id == target.id))
+    rows = sale_rows(target.id, target.zip_code, target.sale_history, target.last_sale_date, target.last_sale_price)
+    if rows:
+        connection.execute(insert(PropertySale), rows)
+
+
+@event.listens_for(Property, "after_insert")
+def _add_sales(mapper, connection, target):
+    _write_sales(connection, target, replace=False)
+
+
+@event.listens_for(Property, "after_update")
+def _replace_sales(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in SALE_INPUTS):
+        _write_sales(connection, target, replace=True)
+
+
+@event.listens_for(Property, "after_delete")
+def _remove_sales(mapper, connection, target):
+    # ON DELETE CASCADE covers Postgres; this keeps engines without enforced FKs consistent
+    connection.execute(delete(PropertySale).where(PropertySale.property_id == target.id))
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, validator
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field, validator, model_validator
+from typing import Optional, Dict, Any, List, Literal
 
 class ExpenseOverrides(BaseModel):
     # Rates as fractions (e.g., 0.10 = 10%)
@@ -41,3 +41,149 @@ class InvestmentAnalysisResponse(BaseModel):
     property_address: Optional[str] = None
     details: Optional[Dict[str, Any]] = None
     report: Optional[str] = None
+
+
+class SensitivityRange(BaseModel):
+    # Either an explicit list of values or an evenly spaced start..stop range (inclusive)
+    values: Optional[List[float]] = None
+    start: Optional[float] = None
+    stop: Optional[float] = None
+    steps: int = Field(10, ge=1, le=500)
+
+    @model_validator(mode="after")
+    def values_or_bounds(self) -> "SensitivityRange":
+        if self.values:
+            if len(self.values) > 500:
+                raise ValueError("At most 500 values per range")
+            return self
+        if self.start is None or self.stop is None:
+            raise ValueError("Provide either values or start and stop")
+        return self
+
+
+class SensitivityRequest(BaseModel):
+    purchase_price: Optional[SensitivityRange] = Field(None, alias="purchasePrice")
+    monthly_rent: Optional[SensitivityRange] = Field(None, alias="monthlyRent")
+    vacancy_allowance_rate: Optional[SensitivityRange] = None
+    property_management_rate: Optional[SensitivityRange] = None
+    # Fixed inputs for everything not being varied
+    overrides: Optional[ExpenseOverrides] = None
+
+    class Config:
+        populate_by_name = True
+
+
+class SensitivityResponse(BaseModel):
+    property_id: int
+    axes: List[str]                     # grid dimension order of cap_rate_percent
+    values: Dict[str, List[float]]      # the evaluated points along each axis
+    base: Dict[str, float]              # inputs held fixed across the grid
+    cap_rate_percent: Any               # nested lists, one level per axis
+    min_cap_rate_percent: float
+    max_cap_rate_percent: float
+
+
+class DistributionSpec(BaseModel):
+    kind: Literal["normal", "uniform", "triangular", "fixed"] = "normal"
+    mean: Optional[float] = None   # normal, fixed
+    sd: Optional[float] = Field(None, ge=0)
+    low: Optional[float] = None    # uniform, triangular
+    mode: Optional[float] = None   # triangular
+    high: Optional[float] = None
+
+    @model_validator(mode="after")
+    def required_params(self) -> "DistributionSpec":
+        required = {
+            "normal": ("mean", "sd"),
+            "fixed": ("mean",),
+            "uniform": ("low", "high"),
+            "triangular": ("low", "mode", "high"),
+        }[self.kind]
+        missing = [p for p in required if getattr(self, p) is None]
+        if missing:
+            raise ValueError(f"{self.kind} distribution requires {', '.join(missing)}")
+        if self.kind in ("uniform", "triangular") and self.low > self.high:
+            raise ValueError("low must not exceed high")
+        if self.kind == "triangular" and not self.low <= self.mode <= self.high:
+            raise ValueError("mode must lie between low and high")
+        return self
+
+
+class SimulationOptions(BaseModel):
+    draws: int = Field(100_000, ge=1_000, le=1_000_000)
+    seed: Optional[int] = Field(None, ge=0)  # omitted: a random seed is chosen and returned
+    cap_rate_threshold: float = 8.0
+    # Keys: rent, value (multipliers on the estimates), vacancy, maintenance (fractions of
+    # rent), tax_growth (fractional change in the tax bill). Unset keys use the defaults.
+    distributions: Optional[Dict[Literal["rent", "vacancy", "maintenance", "tax_growth", "value"], DistributionSpec]] = None
+    overrides: Optional[ExpenseOverrides] = None
+
+    class Config:
+        populate_by_name = True
+
+
+class SimulationRequest(SimulationOptions):
+    monthly_rent: Optional[float] = Field(None, alias="monthlyRent")
+
+
+class PortfolioSimulationRequest(SimulationOptions):
+    property_ids: List[int] = Field(..., min_length=1, max_length=50, alias="propertyIds")
+
+
+class SimulationResult(BaseModel):
+    property_id: int
+    draws: Optional[int] = None
+    mean_cap_rate_percent: Optional[float] = None
+    std_cap_rate_percent: Optional[float] = None
+    percentiles: Optional[Dict[str, float]] = None
+    cap_rate_threshold: Optional[float] = None
+    probability_meets_threshold: Optional[float] = None
+    base: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class SimulationResponse(SimulationResult):
+    seed: int
+
+
+class PortfolioSimulationResponse(BaseModel):
+    seed: int
+    results: List[SimulationResult]
+
+
+class AIRecommendation(BaseModel):
+    decision: Literal["Invest", "Do Not Invest"]
+    justification: str
+
+
+class AIInvestmentAnalysis(BaseModel):
+    """Shape of one Gemini investment analysis (see core/prompts.py)."""
+    summary: str
+    recommendation: AIRecommendation
+    potential_risks: List[str]
+    recommendations: List[str]
+
+
+class AIBatchAnalysisItem(BaseModel):
+    # property_id first so the model commits to the id before writing the analysis
+    property_id: int
+    result: AIInvestmentAnalysis
+
+
+class PortfolioAnalysisRequest(BaseModel):
+    property_ids: List[int] = Field(..., min_length=1, max_length=50, alias="propertyIds")
+    overrides: Optional[ExpenseOverrides] = None
+
+    class Config:
+        populate_by_name = True
+
+
+class PortfolioAnalysisItem(BaseModel):
+    property_id: int
+    cap_rate_percent: float
+    recommendation: str
+    ai_analysis: Dict[str, Any]
+
+
+class PortfolioAnalysisResponse(BaseModel):
+    results: List[PortfolioAnalysisItem]
@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import date, datetime
+
+class MarketStatsResponse(BaseModel):
+    region_type: str
+    region_key: str
+    state: Optional[str] = None
+    property_count: int = 0
+    median_price_per_sqft: Optional[float] = None
+    median_rent_per_sqft: Optional[float] = None
+    sales_last_12_months: int = 0
+    sales_per_month: Optional[float] = None
+    price_trend_pct: Optional[float] = None
+    neighborhood_trend: Optional[str] = None
+    annual_appreciation_pct: Optional[float] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class RecentSale(BaseModel):
+    property_id: int
+    sale_date: date
+    price: Optional[float] = None
+    price_per_sqft: Optional[float] = None
+    formatted_address: Optional[str] = None
+    property_type: Optional[str] = None
+    bedrooms: Optional[int] = None
+    bathrooms: Optional[float] = None
+    square_footage: Optional[int] = None
@@ -36,11 +36,56 @@ class PropertyBase(BaseModel):
     property_taxes: Optional[Dict[str, Any]] = Field(None, alias="propertyTaxes")
     sale_history: Optional[Dict[str, Any]] = Field(None, alias="saleHistory")
 
+    latest_tax_year: Optional[int] = Field(None, alias="latestTaxYear")
+    annual_tax: Optional[float] = Field(None, alias="annualTax")
+    annual_hoa: Optional[float] = Field(None, alias="annualHoa")
+    monthly_carrying_cost: Optional[float] = Field(None, alias="monthlyCarryingCost")
+
+    estimated_value: Optional[float] = Field(None, alias="estimatedValue")
+    estimated_monthly_rent: Optional[float] = Field(None, alias="estimatedMonthlyRent")
+    annual_noi: Optional[float] = Field(None, alias="annualNoi")
+    cap_rate: Optional[float] = Field(None, alias="capRate")
+    rent_to_value: Optional[float] = Field(None, alias="rentToValue")
+
     class Config:
         from_attributes = True
         populate_by_name = True
         allow_population_by_alias = True
 
+class PropertySummary(BaseModel):
+    """Lightweight card-grid view of a property (no heavy JSON columns)."""
+    id: int
+    formatted_address: Optional[str] = Field(None, alias="formattedAddress")
+    address_line1: Optional[str] = Field(None, alias="addressLine1")
+    address_line2: Optional[str] = Field(None, alias="addressLine2")
+    city: Optional[str] = None
+    state: Optional[str] = None
+    zip_code: Optional[str] = Field(None, alias="zipCode")
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    property_type: Optional[str] = Field(None, alias="propertyType")
+    bedrooms: Optional[int] = None
+    bathrooms: Optional[float] = None
+    square_footage: Optional[int] = Field(None, alias="squareFootage")
+    year_built: Optional[int] = Field(None, alias="yearBuilt")
+    last_sale_date: Optional[date] = Field(None, alias="lastSaleDate")
+    last_sale_price: Optional[float] = Field(None, alias="lastSalePrice")
+    monthly_carrying_cost: Optional[float] = Field(None, alias="monthlyCarryingCost")
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+
+def dump_property_fields(property_obj: Any, fields: List[str]) -> Dict[str, Any]:
+    """Serialize only the requested columns of a Property, keyed by API alias."""
+    result = {}
+    for name in fields:
+        field = PropertyBase.model_fields.get(name)
+        key = field.alias if field and field.alias else name
+        result[key] = getattr(property_obj, name)
+    return result
+
 class PropertyCreate(BaseModel):
     formatted_address: str
     address_line1: Optional[str] = None
@@ -105,6 +150,84 @@ class PropertyUpdate(BaseModel):
     property_taxes: Optional[Dict[str, Any]] = None
     sale_history: Optional[Dict[str, Any]] = None
 
+class FacetCount(BaseModel):
+    value: Any
+    count: int
+
+class HistogramBucket(BaseModel):
+    min: float
+    max: float
+    count: int
+
+class PropertyFacets(BaseModel):
+    total: int
+    states: List[FacetCount] = []
+    cities: List[FacetCount] = []
+    property_types: List[FacetCount] = []
+    bedrooms: List[FacetCount] = []
+    price_histogram: List[HistogramBucket] = []
+    sqft_histogram: List[HistogramBucket] = []
+
+class PropertyMetrics(BaseModel):
+    estimated_value: Optional[float] = Field(None, alias="estimatedValue")
+    estimated_monthly_rent: Optional[float] = Field(None, alias="estimatedMonthlyRent")
+    annual_noi: Optional[float] = Field(None, alias="annualNoi")
+    cap_rate: Optional[float] = Field(None, alias="capRate")
+    rent_to_value: Optional[float] = Field(None, alias="rentToValue")
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+class RankedProperty(BaseModel):
+    rank: int
+    metrics: PropertyMetrics
+    property: Dict[str, Any]
+
+class NearbyProperty(BaseModel):
+    distance_miles: float = Field(..., alias="distanceMiles")
+    property: Dict[str, Any]
+
+    class Config:
+        populate_by_name = True
+
+class PropertyCluster(BaseModel):
+    cell: str  # geohash prefix
+    count: int
+    latitude: float  # centroid
+    longitude: float
+    median_price: Optional[float] = Field(None, alias="medianPrice")
+
+    class Config:
+        populate_by_name = True
+
+class PropertyClusters(BaseModel):
+    precision: int
+    total: int
+    clusters: List[PropertyCluster]
+
+class AddressSuggestion(BaseModel):
+    id: int
+    address: str
+
+class PropertySaleEvent(BaseModel):
+    sale_date: date = Field(..., alias="saleDate")
+    price: Optional[float] = None  # None when the sale price was not disclosed
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+class PropertySalesHistory(BaseModel):
+    property_id: int = Field(..., alias="propertyId")
+    sales: List[PropertySaleEvent]  # oldest first
+    # Annualized change between the first and last priced sales, and the ZIP/county repeat-sales median
+    annual_appreciation_pct: Optional[float] = Field(None, alias="annualAppreciationPct")
+    market_appreciation_pct: Optional[float] = Field(None, alias="marketAppreciationPct")
+
+    class Config:
+        populate_by_name = True
+
 class PropertyAnalysisRequest(BaseModel):
     address: str
     calculation_mode: Optional[str] = "gross"  # 'gross' or 'net'
@@ -0,0 +1,204 @@
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.core.resilience import CircuitOpenError
+from app.crud.property import get_property_by_id, region_refresh_queue
+from app.crud.refresh import rank_refresh_candidates, record_views, save_refresh
+from app.schemas.property import PropertyBase
+from app.services.rentcast_client import RentCastClient
+
+# One refresh = a value estimate and a rent estimate
+CALLS_PER_REFRESH = 2
+# How often each worker flushes buffered views and the leader checks whether a refresh is due
+REFRESH_TICK_SECONDS = 60
+# Session advisory lock held by the one worker that spends the refresh budget
+REFRESH_LEADER_LOCK_ID = 0x52454652  # "REFR"
+
+
+def month_bounds(now: datetime) -> Tuple[datetime, datetime]:
+    start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def seconds_until_refresh_due(used_calls: int, budget: int, now: datetime) -> float:
+    """Seconds until the pace allows the next refresh (0 = now).
+
+    Spends `budget` calls evenly over the calendar month: the refresh that takes the
+    month's usage to N calls is due N / budget of the way through the month. Calls made
+    by interactive requests count too, so the scheduler backs off when they spend more.
+    """
+    start, end = month_bounds(now)
+    if budget <= 0 or used_calls + CALLS_PER_REFRESH > budget:
+        return (end - now).total_seconds()
+    due_at = start + (end - start) * ((used_calls + CALLS_PER_REFRESH) / budget)
+    return max(0.0, (due_at - now).total_seconds())
+
+
+class RefreshScheduler:
+    """Background refresh of stored RentCast estimates for stale, popular properties.
+
+    Every worker buffers property views in memory (record_view is called on the request
+    path and never touches the DB) and flushes them every tick. One worker, holding a
+    Postgres advisory lock, also refreshes the best-ranked property whenever the monthly
+    pace allows; results go to property_refreshes, where analyses read them, and the
+    property's region is queued for a market stats refresh and re-score.
+    """
+
+    def __init__(self):
+        self._views: Counter = Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._leader_conn = None
+        self.enabled = False
+        self.refreshes = 0
+        self.failures = 0
+        self.last_refresh: Optional[Dict[str, Any]] = None
+        self.next_due_at: Optional[datetime] = None
+
+    def record_view(self, property_id: int):
+        if self.enabled:
+            with self._lock:
+                self._views[property_id] += 1
+
+    def flush_views(self) -> int:
+        with self._lock:
+            views, self._views = self._views, Counter()
+        if not views:
+            return 0
+        db = SessionLocal()
+        try:
+            return record_views(db, dict(views))
+        except Exception as e:
+            db.rollback()
+            print(f"Property view flush failed, dropping {sum(views.values())} views: {str(e)}")
+            return 0
+        finally:
+            db.close()
+
+    def _is_leader(self) -> bool:
+        if engine.dialect.name != "postgresql":
+            return True
+        if self._leader_conn is not None:
+            # The lock dies with its session: a connection dropped by the server (restart,
+            # idle timeout) means another worker may lead now, so take the lock again
+            try:
+                self._leader_conn.execute(text("SELECT 1"))
+                self._leader_conn.commit()
+                return True
+            except Exception as e:
+                print(f"Refresh leader connection lost, re-acquiring the lock: {str(e)}")
+                self._drop_leadership()
+        conn = engine.connect()
+        if conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": REFRESH_LEADER_LOCK_ID}).scalar():
+            conn.commit()
+            self._leader_conn = conn
+            return True
+        conn.close()
+        return False
+
+    def _drop_leadership(self):
+        if self._leader_conn is not None:
+            try:
+                self._leader_conn.close()
+            except Exception:
+                pass
+            self._leader_conn = None
+
+    def refresh_property(self, client: RentCastClient, property_id: int) -> bool:
+        """Fetch and store fresh RentCast estimates for one property; True if any arrived."""
+        db = SessionLocal()
+        try:
+            property_obj = get_property_by_id(db, property_id)
+            if property_obj is None:
+                return False
+            property_data = PropertyBase.model_validate(property_obj).model_dump(by_alias=True)
+            results, errors = {}, []
+            for name, fetch in (("value", client.get_property_value), ("rent", client.get_rent_estimate)):
+                try:
+                    results[name] = fetch(property_data)
+                except CircuitOpenError:
+                    # RentCast is known to be down; try again next tick without marking an attempt
+                    if not results:
+                        return False
+                    errors.append(f"{name}: RentCast circuit open")
+                except Exception as e:
+                    errors.append(f"{name}: {str(e)}")
+            save_refresh(db, property_id, results.get("value"), results.get("rent"), "; ".join(errors) or None)
+            if results:
+                # The region's rent stats and the stored metrics (screener, cached reads)
+                # pick up the new estimates with the next region refresh
+                region_refresh_queue.enqueue_for([property_obj])
+        finally:
+            db.close()
+
+        refreshed = bool(results)
+        if refreshed:
+            self.refreshes += 1
+        else:
+            self.failures += 1
+        self.last_refresh = {"property_id": property_id, "at": datetime.utcnow(), "errors": errors}
+        return refreshed
+
+    def run_once(self) -> Optional[int]:
+        """One tick: flush views, then refresh one property if this worker leads and one is due."""
+        self.flush_views()
+        if not self._is_leader():
+            return None
+
+        client = RentCastClient()
+        budget = int(client.MAX_MONTHLY_CALLS * settings.RENTCAST_REFRESH_BUDGET_SHARE)
+        used = client.MAX_MONTHLY_CALLS - client.get_remaining_calls()
+        # The client's monthly counter runs on local time
+        now = datetime.now()
+        wait = seconds_until_refresh_due(used, budget, now)
+        self.next_due_at = datetime.fromtimestamp(now.timestamp() + wait)
+        if wait > 0:
+            return None
+
+        db = SessionLocal()
+        try:
+            ranked = rank_refresh_candidates(db, limit=1)
+        finally:
+            db.close()
+        if not ranked:
+            return None
+        property_id = ranked[0][0]
+        self.refresh_property(client, property_id)
+        return property_id
+
+    def _run(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Property refresh tick failed: {str(e)}")
+                self._drop_leadership()
+            threading.Event().wait(REFRESH_TICK_SECONDS)
+
+    def start(self):
+        if self._thread is None:
+            self.enabled = True
+            self._thread = threading.Thread(target=self._run, name="rentcast-refresh", daemon=True)
+            self._thread.start()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            buffered = sum(self._views.values())
+        return {
+            "name": "rentcast_refresh",
+            "enabled": self.enabled,
+            "leader": self._leader_conn is not None or (self.enabled and engine.dialect.name != "postgresql"),
+            "buffered_views": buffered,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_refresh": self.last_refresh,
+            "next_due_at": self.next_due_at,
+        }
+
+
+refresh_scheduler = RefreshScheduler()
@@ -4,16 +4,41 @@ import os
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from app.core.config import settings
+from app.core.resilience import breakers, call_with_breaker
+
+rentcast_breaker = breakers.get("rentcast", settings.BREAKER_FAILURE_THRESHOLD, settings.BREAKER_RESET_SECONDS)
+
+
+def _status(error: BaseException) -> Optional[int]:
+    if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+        return error.response.status_code
+    return None
+
+
+def is_transient_http_error(error: BaseException) -> bool:
+    """Timeouts, connection errors, 5xx, 408 and 429; other 4xx are the caller's problem."""
+    status = _status(error)
+    if status is not None:
+        return status >= 500 or status in (408, 429)
+    return isinstance(error, requests.exceptions.RequestException)
+
+
+def is_retryable_http_error(error: BaseException) -> bool:
+    """Transient errors other than 429: a retry within seconds only spends more of the
+    quota RentCast is refusing, so a 429 fails fast and counts toward the breaker."""
+    return _status(error) != 429
+
 
 class RentCastClient:
     def __init__(self):
         self.api_key = settings.RENTCAST_API_KEY
-        self.BASE_URL = "https://api.rentcast.io/v1"
+        self.BASE_URL = settings.RENTCAST_BASE_URL.rstrip("/")
         self.headers = {"X-Api-Key": self.api_key}
+        self.timeout = (settings.RENTCAST_CONNECT_TIMEOUT_SECONDS, settings.RENTCAST_READ_TIMEOUT_SECONDS)
 
         # Rate limiting
-        self.MAX_MONTHLY_CALLS = 50
-        self.rate_limit_file = "rentcast_rate_limit.json"
+        self.MAX_MONTHLY_CALLS = settings.RENTCAST_MONTHLY_CALL_LIMIT
+        self.rate_limit_file = settings.RENTCAST_RATE_LIMIT_FILE
 
     def _check_rate_limit(self) -> bool:
         data = self._load_rate_limit_data()
@@ -41,6 +66,42 @@ class RentCastClient:
         data["calls"] += 1
         self._save_rate_limit_data(data)
 
+    def _get(self, path: str, params: Dict[str, Any]) -> Any:
+        """GET with a deadline, jittered retries (GETs are idempotent) and the RentCast breaker.
+
+        Every attempt that may have reached RentCast counts against the monthly limit,
+        retries and failures included, and a retry is only sent while calls remain.
+        Raises CircuitOpenError without calling RentCast while the breaker is open.
+        """
+        url = f"{self.BASE_URL}{path}"
+        attempts = 0
+
+        def fetch():
+            nonlocal attempts
+            if attempts and not self._check_rate_limit():
+                raise Exception("Monthly API call limit exceeded")
+            attempts += 1
+            try:
+                response = requests.get(url, headers=self.headers, params=params, timeout=self.timeout)
+            except requests.exceptions.ReadTimeout:
+                # The request was sent; RentCast may have served (and billed) it
+                self._increment_call_count()
+                raise
+            self._increment_call_count()
+            response.raise_for_status()
+            return response.json()
+
+        try:
+            return call_with_breaker(
+                rentcast_breaker, fetch,
+                retries=settings.RENTCAST_RETRIES,
+                retry_on=(requests.exceptions.RequestException,),
+                is_failure=is_transient_http_error,
+                is_retryable=is_retryable_http_error,
+            )
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"RentCast API error: {str(e)}")
+
     def get_random_properties(self, limit: int = 100) -> List[Dict[str, Any]]:
         if not self._check_rate_limit():
             raise Exception("Monthly API call limit exceeded")
@@ -48,25 +109,14 @@ class RentCastClient:
         if limit < 1 or limit > 500:
             raise ValueError("Limit must be between 1 and 500")
 
-        url = f"{self.BASE_URL}/properties/random"
-        params = {"limit": limit}
-
-        try:
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            self._increment_call_count()
-
-            data = response.json()
-            return data if isinstance(data, list) else data.get("properties", [])
-
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"RentCast API error: {str(e)}")
+        data = self._get("/properties/random", {"limit": limit})
+        return data if isinstance(data, list) else data.get("properties", [])
 
     def get_rent_estimate(self, property_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if not self._check_rate_limit():
             raise Exception("Monthly API call limit exceeded")
 
-        url = f"{self.BASE_URL}/avm/rent/long-term"
+        path = "/avm/rent/long-term"
         params = {
             "address": property_data.get("formattedAddress"),
             "city": property_data.get("city"),
@@ -80,19 +130,13 @@ class RentCastClient:
 
         params = {k: v for k, v in params.items() if v is not None}
 
-        try:
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            self._increment_call_count()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"RentCast API error: {str(e)}")
+        return self._get(path, params)
 
     def get_property_value(self, property_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if not self._check_rate_limit():
             raise Exception("Monthly API call limit exceeded")
 
-        url = f"{self.BASE_URL}/avm/value"
+        path = "/avm/value"
         params = {
             "address": property_data.get("formattedAddress"),
             "city": property_data.get("city"),
@@ -106,13 +150,7 @@ class RentCastClient:
 
         params = {k: v for k, v in params.items() if v is not None}
 
-        try:
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            self._increment_call_count()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"RentCast API error: {str(e)}")
+        return self._get(path, params)
 
     def get_remaining_calls(self) -> int:
         data = self._load_rate_limit_data()
@@ -0,0 +1,387 @@
+import heapq
+import itertools
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+# Long forms indexed under their USPS abbreviation as well, so "Main Street" and "Main St"
+# both match either spelling of a completed word
+TOKEN_ALIASES = {
+    "street": "st", "avenue": "ave", "road": "rd", "drive": "dr", "boulevard": "blvd",
+    "lane": "ln", "court": "ct", "place": "pl", "parkway": "pkwy", "highway": "hwy",
+    "circle": "cir", "terrace": "ter", "trail": "trl", "apartment": "apt", "suite": "ste",
+    "north": "n", "south": "s", "east": "e", "west": "w",
+}
+
+# Single-term queries up to this length are answered from precomputed top-k lists
+SHORT_PREFIX_LENGTH = 3
+# Suggestions kept per short prefix, and the largest limit a query may ask for
+MAX_SUGGESTIONS = 20
+# Candidates checked per query before giving up on filling the limit (bounds latency)
+MAX_SCAN = 5000
+# Overlay writes are kept this long past a snapshot's build time when it loads, which
+# covers writes the build's read missed and clock skew between the builder and workers
+OVERLAY_RETAIN_SECONDS = 300
+SNAPSHOT_MAGIC = b"AEGISADDR1\n"
+
+
+def address_tokens(text: Optional[str]) -> List[str]:
+    """Lowercase alphanumeric tokens of an address, plus abbreviations of long forms."""
+    tokens = []
+    for token in _NON_ALNUM.split((text or "").lower()):
+        if token and token not in tokens:
+            tokens.append(token)
+        alias = TOKEN_ALIASES.get(token)
+        if alias and alias not in tokens:
+            tokens.append(alias)
+    return tokens
+
+
+def query_terms(text: Optional[str]) -> List[str]:
+    """Terms of a typeahead query, long forms abbreviated (addresses are indexed under both)."""
+    return [TOKEN_ALIASES.get(t, t) for t in _NON_ALNUM.split((text or "").lower()) if t]
+
+
+def _matches(terms: Iterable[str], tokens: List[str]) -> bool:
+    return all(any(token.startswith(term) for token in tokens) for term in terms)
+
+
+def _term_pattern(term: str) -> "re.Pattern":
+    """Regex matching a lowercased address with a token (or a long form's abbreviation) starting with term.
+
+    Equivalent to _matches([term], address_tokens(address)) but without tokenizing,
+    which keeps the per-candidate check cheap when verifying thousands of candidates.
+    """
+    options = [re.escape(term)] + [long for long, short in TOKEN_ALIASES.items() if short.startswith(term)]
+    return re.compile(r"(?<![0-9a-z])(?:" + "|".join(options) + ")")
+
+
+class _Strings:
+    """Read-only sequence of strings stored as one UTF-8 blob plus offsets (bisect-able)."""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, values: List[str]) -> "_Strings":
+        encoded = [v.encode("utf-8") for v in values]
+        offsets = array("q", [0])
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+        return cls(b"".join(encoded), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+class _Slices:
+    """Read-only sequence of int arrays stored as one flat array plus offsets."""
+
+    def __init__(self, values, offsets):
+        self.values = values
+        self.offsets = offsets
+
+    @classmethod
+    def build(cls, lists: List[array]) -> "_Slices":
+        offsets = array("q", [0])
+        for values in lists:
+            offsets.append(offsets[-1] + len(values))
+        flat = array("i")
+        for values in lists:
+            flat.extend(values)
+        return cls(flat, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int):
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+
+class _Snapshot:
+    """Immutable sorted-array index over (property id, label, popularity) entries.
+
+    Entries are stored in rank order (popularity desc, then label), so a slot number is
+    its rank and every posting list, being sorted by slot, is already sorted by rank.
+    Prefix lookups are binary searches over the sorted distinct tokens.
+
+    Every part is a flat array, so write() lays the snapshot out as one file and open()
+    maps it read-only: workers that open the same file share its pages instead of each
+    holding (and building) a copy.
+    """
+
+    # Section name -> array typecode ("B": raw UTF-8 bytes)
+    SECTIONS = {
+        "ids": "q", "popularity": "q", "label_blob": "B", "label_offsets": "q",
+        "token_blob": "B", "token_offsets": "q", "postings": "i", "posting_offsets": "q",
+        "short_blob": "B", "short_offsets": "q", "short_slots": "i", "short_slot_offsets": "q",
+        "sorted_ids": "q", "sorted_slots": "i",
+    }
+
+    def __init__(self, sections: Dict[str, Any], built_at: float = 0.0, dropped: int = 0):
+        self.sections = sections
+        self.built_at = built_at
+        self.dropped = dropped
+        self.ids = sections["ids"]
+        self.popularity = sections["popularity"]
+        self.labels = _Strings(sections["label_blob"], sections["label_offsets"])
+        self.tokens = _Strings(sections["token_blob"], sections["token_offsets"])
+        self.postings = _Slices(sections["postings"], sections["posting_offsets"])
+        # Posting offsets double as cumulative counts, for O(1) posting counts of a token range
+        self.cum = sections["posting_offsets"]
+        self.short_prefixes = _Strings(sections["short_blob"], sections["short_offsets"])
+        self.short_top = _Slices(sections["short_slots"], sections["short_slot_offsets"])
+        self.sorted_ids = sections["sorted_ids"]
+        self.sorted_slots = sections["sorted_slots"]
+
+    @classmethod
+    def build(cls, entries: List[Tuple[int, str, int]], built_at: float = 0.0, dropped: int = 0) -> "_Snapshot":
+        entries = sorted(entries, key=lambda e: (-e[2], e[1], e[0]))
+        labels = [e[1] for e in entries]
+        by_token: Dict[str, List[int]] = {}
+        for slot, label in enumerate(labels):
+            for token in address_tokens(label):
+                by_token.setdefault(token, []).append(slot)
+        tokens = sorted(by_token)
+        postings = _Slices.build([array("i", by_token.pop(token)) for token in tokens])
+        token_strings = _Strings.build(tokens)
+        order = sorted(range(len(entries)), key=lambda slot: entries[slot][0])
+        sections = {
+            "ids": array("q", (e[0] for e in entries)),
+            "popularity": array("q", (e[2] for e in entries)),
+            "postings": postings.values,
+            "posting_offsets": postings.offsets,
+            "sorted_ids": array("q", (entries[slot][0] for slot in order)),
+            "sorted_slots": array("i", order),
+        }
+        label_strings = _Strings.build(labels)
+        sections["label_blob"], sections["label_offsets"] = label_strings.blob, label_strings.offsets
+        sections["token_blob"], sections["token_offsets"] = token_strings.blob, token_strings.offsets
+        sections.update(short_blob=b"", short_offsets=array("q", [0]),
+                        short_slots=array("i"), short_slot_offsets=array("q", [0]))
+        partial = cls(sections)
+
+        prefixes = sorted({t[:length] for t in tokens for length in range(1, SHORT_PREFIX_LENGTH + 1) if len(t) >= length})
+        short_strings = _Strings.build(prefixes)
+        short_top = _Slices.build([array("i", partial._merged(*partial.token_range(p), MAX_SUGGESTIONS)) for p in prefixes])
+        sections.update(short_blob=short_strings.blob, short_offsets=short_strings.offsets,
+                        short_slots=short_top.values, short_slot_offsets=short_top.offsets)
+        return cls(sections, built_at, dropped)
+
+    def write(self, path: str):
+        """Write the snapshot to path atomically (readers see the old or the new file)."""
+        header, offset, chunks = {"built_at": self.built_at, "dropped": self.dropped, "sections": {}}, 0, []
+        for name, typecode in self.SECTIONS.items():
+            data = bytes(self.sections[name]) if typecode == "B" else self.sections[name].tobytes()
+            header["sections"][name] = [offset, len(data)]
+            padding = -len(data) % 8
+            chunks.append(data + b"\0" * padding)
+            offset += len(data) + padding
+        encoded = json.dumps(header).encode("utf-8")
+        encoded += b" " * (-len(encoded) % 8)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(SNAPSHOT_MAGIC + struct.pack("<q", len(encoded)) + encoded)
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp, path)
+
+    @classmethod
+    def open(cls, path: str) -> "_Snapshot":
+        """Map a file written by write(); the pages live in the OS cache, shared by every process."""
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        if bytes(view[:len(SNAPSHOT_MAGIC)]) != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not an address index snapshot")
+        start = len(SNAPSHOT_MAGIC) + 8
+        header_length = struct.unpack("<q", view[len(SNAPSHOT_MAGIC):start])[0]
+        header = json.loads(str(view[start:start + header_length], "utf-8"))
+        base = start + header_length
+        sections = {}
+        for name, typecode in cls.SECTIONS.items():
+            offset, length = header["sections"][name]
+            section = view[base + offset:base + offset + length]
+            sections[name] = section if typecode == "B" else section.cast(typecode)
+        return cls(sections, header["built_at"], header["dropped"])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def token_range(self, prefix: str) -> Tuple[int, int]:
+        """[lo, hi) indexes of the tokens starting with prefix."""
+        return bisect_left(self.tokens, prefix), bisect_left(self.tokens, prefix + "\x7f")
+
+    def posting_count(self, lo: int, hi: int) -> int:
+        return self.cum[hi] - self.cum[lo]
+
+    def _merged(self, lo: int, hi: int, limit: Optional[int] = None):
+        """Distinct slots of the tokens in [lo, hi), in rank order."""
+        merged = heapq.merge(*(self.postings[i] for i in range(lo, hi))) if hi - lo > 1 else iter(self.postings[lo] if hi > lo else ())
+        previous, n = -1, 0
+        for slot in merged:
+            # An address with several tokens under the prefix appears once per token, adjacently
+            if slot == previous:
+                continue
+            if limit is not None and n >= limit:
+                return
+            previous, n = slot, n + 1
+            yield slot
+
+    def _short(self, prefix: str) -> Iterator[int]:
+        """Slots for a short prefix: the precomputed top list, then the rest of the postings.
+
+        The rest is only walked when overlay writes shadow part of the top list, so a query
+        still fills its limit.
+        """
+        i = bisect_left(self.short_prefixes, prefix)
+        if i == len(self.short_prefixes) or self.short_prefixes[i] != prefix:
+            return
+        top = self.short_top[i]
+        yield from top
+        if len(top) == MAX_SUGGESTIONS:
+            yield from itertools.islice(self._merged(*self.token_range(prefix)), MAX_SUGGESTIONS, None)
+
+    def candidates(self, terms: List[str]) -> Tuple[Iterable[int], List[str]]:
+        """Slots in rank order for the most selective term, and the terms still to verify."""
+        if len(terms) == 1 and len(terms[0]) <= SHORT_PREFIX_LENGTH:
+            return self._short(terms[0]), []
+        ranges = [self.token_range(term) for term in terms]
+        if any(lo == hi for lo, hi in ranges):
+            return (), []
+        driver = min(range(len(terms)), key=lambda i: self.posting_count(*ranges[i]))
+        return self._merged(*ranges[driver]), terms[:driver] + terms[driver + 1:]
+
+    def slot_of(self, property_id: int) -> Optional[int]:
+        i = bisect_left(self.sorted_ids, property_id)
+        if i < len(self.sorted_ids) and self.sorted_ids[i] == property_id:
+            return self.sorted_slots[i]
+        return None
+
+
+def build_snapshot(entries: Iterable[Tuple[int, str, int]], max_entries: int,
+                   built_at: Optional[float] = None) -> _Snapshot:
+    """Snapshot of the `max_entries` most popular entries; built_at defaults to now."""
+    entries = [e for e in entries if e[1]]
+    entries.sort(key=lambda e: -e[2])
+    dropped = max(0, len(entries) - max_entries)
+    return _Snapshot.build(entries[:max_entries], time.time() if built_at is None else built_at, dropped)
+
+
+class AddressIndex:
+    """In-memory address typeahead: prefix matches over address tokens, ranked by popularity.
+
+    The snapshot is built outside the web workers (scripts/build_address_index.py) and
+    written to a file that every worker maps with open(), so the pages are shared and no
+    worker spends CPU building it. Creates, updates and deletes since the build go to a
+    small per-worker overlay that shadows the snapshot by property id; loading a newer
+    snapshot drops the overlay writes it already contains.
+    """
+
+    def __init__(self):
+        self._snapshot = _Snapshot.build([])
+        # property id -> (write time, label, popularity, tokens); label None = deleted
+        self._overlay: Dict[int, Tuple[float, Optional[str], int, List[str]]] = {}
+        self._lock = threading.Lock()
+        self._path = None
+        self._mtime = None
+        self.ready = False
+        self.queries = 0
+        self.loads = 0
+
+    def load(self, snapshot: _Snapshot):
+        """Swap in snapshot, keeping overlay writes it may not contain."""
+        with self._lock:
+            self._snapshot = snapshot
+            cutoff = snapshot.built_at - OVERLAY_RETAIN_SECONDS
+            self._overlay = {pid: entry for pid, entry in self._overlay.items() if entry[0] > cutoff}
+            self.loads += 1
+            self.ready = True
+
+    def open(self, path: str) -> bool:
+        """Map the snapshot file at path unless it is the one already loaded; True if loaded."""
+        mtime = os.stat(path).st_mtime
+        if path == self._path and mtime == self._mtime:
+            return False
+        self.load(_Snapshot.open(path))
+        self._path, self._mtime = path, mtime
+        return True
+
+    def upsert(self, property_id: int, label: Optional[str]):
+        self._write(property_id, label or None)
+
+    def remove(self, property_id: int):
+        self._write(property_id, None)
+
+    def _write(self, property_id: int, label: Optional[str]):
+        with self._lock:
+            popularity = 0
+            slot = self._snapshot.slot_of(property_id)
+            if slot is not None:
+                popularity = self._snapshot.popularity[slot]
+            elif property_id in self._overlay:
+                popularity = self._overlay[property_id][2]
+            self._overlay[property_id] = (time.time(), label, popularity, address_tokens(label))
+
+    def suggest(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Up to `limit` {"id", "address"} matches, most popular first.
+
+        Every query term must prefix-match a token of the address; the last term is the
+        one being typed.
+        """
+        terms = query_terms(query)
+        if not terms:
+            return []
+        limit = min(limit, MAX_SUGGESTIONS)
+        with self._lock:
+            snapshot = self._snapshot
+            overlay = dict(self._overlay)
+            self.queries += 1
+
+        found = []
+        candidates, rest = snapshot.candidates(terms)
+        patterns = [_term_pattern(term) for term in rest]
+        for scanned, slot in enumerate(candidates):
+            if scanned >= MAX_SCAN or len(found) >= limit:
+                break
+            pid = snapshot.ids[slot]
+            if pid in overlay:
+                continue
+            label = snapshot.labels[slot]
+            if patterns:
+                lowered = label.lower()
+                if not all(pattern.search(lowered) for pattern in patterns):
+                    continue
+            found.append((-snapshot.popularity[slot], label, pid))
+        for pid, (_, label, popularity, tokens) in overlay.items():
+            if label is not None and _matches(terms, tokens):
+                found.append((-popularity, label, pid))
+        found.sort()
+        return [{"id": pid, "address": label} for _, label, pid in found[:limit]]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "name": "address_autocomplete",
+                "ready": self.ready,
+                "size": len(self._snapshot),
+                "tokens": len(self._snapshot.tokens),
+                "overlay": len(self._overlay),
+                "built_at": self._snapshot.built_at,
+                "dropped": self._snapshot.dropped,
+                "queries": self.queries,
+                "loads": self.loads,
+            }
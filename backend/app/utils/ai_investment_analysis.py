@@ -1,22 +1,116 @@
 from google import genai
 import json
-from ..core.prompts import generate_investment_prompt
-from google.genai import types
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple
+from pydantic import ValidationError
+from ..core.prompts import build_investment_prompt, build_batch_block, estimate_tokens, INVESTMENT_BATCH_INSTRUCTIONS
+from ..schemas.investment import AIBatchAnalysisItem
+from google.genai import types, errors
 from ..core.config import settings
+from ..core.resilience import breakers, call_with_breaker
 
 api_key = settings.GOOGLE_GENAI_KEY
 genai.api_key = api_key
 
-client = genai.Client(api_key=api_key)
+# Every request gets a deadline so a degraded Gemini cannot hold worker threads indefinitely
+client = genai.Client(api_key=api_key, http_options=types.HttpOptions(timeout=int(settings.GEMINI_TIMEOUT_SECONDS * 1000)))
+gemini_breaker = breakers.get("gemini", settings.BREAKER_FAILURE_THRESHOLD, settings.BREAKER_RESET_SECONDS)
 
-def ai_investment_analysis(property_data, cap_rate):
-    prompt = generate_investment_prompt(property_data, cap_rate)
-    res = client.models.generate_content(
-        model="gemini-2.5-flash",
+MODEL = "gemini-2.5-flash"
+# Properties packed into one structured-output request, and requests in flight at once
+BATCH_SIZE = 10
+BATCH_CONCURRENCY = 4
+
+
+def _usage(res, prompt) -> dict:
+    meta = res.usage_metadata
+    return {
+        "prompt_tokens": getattr(meta, "prompt_token_count", None),
+        "cached_tokens": getattr(meta, "cached_content_token_count", None),
+        "response_tokens": getattr(meta, "candidates_token_count", None),
+        "thinking_tokens": getattr(meta, "thoughts_token_count", None),
+        "total_tokens": getattr(meta, "total_token_count", None),
+        "estimated_prompt_tokens": prompt["estimated_tokens"],
+        "dropped_sections": prompt["dropped_sections"],
+    }
+
+
+class StubModels:
+    """Offline stand-in for client.models.generate_content (tests, benchmarks, no API key).
+
+    Answers single and batched investment prompts with a deterministic, schema-valid
+    analysis per property ("Invest" at or above an 8% cap rate) and reports estimated
+    token usage, after `latency` seconds to mimic a model round trip.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    @staticmethod
+    def _analysis(cap_rate: float) -> Dict[str, Any]:
+        decision = "Invest" if cap_rate >= 8.0 else "Do Not Invest"
+        return {
+            "summary": f"Stub analysis at a {cap_rate}% cap rate.",
+            "recommendation": {"decision": decision, "justification": f"Cap rate of {cap_rate}% versus an 8% target."},
+            "potential_risks": ["Stub risk"],
+            "recommendations": ["Stub recommendation"],
+        }
+
+    def generate_content(self, model, config, contents):
+        if self.latency:
+            time.sleep(self.latency)
+        cap_rates = [float(c) for c in re.findall(r"Cap Rate\): (-?[\d.]+)%", contents)]
+        ids = [int(i) for i in re.findall(r"^Property (\d+):", contents, re.M)]
+        if ids:
+            payload = [{"property_id": pid, "result": self._analysis(cap)} for pid, cap in zip(ids, cap_rates)]
+        else:
+            payload = self._analysis(cap_rates[0] if cap_rates else 0.0)
+        text = json.dumps(payload)
+        prompt_tokens = estimate_tokens((config.system_instruction or "") + contents)
+        usage = SimpleNamespace(prompt_token_count=prompt_tokens, cached_content_token_count=None,
+                                candidates_token_count=estimate_tokens(text), thoughts_token_count=None,
+                                total_token_count=prompt_tokens + estimate_tokens(text))
+        part = SimpleNamespace(text=text)
+        return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))], usage_metadata=usage)
+
+
+def _is_gemini_failure(error: BaseException) -> bool:
+    # 4xx other than timeouts/throttling mean a bad request, not an unhealthy service
+    if isinstance(error, errors.ClientError):
+        return error.code in (408, 429)
+    return True
+
+
+def _generate(models, **kwargs):
+    """generate_content through the Gemini breaker (the stub bypasses it).
+
+    Not retried: a generation is billed per attempt, so a failed call falls straight
+    through to the caller's fallback.
+    """
+    if models is not client.models:
+        return models.generate_content(**kwargs)
+    return call_with_breaker(gemini_breaker, lambda: models.generate_content(**kwargs), is_failure=_is_gemini_failure)
+
+
+def default_models():
+    """client.models, or the offline stub when GEMINI_USE_STUB is set."""
+    return StubModels() if settings.GEMINI_USE_STUB else client.models
+
+
+def ai_investment_analysis(property_data, cap_rate, token_budget: Optional[int] = None, models=None):
+    prompt = build_investment_prompt(property_data, cap_rate, token_budget or settings.GEMINI_PROMPT_TOKEN_BUDGET)
+    models = models or default_models()
+    res = _generate(
+        models,
+        model=MODEL,
         config=types.GenerateContentConfig(
-            system_instruction="You are a professional real estate investment analyst"
+            system_instruction=prompt["instructions"]
         ),
-        contents=prompt
+        contents=prompt["contents"]
     )
 
     text = res.candidates[0].content.parts[0].text
@@ -24,4 +118,115 @@ def ai_investment_analysis(property_data, cap_rate):
         investment_analysis_json = json.loads(text)
     except Exception as e:
         raise ValueError(f"Failed to parse Gemini output as JSON. Error: {e}\nRaw output:\n{text}")
-    return {"investment_analysis": investment_analysis_json}
\ No newline at end of file
+    return {"investment_analysis": investment_analysis_json, "usage": _usage(res, prompt)}
+
+
+def _generate_batch(models, blocks: List[Tuple[int, str]]) -> Tuple[Dict[int, Dict[str, Any]], Dict[str, Any]]:
+    """One structured-output request for several properties: (valid analyses by id, usage)."""
+    contents = "\n\n".join(block for _, block in blocks)
+    res = _generate(
+        models,
+        model=MODEL,
+        config=types.GenerateContentConfig(
+            system_instruction=INVESTMENT_BATCH_INSTRUCTIONS,
+            response_mime_type="application/json",
+            response_schema=list[AIBatchAnalysisItem],
+        ),
+        contents=contents
+    )
+    text = res.candidates[0].content.parts[0].text
+    try:
+        items = json.loads(text)
+    except Exception as e:
+        raise ValueError(f"Failed to parse Gemini batch output as JSON. Error: {e}\nRaw output:\n{text}")
+    expected = {pid for pid, _ in blocks}
+    by_id = {}
+    for raw in items if isinstance(items, list) else []:
+        try:
+            item = AIBatchAnalysisItem.model_validate(raw)
+        except ValidationError:
+            continue
+        # Ignore ids that were not asked for and duplicates; the first valid answer wins
+        if item.property_id in expected and item.property_id not in by_id:
+            by_id[item.property_id] = item.result.model_dump()
+    meta = res.usage_metadata
+    usage = {
+        "prompt_tokens": getattr(meta, "prompt_token_count", None) or 0,
+        "response_tokens": getattr(meta, "candidates_token_count", None) or 0,
+        "thinking_tokens": getattr(meta, "thoughts_token_count", None) or 0,
+        "total_tokens": getattr(meta, "total_token_count", None) or 0,
+        "requests": 1,
+    }
+    return by_id, usage
+
+
+def _analyze_batch(models, blocks: List[Tuple[int, str]]) -> List[Tuple[int, Dict[str, Any]]]:
+    """Run one batch, re-asking once for properties that came back missing or invalid.
+
+    Token usage of the batch (and of the retry) is split evenly across its properties.
+    """
+    try:
+        by_id, usage = _generate_batch(models, blocks)
+        missing = [(pid, block) for pid, block in blocks if pid not in by_id]
+        if missing:
+            retried, retry_usage = _generate_batch(models, missing)
+            by_id.update(retried)
+            usage = {k: usage[k] + retry_usage[k] for k in usage}
+    except Exception as e:
+        return [(pid, {"error": str(e)}) for pid, _ in blocks]
+
+    share = {k: round(v / len(blocks), 1) for k, v in usage.items()}
+    share["batch_size"] = len(blocks)
+    results = []
+    for pid, _ in blocks:
+        if pid in by_id:
+            results.append((pid, {"investment_analysis": by_id[pid], "usage": share}))
+        else:
+            results.append((pid, {"error": "Gemini returned no valid analysis for this property", "usage": share}))
+    return results
+
+
+def analyze_prompt_blocks(
+        blocks: Iterable[Tuple[int, str]],
+        batch_size: int = BATCH_SIZE,
+        max_concurrency: int = BATCH_CONCURRENCY,
+        models=None
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Analyze prebuilt (property_id, build_batch_block(...)) pairs, several per request.
+
+    Yields (property_id, result) in input order. A result is {"investment_analysis", "usage"}
+    like ai_investment_analysis (usage is the property's share of its batch), or {"error"}.
+    At most `max_concurrency` requests are in flight and `blocks` is only consumed as
+    slots free up, so a slow model applies backpressure to the caller's producer.
+    """
+    models = models or default_models()
+
+    def batches() -> Iterator[List[Tuple[int, str]]]:
+        batch = []
+        for pid, block in blocks:
+            batch.append((pid, block))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        pending = deque()
+        for batch in batches():
+            pending.append(pool.submit(_analyze_batch, models, batch))
+            while len(pending) >= max_concurrency:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def ai_investment_analysis_batch(
+        items: Iterable[Tuple[int, Dict[str, Any], float]],
+        batch_size: int = BATCH_SIZE,
+        max_concurrency: int = BATCH_CONCURRENCY,
+        models=None
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """analyze_prompt_blocks over (property_id, property_data, cap_rate) items."""
+    blocks = ((pid, build_batch_block(pid, data, cap_rate)) for pid, data, cap_rate in items)
+    return analyze_prompt_blocks(blocks, batch_size, max_concurrency, models)
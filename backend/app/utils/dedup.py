@@ -0,0 +1,157 @@
+import re
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.utils.address_index import TOKEN_ALIASES
+from app.utils.geo import haversine_miles
+
+# Near-duplicate detection for property records (ORM objects or dicts with model field
+# names). Records are only compared within a block sharing ZIP code and street number,
+# so detection is linear in the number of records rather than pairwise.
+
+_NON_ALNUM = re.compile(r"[^0-9a-z#]+")
+# Unit designators; the token after one (or after "#") is the unit number
+UNIT_WORDS = {"unit", "apt", "apartment", "ste", "suite", "#", "lot", "bldg", "fl", "floor", "rm", "room", "spc"}
+# Coordinates this close are treated as the same building
+SAME_BUILDING_MILES = 0.01  # ~16m
+# Street-name similarity required when only the coordinates agree
+STREET_SIMILARITY = 0.85
+
+
+def _get(record: Any, name: str):
+    return record.get(name) if isinstance(record, dict) else getattr(record, name, None)
+
+
+def _street_text(record: Any) -> str:
+    """Street part of the address: address_line1 (+ line2), else formatted_address without "City, ST ZIP"."""
+    line1 = _get(record, "address_line1")
+    if line1:
+        return " ".join(p for p in (line1, _get(record, "address_line2")) if p)
+    parts = (_get(record, "formatted_address") or "").split(",")
+    return " ".join(parts[:-2]) if len(parts) >= 3 else parts[0]
+
+
+def parse_street_address(text: Optional[str]) -> Tuple[Optional[str], str, Optional[str]]:
+    """(street number, normalized street name, unit) of a street line.
+
+    "123 Main Street, Unit 1" and "123 main st #1" both give ("123", "main st", "1").
+    """
+    raw = (text or "").lower().replace("#", " # ")
+    tokens = [t for t in _NON_ALNUM.split(raw) if t]
+    number = None
+    if tokens and tokens[0][0].isdigit():
+        number = tokens.pop(0)
+    street, unit = [], None
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in UNIT_WORDS:
+            if i + 1 < len(tokens):
+                unit = tokens[i + 1].lstrip("#")
+            i += 2
+            continue
+        street.append(TOKEN_ALIASES.get(token, token))
+        i += 1
+    return number, " ".join(street), unit
+
+
+def zip5(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    digits = str(value).strip()[:5]
+    return digits if len(digits) == 5 and digits.isdigit() else None
+
+
+def blocking_key(record: Any) -> Optional[Tuple[str, str]]:
+    """(ZIP5, street number): only records sharing this key are compared."""
+    number, _, _ = parse_street_address(_street_text(record))
+    zip_code = zip5(_get(record, "zip_code"))
+    if not zip_code or not number:
+        return None
+    return zip_code, number
+
+
+def _conflict(a: Any, b: Any) -> bool:
+    """Distinct unit numbers or distinct assessor IDs always mean distinct properties."""
+    _, _, unit_a = parse_street_address(_street_text(a))
+    _, _, unit_b = parse_street_address(_street_text(b))
+    if unit_a and unit_b and unit_a != unit_b:
+        return True
+    assessor_a, assessor_b = _get(a, "assessor_id"), _get(b, "assessor_id")
+    return bool(assessor_a and assessor_b and assessor_a != assessor_b)
+
+
+def duplicate_reason(a: Any, b: Any) -> Optional[str]:
+    """Why two records in the same block are the same property, or None if they are not.
+
+    Records match on assessor ID, on normalized street address (a missing unit matches
+    any unit), or on coordinates within ~16m together with a similar street name.
+    """
+    if _conflict(a, b):
+        return None
+    if _get(a, "assessor_id") and _get(a, "assessor_id") == _get(b, "assessor_id"):
+        return "assessor_id"
+    _, street_a, _ = parse_street_address(_street_text(a))
+    _, street_b, _ = parse_street_address(_street_text(b))
+    if street_a and street_a == street_b:
+        return "address"
+    coords = [_get(r, name) for r in (a, b) for name in ("latitude", "longitude")]
+    if all(isinstance(c, (int, float)) for c in coords) and street_a and street_b:
+        if haversine_miles(*coords) <= SAME_BUILDING_MILES \
+                and SequenceMatcher(None, street_a, street_b).ratio() >= STREET_SIMILARITY:
+            return "coordinates"
+    return None
+
+
+def find_duplicates_in(record: Any, candidates: Iterable[Any]) -> List[Tuple[Any, str]]:
+    """(candidate, reason) for each candidate that duplicates `record`."""
+    matches = []
+    for candidate in candidates:
+        reason = duplicate_reason(record, candidate)
+        if reason:
+            matches.append((candidate, reason))
+    return matches
+
+
+def duplicate_groups(block: List[Any]) -> List[List[Tuple[Any, Optional[str]]]]:
+    """Groups of two or more duplicate records within one block, as (record, reason) lists.
+
+    A record joins the first group it duplicates a member of and conflicts with none of,
+    so "123 Main St" can absorb "Unit 1" without also merging "Unit 1" with "Unit 2".
+    The reason is how the record joined; None for the record that started the group.
+    """
+    groups: List[List[Tuple[Any, Optional[str]]]] = []
+    for record in block:
+        for group in groups:
+            if any(_conflict(member, record) for member, _ in group):
+                continue
+            reason = next((r for r in (duplicate_reason(m, record) for m, _ in group) if r), None)
+            if reason:
+                group.append((record, reason))
+                break
+        else:
+            groups.append([(record, None)])
+    return [group for group in groups if len(group) > 1]
+
+
+def completeness(record: Any, fields: Iterable[str]) -> int:
+    return sum(1 for name in fields if _get(record, name) not in (None, "", {}, []))
+
+
+def choose_survivor(records: List[Any], fields: Iterable[str]) -> Any:
+    """The record to keep: the most complete one, then the oldest (lowest id)."""
+    fields = list(fields)
+    return min(records, key=lambda r: (-completeness(r, fields), _get(r, "id") or 0))
+
+
+def merge_values(survivor: Any, duplicates: List[Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """Values to fill on the survivor: fields it lacks, taken from the first duplicate that has them."""
+    values = {}
+    for name in fields:
+        if _get(survivor, name) not in (None, "", {}, []):
+            continue
+        for duplicate in duplicates:
+            value = _get(duplicate, name)
+            if value not in (None, "", {}, []):
+                values[name] = value
+                break
+    return values
@@ -0,0 +1,151 @@
+import math
+from typing import List, Optional, Tuple
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Stored on every property (~4.8m x 4.8m cells); range scans use coarser prefixes of it
+GEOHASH_PRECISION = 9
+# Upper bound on cells used to cover a query box; more cells means tighter ranges but
+# a longer OR list in the WHERE clause
+MAX_COVER_CELLS = 24
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LAT = 69.0
+
+# (west, south, east, north) in degrees
+BBox = Tuple[float, float, float, float]
+
+
+def geohash_encode(lat: Optional[float], lon: Optional[float], precision: int = GEOHASH_PRECISION) -> Optional[str]:
+    if lat is None or lon is None or not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
+        return None
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, ch, even = [], 0, 0, True
+    while len(chars) < precision:
+        # Bits alternate longitude/latitude, starting with longitude
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            ch = (ch << 1) | (lon >= mid)
+            lon_lo, lon_hi = (mid, lon_hi) if lon >= mid else (lon_lo, mid)
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            ch = (ch << 1) | (lat >= mid)
+            lat_lo, lat_hi = (mid, lat_hi) if lat >= mid else (lat_lo, mid)
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[ch])
+            bits, ch = 0, 0
+    return "".join(chars)
+
+
+def geohash_cell_size(precision: int) -> Tuple[float, float]:
+    """(lat degrees, lon degrees) spanned by one cell at `precision`."""
+    total = 5 * precision
+    return 180.0 / 2 ** (total // 2), 360.0 / 2 ** (total - total // 2)
+
+
+def haversine_miles(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlmb = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(lat: float, lon: float, radius_miles: float) -> BBox:
+    """Smallest lat/lon box containing the circle (clamped to valid coordinates)."""
+    dlat = radius_miles / MILES_PER_DEGREE_LAT
+    cos_lat = math.cos(math.radians(lat))
+    dlon = 180.0 if cos_lat < 1e-6 else min(180.0, dlat / cos_lat)
+    return max(-180.0, lon - dlon), max(-90.0, lat - dlat), min(180.0, lon + dlon), min(90.0, lat + dlat)
+
+
+def parse_bbox(value: str) -> BBox:
+    """"west,south,east,north" -> BBox. Raises ValueError on malformed or inverted boxes."""
+    try:
+        west, south, east, north = (float(part) for part in value.split(","))
+    except (TypeError, ValueError):
+        raise ValueError("bbox must be 'west,south,east,north' in decimal degrees")
+    if not (-180 <= west <= 180 and -180 <= east <= 180 and -90 <= south <= 90 and -90 <= north <= 90):
+        raise ValueError("bbox coordinates out of range")
+    if west > east or south > north:
+        raise ValueError("bbox must satisfy west <= east and south <= north (antimeridian boxes are not supported)")
+    return west, south, east, north
+
+
+def _next_prefix(prefix: str) -> Optional[str]:
+    """Smallest string greater than every string starting with `prefix` (None if unbounded)."""
+    while prefix:
+        i = GEOHASH_ALPHABET.index(prefix[-1])
+        if i + 1 < len(GEOHASH_ALPHABET):
+            return prefix[:-1] + GEOHASH_ALPHABET[i + 1]
+        prefix = prefix[:-1]
+    return None
+
+
+def _cell_range(lo: float, hi: float, step: float, origin: float) -> range:
+    return range(int(math.floor((lo - origin) / step)), int(math.floor((hi - origin) / step)) + 1)
+
+
+def geohash_bounds(cell: str) -> BBox:
+    """(west, south, east, north) of a geohash cell."""
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    even = True
+    for char in cell:
+        bits = GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            bit = (bits >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                lon_lo, lon_hi = (mid, lon_hi) if bit else (lon_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            even = not even
+    return lon_lo, lat_lo, lon_hi, lat_hi
+
+
+def _bbox_grid(bbox: BBox, precision: int) -> Tuple[range, range]:
+    west, south, east, north = bbox
+    lat_step, lon_step = geohash_cell_size(precision)
+    return (_cell_range(south, min(north, 90 - 1e-9), lat_step, -90.0),
+            _cell_range(west, min(east, 180 - 1e-9), lon_step, -180.0))
+
+
+def count_cells(bbox: BBox, precision: int) -> int:
+    rows, cols = _bbox_grid(bbox, precision)
+    return len(rows) * len(cols)
+
+
+def cells_in_bbox(bbox: BBox, precision: int) -> List[str]:
+    """Every geohash cell at `precision` intersecting `bbox`, in geohash order."""
+    rows, cols = _bbox_grid(bbox, precision)
+    lat_step, lon_step = geohash_cell_size(precision)
+    return sorted({
+        geohash_encode(-90.0 + (r + 0.5) * lat_step, -180.0 + (c + 0.5) * lon_step, precision)
+        for r in rows for c in cols
+    })
+
+
+def covering_cells(bbox: BBox, max_cells: int = MAX_COVER_CELLS, max_precision: int = GEOHASH_PRECISION) -> List[str]:
+    """Geohash cells covering `bbox` at the finest precision (up to max_precision) needing at most `max_cells`."""
+    for precision in range(max_precision, 0, -1):
+        if count_cells(bbox, precision) <= max_cells or precision == 1:
+            return cells_in_bbox(bbox, precision)
+    return []
+
+
+def covering_ranges(bbox: BBox, max_cells: int = MAX_COVER_CELLS,
+                    max_precision: int = GEOHASH_PRECISION) -> List[Tuple[str, Optional[str]]]:
+    """[lower, upper) geohash string ranges whose union covers `bbox`.
+
+    Each range is a B-tree range scan on a geohash column; cells that are adjacent in
+    geohash order are merged into one range. upper is None when unbounded.
+    """
+    ranges: List[Tuple[str, Optional[str]]] = []
+    for cell in covering_cells(bbox, max_cells, max_precision):
+        upper = _next_prefix(cell)
+        if ranges and ranges[-1][1] == cell:
+            ranges[-1] = (ranges[-1][0], upper)
+        else:
+            ranges.append((cell, upper))
+    return ranges
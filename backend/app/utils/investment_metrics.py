@@ -1,8 +1,11 @@
 from typing import Dict, Any, Optional
 from datetime import date
+from app.crud.market import lookup_market_stat
+from app.models.property import extract_latest_tax, extract_annual_hoa
 
 # Heuristic-only, DB-data-only estimations. No external API calls.
 # Intent: provide a reasonable cap rate estimate using property attributes on record.
+# Per-sqft baselines come from the precomputed ZIP/county market stats when available.
 
 DEFAULT_EXPENSE_RATES = {
     "property_management": 0.10,  # 10% of rent
@@ -14,34 +17,33 @@ DEFAULT_EXPENSE_RATES = {
 DEFAULT_PROPERTY_TAX_RATE = 0.013   # used only as a fallback when no tax data/override
 DEFAULT_UTILITIES_RATE = 0.0        # as a fraction of annual rent
 
-# Fallback per-sqft monthly rent baseline (very conservative). Adjusted by bedrooms/bathrooms.
+# National fallback per-sqft monthly rent baseline (very conservative). Adjusted by bedrooms/bathrooms.
 BASE_RENT_PER_SQFT = 1.10
 BEDROOM_BONUS = 150.0
 BATHROOM_BONUS = 75.0
 
-# Fallback price-per-sqft if value missing
+# National fallback price-per-sqft if value missing and no local market stats
 FALLBACK_PRICE_PER_SQFT = 160.0
 
-
-def _dict_get(d: Dict[str, Any] | None, *keys, default=None):
-    cur = d or {}
-    for k in keys:
-        if not isinstance(cur, dict) or k not in cur:
-            return default
-        cur = cur[k]
-    return cur
+# Sale prices older than this are aged forward by the local repeat-sales appreciation rate,
+# clamped to a plausible annual range so a thin market cannot swing the estimate wildly
+STALE_SALE_YEARS = 2.0
+MIN_ANNUAL_APPRECIATION_PCT = -10.0
+MAX_ANNUAL_APPRECIATION_PCT = 15.0
 
 
 def estimate_monthly_rent(property_data: Dict[str, Any]) -> float:
     """Estimate monthly rent using only on-record attributes.
 
     Formula: sqft * base + bedroom/ba bonuses. Clamped minimally at 0.
+    The base is the local median rent/sqft when known, else BASE_RENT_PER_SQFT.
     """
     sqft = float(property_data.get("squareFootage") or 0) or float(property_data.get("square_footage") or 0)
     beds = float(property_data.get("bedrooms") or 0)
     baths = float(property_data.get("bathrooms") or 0)
 
-    base = sqft * BASE_RENT_PER_SQFT
+    rent_per_sqft = lookup_market_stat(property_data, "median_rent_per_sqft") or BASE_RENT_PER_SQFT
+    base = sqft * rent_per_sqft
     adj = (beds * BEDROOM_BONUS) + (baths * BATHROOM_BONUS)
 
     rent = max(0.0, base + adj)
@@ -53,9 +55,21 @@ def estimate_monthly_rent(property_data: Dict[str, Any]) -> float:
     return round(rent, 2)
 
 
+def _sale_age_years(last_sale_date) -> Optional[float]:
+    if not last_sale_date:
+        return None
+    try:
+        sold = last_sale_date if isinstance(last_sale_date, date) else date.fromisoformat(str(last_sale_date)[:10])
+    except ValueError:
+        return None
+    return max(0.0, (date.today() - sold).days / 365.25)
+
+
 def get_property_value(property_data: Dict[str, Any]) -> float:
-    """Use last sale price if available/recent; else fallback by sqft.
+    """Use last sale price if available; else fallback by sqft.
     We avoid any external estimates and keep calculation deterministic.
+    The sqft fallback uses the local median price/sqft when known, and a sale older
+    than STALE_SALE_YEARS is aged by the local annual appreciation when known.
     """
     value = property_data.get("lastSalePrice") or property_data.get("last_sale_price")
     last_sale_date = property_data.get("lastSaleDate") or property_data.get("last_sale_date")
@@ -64,41 +78,53 @@ def get_property_value(property_data: Dict[str, Any]) -> float:
     if not value:
         sqft = float(property_data.get("squareFootage") or property_data.get("square_footage") or 0)
         if sqft > 0:
-            return round(sqft * FALLBACK_PRICE_PER_SQFT, 2)
+            price_per_sqft = lookup_market_stat(property_data, "median_price_per_sqft") or FALLBACK_PRICE_PER_SQFT
+            return round(sqft * price_per_sqft, 2)
         return 0.0
 
-    # If we have a value, just use it. We could age-adjust if very old, but
-    # that would introduce additional assumptions; keep it simple.
     try:
-        return float(value)
+        value = float(value)
     except Exception:
         return 0.0
 
+    # Age-adjust old sales by the median appreciation of repeat sales in the ZIP/county
+    years = _sale_age_years(last_sale_date)
+    if years is not None and years > STALE_SALE_YEARS:
+        rate = lookup_market_stat(property_data, "annual_appreciation_pct")
+        if rate is not None:
+            rate = min(MAX_ANNUAL_APPRECIATION_PCT, max(MIN_ANNUAL_APPRECIATION_PCT, rate))
+            return round(value * (1 + rate / 100.0) ** years, 2)
+    return value
 
-def _get_property_taxes_annual(property_data: Dict[str, Any], property_value: float, tax_rate_fallback: float) -> float:
-    # propertyTaxes expected shape from DB mirrors RentCast: {"2023": {"total": 3200, ...}, ...}
-    taxes = property_data.get("propertyTaxes") or property_data.get("property_taxes") or {}
-    if isinstance(taxes, dict) and taxes:
-        try:
-            recent_year = max(taxes.keys(), key=lambda x: int(x))
-            amt = _dict_get(taxes, recent_year, "total", default=None)
-            if isinstance(amt, (int, float)) and amt > 0:
-                return float(amt)
-        except Exception:
-            pass
-    # If absent, estimate as provided fallback rate of value
-    return float(property_value) * float(tax_rate_fallback)
+
+def _precomputed(property_data: Dict[str, Any], alias: str, name: str):
+    """(present, value) for a carrying-cost column extracted at ingest."""
+    if alias in property_data:
+        return True, property_data[alias]
+    if name in property_data:
+        return True, property_data[name]
+    return False, None
+
+
+def _get_known_taxes_annual(property_data: Dict[str, Any]) -> Optional[float]:
+    # DB rows carry annual_tax extracted at write time; only raw dicts need the JSON parsed
+    present, amt = _precomputed(property_data, "annualTax", "annual_tax")
+    if not present:
+        taxes = property_data.get("propertyTaxes") or property_data.get("property_taxes")
+        _, amt = extract_latest_tax(taxes)
+    if isinstance(amt, (int, float)) and amt > 0:
+        return float(amt)
+    return None
 
 
 def _get_hoa_annual(property_data: Dict[str, Any]) -> float:
-    hoa = property_data.get("hoa") or {}
-    monthly = _dict_get(hoa, "fee", default=0) or _dict_get(hoa, "monthlyFee", default=0)
-    if isinstance(monthly, (int, float)) and monthly > 0:
-        return float(monthly) * 12.0
-    return 0.0
+    present, annual = _precomputed(property_data, "annualHoa", "annual_hoa")
+    if not present:
+        annual = extract_annual_hoa(property_data.get("hoa"))
+    return float(annual or 0.0)
 
 
-def _merge_rates(overrides: Optional[Dict[str, Any]]) -> Dict[str, float]:
+def merge_expense_rates(overrides: Optional[Dict[str, Any]]) -> Dict[str, float]:
     rates = {
         "property_management": DEFAULT_EXPENSE_RATES["property_management"],
         "maintenance_repairs": DEFAULT_EXPENSE_RATES["maintenance_repairs"],
@@ -127,30 +153,17 @@ def _merge_rates(overrides: Optional[Dict[str, Any]]) -> Dict[str, float]:
     return rates
 
 
-def compute_annual_expenses(
+def expense_components(
     property_data: Dict[str, Any],
-    annual_rent: float,
-    property_value: float,
     overrides: Optional[Dict[str, Any]] = None,
-) -> float:
-    """Compute annual operating expenses with optional user overrides.
+) -> Dict[str, Any]:
+    """Resolve the inputs of compute_annual_expenses that do not depend on rent or value.
 
-    Overrides supported keys:
-    - *_rate: property_management_rate, maintenance_repairs_rate, vacancy_allowance_rate,
-              insurance_rate, property_tax_rate, utilities_rate
-    - hoa_monthly, hoa_annual, taxes_annual
+    Returns the merged rates plus the fixed annual taxes and HOA. taxes_annual is None
+    when neither an override nor DB tax data exists, meaning taxes scale with value
+    at rates["property_tax_rate"].
     """
-    rates = _merge_rates(overrides)
-
-    e = 0.0
-    # Rent-based expenses
-    e += annual_rent * rates["property_management"]
-    e += annual_rent * rates["maintenance_repairs"]
-    e += annual_rent * rates["vacancy_allowance"]
-    e += annual_rent * rates["utilities_rate"]
-
-    # Value-based expenses
-    e += property_value * rates["insurance_rate"]
+    rates = merge_expense_rates(overrides)
 
     # Taxes (annual): explicit override > DB data > fallback rate
     taxes_annual = None
@@ -160,8 +173,7 @@ def compute_annual_expenses(
         except Exception:
             taxes_annual = None
     if taxes_annual is None:
-        taxes_annual = _get_property_taxes_annual(property_data, property_value, rates["property_tax_rate"])
-    e += taxes_annual
+        taxes_annual = _get_known_taxes_annual(property_data)
 
     # HOA (annual): explicit override > DB-derived
     hoa_annual = None
@@ -178,11 +190,86 @@ def compute_annual_expenses(
                 hoa_annual = None
     if hoa_annual is None:
         hoa_annual = _get_hoa_annual(property_data)
-    e += hoa_annual
+
+    return {"rates": rates, "taxes_annual": taxes_annual, "hoa_annual": hoa_annual}
+
+
+def compute_annual_expenses(
+    property_data: Dict[str, Any],
+    annual_rent: float,
+    property_value: float,
+    overrides: Optional[Dict[str, Any]] = None,
+) -> float:
+    """Compute annual operating expenses with optional user overrides.
+
+    Overrides supported keys:
+    - *_rate: property_management_rate, maintenance_repairs_rate, vacancy_allowance_rate,
+              insurance_rate, property_tax_rate, utilities_rate
+    - hoa_monthly, hoa_annual, taxes_annual
+    """
+    components = expense_components(property_data, overrides)
+    rates = components["rates"]
+
+    e = 0.0
+    # Rent-based expenses
+    e += annual_rent * rates["property_management"]
+    e += annual_rent * rates["maintenance_repairs"]
+    e += annual_rent * rates["vacancy_allowance"]
+    e += annual_rent * rates["utilities_rate"]
+
+    # Value-based expenses
+    e += property_value * rates["insurance_rate"]
+
+    taxes_annual = components["taxes_annual"]
+    if taxes_annual is None:
+        taxes_annual = property_value * rates["property_tax_rate"]
+    e += taxes_annual
+
+    e += components["hoa_annual"]
 
     return e
 
 
+def _refreshed_value(property_data: Dict[str, Any], refreshed: Optional[Dict[str, Any]]) -> Optional[float]:
+    """The background-refreshed value, unless the property sold after it was fetched
+    (same rule as PropertyAnalyzer._get_property_value)."""
+    if not refreshed or not refreshed.get("value"):
+        return None
+    sale_date = property_data.get("last_sale_date") or property_data.get("lastSaleDate")
+    if sale_date and str(sale_date)[:10] > refreshed["refreshed_at"].date().isoformat():
+        return None
+    return float(refreshed["value"])
+
+
+def investment_metrics_for(property_data: Dict[str, Any],
+                           refreshed: Optional[Dict[str, Any]] = None) -> Dict[str, Optional[float]]:
+    """Default-assumption metrics stored per property so the screener can rank by index.
+
+    Same value/rent/expense model as analyze_investment; metrics are None when the
+    property has no usable value or rent drivers. Stored RentCast estimates
+    (crud.refresh.get_refreshed_estimates_for) take precedence over the DB heuristics.
+    """
+    value = _refreshed_value(property_data, refreshed) or get_property_value(property_data)
+    monthly_rent = float(refreshed["rent"]) if refreshed and refreshed.get("rent") else \
+        estimate_monthly_rent(property_data)
+    metrics = {
+        "estimated_value": value or None,
+        "estimated_monthly_rent": monthly_rent or None,
+        "annual_noi": None,
+        "cap_rate": None,
+        "rent_to_value": None,
+    }
+    if value <= 0 or monthly_rent <= 0:
+        return metrics
+
+    annual_rent = monthly_rent * 12.0
+    noi = max(0.0, annual_rent - compute_annual_expenses(property_data, annual_rent, value))
+    metrics["annual_noi"] = round(noi, 2)
+    metrics["cap_rate"] = round(noi / value * 100.0, 2)
+    metrics["rent_to_value"] = round(monthly_rent / value * 100.0, 3)
+    return metrics
+
+
 def analyze_investment(
     property_data: Dict[str, Any],
     overrides: Optional[Dict[str, Any]] = None,
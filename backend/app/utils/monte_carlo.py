@@ -0,0 +1,192 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, List
+import numpy as np
+from app.utils.investment_metrics import expense_components, estimate_monthly_rent, get_property_value
+
+# Percentiles reported for every simulation
+SIMULATION_PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+
+# Draws are generated in batches of this size to bound peak memory per worker
+SIMULATION_BATCH_SIZE = 50_000
+
+# rent and value are multipliers on the point estimates; vacancy and maintenance are
+# fractions of rent; tax_growth is the fractional change applied to the current tax bill.
+# vacancy/maintenance defaults are built around the configured rates (see default_distributions).
+DEFAULT_DISTRIBUTIONS = {
+    "rent": {"kind": "normal", "mean": 1.0, "sd": 0.10},
+    "value": {"kind": "normal", "mean": 1.0, "sd": 0.08},
+    "tax_growth": {"kind": "normal", "mean": 0.03, "sd": 0.02},
+}
+
+SIMULATION_VARIABLES = ("rent", "vacancy", "maintenance", "tax_growth", "value")
+
+
+def default_distributions(rates: Dict[str, float]) -> Dict[str, Dict[str, Any]]:
+    distributions = {k: dict(v) for k, v in DEFAULT_DISTRIBUTIONS.items()}
+    # Skewed towards bad outcomes: half the expected rate at best, double at worst
+    for name, rate_key in (("vacancy", "vacancy_allowance"), ("maintenance", "maintenance_repairs")):
+        rate = rates[rate_key]
+        distributions[name] = {"kind": "triangular", "low": rate * 0.5, "mode": rate, "high": rate * 2.0}
+    return distributions
+
+
+def simulation_inputs(
+    property_data: Dict[str, Any],
+    overrides: Optional[Dict[str, Any]] = None,
+    monthly_rent_override: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Resolve the point estimates a simulation perturbs.
+
+    Done in the calling process so pool workers only do arithmetic and never touch
+    the DB (the rent/value heuristics read the market stats snapshot).
+    """
+    components = expense_components(property_data, overrides)
+    if monthly_rent_override is not None and monthly_rent_override > 0:
+        monthly_rent = float(monthly_rent_override)
+    else:
+        monthly_rent = estimate_monthly_rent(property_data)
+    return {
+        "value": get_property_value(property_data),
+        "monthly_rent": monthly_rent,
+        **components,
+    }
+
+
+def _draw(rng: np.random.Generator, spec: Dict[str, Any], size: int) -> np.ndarray:
+    kind = spec.get("kind", "normal")
+    if kind == "fixed":
+        return np.full(size, float(spec["mean"]))
+    if kind == "normal":
+        return rng.normal(spec["mean"], spec["sd"], size)
+    if kind == "uniform":
+        return rng.uniform(spec["low"], spec["high"], size)
+    if kind == "triangular":
+        if spec["low"] == spec["high"]:
+            return np.full(size, float(spec["mode"]))
+        return rng.triangular(spec["low"], spec["mode"], spec["high"], size)
+    raise ValueError(f"Unknown distribution kind: {kind}")
+
+
+def run_simulation(
+    inputs: Dict[str, Any],
+    distributions: Optional[Dict[str, Dict[str, Any]]] = None,
+    draws: int = 100_000,
+    seed=None,
+    cap_rate_threshold: float = 8.0,
+) -> Dict[str, Any]:
+    """Simulate the cap rate distribution for one property from its resolved inputs.
+
+    Uses the same expense model as compute_annual_expenses, vectorized per batch.
+    `seed` is anything np.random.default_rng accepts (an int or a SeedSequence).
+    """
+    value_base = float(inputs["value"])
+    rent_base = float(inputs["monthly_rent"])
+    if value_base <= 0:
+        raise ValueError("Unable to determine property value from database records.")
+    if rent_base <= 0:
+        raise ValueError("Missing rent drivers (sqft/bed/bath); cannot estimate income from DB-only data.")
+
+    rates = inputs["rates"]
+    specs = default_distributions(rates)
+    specs.update(distributions or {})
+
+    rng = np.random.default_rng(seed)
+    cap_rates = np.empty(draws, dtype=np.float64)
+    for start in range(0, draws, SIMULATION_BATCH_SIZE):
+        size = min(SIMULATION_BATCH_SIZE, draws - start)
+        value = np.maximum(value_base * _draw(rng, specs["value"], size), 1.0)
+        annual_rent = np.maximum(rent_base * _draw(rng, specs["rent"], size), 0.0) * 12.0
+        vacancy = np.clip(_draw(rng, specs["vacancy"], size), 0.0, 1.0)
+        maintenance = np.clip(_draw(rng, specs["maintenance"], size), 0.0, 1.0)
+        tax_growth = _draw(rng, specs["tax_growth"], size)
+
+        taxes = inputs["taxes_annual"]
+        if taxes is None:
+            taxes = value * rates["property_tax_rate"]
+        rent_rate = rates["property_management"] + maintenance + vacancy + rates["utilities_rate"]
+        expenses = (
+            annual_rent * rent_rate
+            + value * rates["insurance_rate"]
+            + taxes * (1.0 + tax_growth)
+            + inputs["hoa_annual"]
+        )
+        cap_rates[start:start + size] = np.maximum(0.0, annual_rent - expenses) / value * 100.0
+
+    percentiles = np.percentile(cap_rates, SIMULATION_PERCENTILES)
+    return {
+        "draws": draws,
+        "mean_cap_rate_percent": round(float(cap_rates.mean()), 2),
+        "std_cap_rate_percent": round(float(cap_rates.std()), 2),
+        "percentiles": {f"p{p}": round(float(v), 2) for p, v in zip(SIMULATION_PERCENTILES, percentiles)},
+        "cap_rate_threshold": cap_rate_threshold,
+        "probability_meets_threshold": round(float((cap_rates >= cap_rate_threshold).mean()), 4),
+        "base": {
+            "value": round(value_base, 2),
+            "monthly_rent": round(rent_base, 2),
+            "taxes_annual": inputs["taxes_annual"],
+            "hoa_annual": inputs["hoa_annual"],
+        },
+    }
+
+
+def _run_simulation_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return run_simulation(**job)
+    except ValueError as e:
+        return {"error": str(e)}
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def start_simulation_pool(max_workers: int):
+    """Create the process pool shared by every portfolio simulation (no-op if max_workers < 2).
+
+    Called once at app startup. Workers are spawned rather than forked, since the web
+    worker is multithreaded, and concurrent requests queue on the same bounded pool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None and max_workers >= 2:
+            _pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def shutdown_simulation_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_portfolio_simulation(
+    inputs_list: List[Dict[str, Any]],
+    distributions: Optional[Dict[str, Dict[str, Any]]] = None,
+    draws: int = 100_000,
+    seed: Optional[int] = None,
+    cap_rate_threshold: float = 8.0,
+) -> List[Dict[str, Any]]:
+    """Simulate several properties on the shared pool, or inline when none was started.
+
+    Each property gets an independent child stream spawned from `seed`, so results are
+    reproducible regardless of worker count or scheduling. Properties that cannot be
+    simulated come back as {"error": ...} in their slot.
+    """
+    children = np.random.SeedSequence(seed).spawn(len(inputs_list))
+    jobs = [
+        {
+            "inputs": inputs,
+            "distributions": distributions,
+            "draws": draws,
+            "seed": child,
+            "cap_rate_threshold": cap_rate_threshold,
+        }
+        for inputs, child in zip(inputs_list, children)
+    ]
+    pool = _pool
+    if pool is None or len(jobs) <= 1:
+        return [_run_simulation_job(job) for job in jobs]
+    return list(pool.map(_run_simulation_job, jobs))
@@ -1,9 +1,34 @@
+import json
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, Tuple
 from app.services.rentcast_client import RentCastClient
+from app.models.property import extract_latest_tax, extract_annual_hoa
+from app.core.config import settings
+from app.core.resilience import CircuitOpenError
+from app.core.single_flight import SingleFlight
+from .investment_metrics import estimate_monthly_rent, get_property_value
 from .rent_estimation import RentEstimator
 
 
+# Concurrent identical analyses (same property version and parameters) share one
+# RentCast + Gemini round trip, within a worker and across workers
+analysis_flight = SingleFlight(
+    "property_analysis", settings.ANALYSIS_COALESCE_WAIT_SECONDS, settings.ANALYSIS_RESULT_TTL_SECONDS,
+    settings.ANALYSIS_COALESCE_MAX_CONNECTIONS, settings.ANALYSIS_COALESCE_MAX_WAITERS
+)
+
+
+def analysis_flight_key(property_id: int, version, calculation_mode: Optional[str],
+                        custom_expenses: Optional[Dict[str, Any]], cap_rate_threshold: Optional[float]) -> str:
+    """Coalescing key: equal for requests that would produce the same analysis."""
+    params = {
+        "mode": (calculation_mode or "gross").strip().lower(),
+        "expenses": {k: float(v) if isinstance(v, (int, float)) else v for k, v in (custom_expenses or {}).items()},
+        "threshold": float(cap_rate_threshold if cap_rate_threshold is not None else 8.0),
+    }
+    return f"analysis:{property_id}:{version}:{json.dumps(params, sort_keys=True, default=str)}"
+
+
 class PropertyAnalyzer:
     def __init__(self):
         self.rentcast_client = RentCastClient()
@@ -21,7 +46,8 @@ class PropertyAnalyzer:
     def analyze_property(self, property_data: Dict[str, Any],
                          calculation_mode: str = "gross",
                          custom_expenses: Optional[Dict[str, float]] = None,
-                         cap_rate_threshold: float = 8.0) -> Dict[str, Any]:
+                         cap_rate_threshold: float = 8.0,
+                         refreshed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Main orchestration function for property analysis
 
@@ -30,6 +56,8 @@ class PropertyAnalyzer:
             calculation_mode: "gross" or "net" - how to calculate cap rate
             custom_expenses: Optional custom expense percentages
             cap_rate_threshold: Minimum acceptable cap rate (default 8%)
+            refreshed: Stored RentCast estimates (crud.refresh.get_refreshed_estimates);
+                used instead of calling RentCast when present
         """
 
         # Merge custom expenses with defaults
@@ -38,10 +66,10 @@ class PropertyAnalyzer:
             expenses.update(custom_expenses)
 
         # Get rent estimate
-        rent_data = self._get_rent_estimate(property_data)
+        rent_data = self._get_rent_estimate(property_data, refreshed)
 
         # Get property value
-        property_value = self._get_property_value(property_data)
+        property_value = self._get_property_value(property_data, refreshed)
 
         # Calculate cap rates
         cap_rates = self._calculate_cap_rates(
@@ -63,8 +91,18 @@ class PropertyAnalyzer:
 
         return analysis
 
-    def _get_rent_estimate(self, property_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Get rent estimate from RentCast API or internal calculation"""
+    def _get_rent_estimate(self, property_data: Dict[str, Any],
+                           refreshed: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Get rent estimate from the background refresh, RentCast API or internal calculation"""
+        if refreshed and refreshed.get("rent"):
+            return {
+                "source": "rentcast_refresh",
+                "rent": refreshed["rent"],
+                "rent_low": refreshed.get("rent_low") or refreshed["rent"],
+                "rent_high": refreshed.get("rent_high") or refreshed["rent"],
+                "comparables": refreshed.get("comparables", []),
+                "refreshed_at": refreshed.get("refreshed_at")
+            }
         try:
             # Try RentCast API first
             rent_data = self.rentcast_client.get_rent_estimate(property_data)
@@ -76,23 +114,31 @@ class PropertyAnalyzer:
                 "comparables": rent_data.get("comparables", [])
             }
         except Exception as e:
-            print(f"RentCast API failed, using internal estimation: {str(e)}")
-            # Fallback to internal estimation (would need property database query here)
-            # For now, return placeholder - this would be implemented with database access
+            if not isinstance(e, CircuitOpenError):
+                print(f"RentCast API failed, using internal estimation: {str(e)}")
+            # DB-only heuristic (local market stats when available); no range without comparables
+            rent = estimate_monthly_rent(property_data)
             return {
                 "source": "internal_estimate",
-                "rent": 0,
-                "rent_low": 0,
-                "rent_high": 0,
+                "rent": rent,
+                "rent_low": rent,
+                "rent_high": rent,
                 "comparables": [],
                 "error": str(e)
             }
 
-    def _get_property_value(self, property_data: Dict[str, Any]) -> float:
-        """Get property value - use last sale price or API estimate"""
+    def _get_property_value(self, property_data: Dict[str, Any],
+                            refreshed: Optional[Dict[str, Any]] = None) -> float:
+        """Get property value - use a refreshed estimate, last sale price or API estimate"""
         last_sale_price = property_data.get("lastSalePrice")
         last_sale_date = property_data.get("lastSaleDate")
 
+        # A background-refreshed estimate is current unless the property sold after it
+        if refreshed and refreshed.get("value"):
+            sale_date = property_data.get("lastSaleDate") or property_data.get("last_sale_date")
+            if not sale_date or str(sale_date)[:10] <= refreshed["refreshed_at"].date().isoformat():
+                return refreshed["value"]
+
         # Check if last sale price is recent enough (within 10 years)
         if last_sale_price and last_sale_date:
             try:
@@ -107,10 +153,12 @@ class PropertyAnalyzer:
         # Fallback to RentCast value API
         try:
             value_data = self.rentcast_client.get_property_value(property_data)
-            return value_data.get("value", last_sale_price or 0)
+            # RentCast returns the estimate as "price"
+            return value_data.get("price", value_data.get("value", last_sale_price or 0))
         except Exception as e:
             print(f"Could not get updated property value: {str(e)}")
-            return last_sale_price or 0
+            # Last sale price, aged by local appreciation when known
+            return get_property_value(property_data)
 
     def _calculate_cap_rates(self, rent_data: Dict[str, Any], property_value: float,
                              property_data: Dict[str, Any], calculation_mode: str,
@@ -169,10 +217,11 @@ class PropertyAnalyzer:
         property_taxes = self._get_property_taxes(property_data, property_value, expense_rates)
         expenses += property_taxes
 
-        # HOA fees if applicable (annual)
-        hoa_fee = property_data.get("hoa", {}).get("fee", 0)
-        if hoa_fee:
-            expenses += hoa_fee * 12  # Convert monthly to annual
+        # HOA fees if applicable (annual, extracted at ingest)
+        annual_hoa = property_data.get("annual_hoa", property_data.get("annualHoa"))
+        if annual_hoa is None:
+            annual_hoa = extract_annual_hoa(property_data.get("hoa"))
+        expenses += annual_hoa or 0
 
         return expenses
 
@@ -180,14 +229,13 @@ class PropertyAnalyzer:
                             property_value: float, expense_rates: Dict[str, float]) -> float:
         """Get property taxes from data or estimate"""
 
-        # Try to get most recent tax data
-        property_taxes = property_data.get("propertyTaxes", {})
-        if property_taxes:
-            # Get most recent year's taxes
-            recent_year = max(property_taxes.keys(), key=lambda x: int(x))
-            tax_amount = property_taxes[recent_year].get("total", 0)
-            if tax_amount:
-                return tax_amount
+        # Most recent year's taxes, extracted at ingest
+        if "annual_tax" in property_data or "annualTax" in property_data:
+            tax_amount = property_data.get("annual_tax", property_data.get("annualTax"))
+        else:
+            _, tax_amount = extract_latest_tax(property_data.get("property_taxes") or property_data.get("propertyTaxes"))
+        if tax_amount:
+            return tax_amount
 
         # Fallback to percentage estimate
         return property_value * expense_rates.get("property_tax_rate", 0.015)
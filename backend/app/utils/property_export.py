@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Iterable, Iterator, List
+from sqlalchemy import Boolean, Date, Float, Integer, JSON
+
+# Streaming serializers for bulk property export. Each takes an iterable of row
+# chunks (lists of tuples in `columns` order) and yields encoded bytes per chunk,
+# so only one chunk is ever held in memory.
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def iter_ndjson(chunks: Iterable[List[tuple]], columns: List[str]) -> Iterator[bytes]:
+    for chunk in chunks:
+        lines = [json.dumps(dict(zip(columns, row)), default=_json_default) for row in chunk]
+        if lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def iter_csv(chunks: Iterable[List[tuple]], columns: List[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for chunk in chunks:
+        for row in chunk:
+            # Nested JSON columns are written as JSON strings so the CSV stays flat
+            writer.writerow([
+                json.dumps(v, default=_json_default) if isinstance(v, (dict, list)) else v
+                for v in row
+            ])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._parts = []
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._parts.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _arrow_type(pa, sql_type):
+    if isinstance(sql_type, Boolean):
+        return pa.bool_()
+    if isinstance(sql_type, Integer):
+        return pa.int64()
+    if isinstance(sql_type, Float):
+        return pa.float64()
+    if isinstance(sql_type, Date):
+        return pa.date32()
+    # Strings and JSON blobs (serialized) are both written as text
+    return pa.string()
+
+
+def iter_parquet(chunks: Iterable[List[tuple]], columns: List[str], sql_types: List) -> Iterator[bytes]:
+    """Write one Parquet row group per chunk. Requires pyarrow.
+
+    The schema is derived from the SQLAlchemy column types so that chunks with
+    all-null columns still line up with the rest of the file.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, _arrow_type(pa, t)) for name, t in zip(columns, sql_types)])
+    json_cols = {i for i, t in enumerate(sql_types) if isinstance(t, JSON)}
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            data = {}
+            for i, name in enumerate(columns):
+                values = [row[i] for row in chunk]
+                if i in json_cols:
+                    values = [json.dumps(v, default=_json_default) if v is not None else None for v in values]
+                data[name] = values
+            writer.write_table(pa.table(data, schema=schema))
+            out = sink.drain()
+            if out:
+                yield out
+    finally:
+        writer.close()
+    out = sink.drain()
+    if out:
+        yield out
@@ -0,0 +1,67 @@
+import heapq
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+import numpy as np
+from app.utils.investment_metrics import merge_expense_rates
+
+# Columns read by the custom-assumption scan, in row order
+SCREEN_COLUMNS = ("id", "estimated_value", "estimated_monthly_rent", "annual_tax", "annual_hoa")
+
+
+def score_chunk(rows: List[tuple], rates: Dict[str, float]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Recompute NOI/cap rate/rent-to-value for a chunk of SCREEN_COLUMNS rows under `rates`.
+
+    Uses the stored value and rent estimates, so only the expense assumptions change;
+    the expense model is the one in compute_annual_expenses. Rows without a usable
+    value or rent are dropped.
+    """
+    data = np.array(rows, dtype=np.float64)  # NULLs become NaN
+    ids = data[:, 0].astype(np.int64)
+    value, monthly_rent, tax, hoa = data[:, 1], data[:, 2], data[:, 3], np.nan_to_num(data[:, 4])
+    valid = (value > 0) & (monthly_rent > 0)
+    ids, value, monthly_rent, tax, hoa = ids[valid], value[valid], monthly_rent[valid], tax[valid], hoa[valid]
+
+    annual_rent = monthly_rent * 12.0
+    taxes = np.where(np.isnan(tax), value * rates["property_tax_rate"], tax)
+    rent_rate = (
+        rates["property_management"] + rates["maintenance_repairs"]
+        + rates["vacancy_allowance"] + rates["utilities_rate"]
+    )
+    expenses = annual_rent * rent_rate + value * rates["insurance_rate"] + taxes + hoa
+    noi = np.maximum(0.0, annual_rent - expenses)
+
+    return ids, {
+        "estimated_value": value,
+        "estimated_monthly_rent": monthly_rent,
+        "annual_noi": np.round(noi, 2),
+        "cap_rate": np.round(noi / value * 100.0, 2),
+        "rent_to_value": np.round(monthly_rent / value * 100.0, 3),
+    }
+
+
+def top_k_by_scan(
+    chunks: Iterable[List[tuple]],
+    metric: str,
+    k: int,
+    overrides: Optional[Dict[str, Any]] = None,
+) -> List[Tuple[int, Dict[str, float]]]:
+    """Best `k` (id, metrics) by `metric` over streamed chunks, highest first.
+
+    Each chunk is scored in one vectorized pass and pre-trimmed with argpartition, so
+    the bounded heap only ever sees at most k candidates per chunk. Ties go to the
+    higher id, matching the index-backed ordering.
+    """
+    rates = merge_expense_rates(overrides)
+    heap: List[Tuple[float, int, Dict[str, float]]] = []
+    for rows in chunks:
+        if not rows:
+            continue
+        ids, metrics = score_chunk(rows, rates)
+        scores = metrics[metric]
+        candidates = range(len(scores)) if len(scores) <= k else np.argpartition(scores, -k)[-k:]
+        for i in candidates:
+            entry = (float(scores[i]), int(ids[i]))
+            if len(heap) < k:
+                heapq.heappush(heap, (*entry, {name: float(v[i]) for name, v in metrics.items()}))
+            elif entry > heap[0][:2]:
+                heapq.heapreplace(heap, (*entry, {name: float(v[i]) for name, v in metrics.items()}))
+    return [(property_id, values) for _, property_id, values in sorted(heap, key=lambda e: e[:2], reverse=True)]
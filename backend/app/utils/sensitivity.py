@@ -0,0 +1,93 @@
+from typing import Dict, Any, Optional
+import numpy as np
+from app.utils.investment_metrics import expense_components, estimate_monthly_rent, get_property_value
+
+# Grid dimensions in the order they appear in the result matrix
+SENSITIVITY_AXES = ("purchase_price", "monthly_rent", "vacancy_allowance_rate", "property_management_rate")
+
+# Upper bound on evaluated cells; a 4-axis 20x20x20x20 grid is 160k
+MAX_GRID_CELLS = 250_000
+
+
+def expand_range(spec: Dict[str, Any]) -> np.ndarray:
+    """Turn a SensitivityRange dump into the array of points to evaluate."""
+    if spec.get("values"):
+        return np.asarray(spec["values"], dtype=np.float64)
+    return np.linspace(float(spec["start"]), float(spec["stop"]), int(spec["steps"]))
+
+
+def compute_sensitivity_grid(
+    property_data: Dict[str, Any],
+    ranges: Dict[str, Dict[str, Any]],
+    overrides: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Cap rate over the cartesian product of the given input ranges.
+
+    Mirrors analyze_investment/compute_annual_expenses, but evaluates every grid cell
+    in one broadcast NumPy expression instead of one Python call per combination.
+    Raises ValueError for invalid or oversized grids.
+    """
+    components = expense_components(property_data, overrides)
+    rates = components["rates"]
+
+    base = {
+        "purchase_price": get_property_value(property_data),
+        "monthly_rent": estimate_monthly_rent(property_data),
+        "vacancy_allowance_rate": rates["vacancy_allowance"],
+        "property_management_rate": rates["property_management"],
+    }
+
+    axes = [axis for axis in SENSITIVITY_AXES if ranges.get(axis)]
+    if not axes:
+        raise ValueError("Provide a range for at least one input")
+
+    points = {axis: expand_range(ranges[axis]) for axis in axes}
+    cells = int(np.prod([len(v) for v in points.values()]))
+    if cells > MAX_GRID_CELLS:
+        raise ValueError(f"Grid has {cells} cells; the maximum is {MAX_GRID_CELLS}")
+    if "purchase_price" in points and (points["purchase_price"] <= 0).any():
+        raise ValueError("Purchase prices must be positive")
+    for axis in ("vacancy_allowance_rate", "property_management_rate"):
+        if axis in points and ((points[axis] < 0) | (points[axis] > 1)).any():
+            raise ValueError(f"{axis} values must be fractions between 0 and 1")
+
+    # Each varied input becomes an array along its own dimension; fixed inputs stay scalars
+    inputs = {}
+    for axis in SENSITIVITY_AXES:
+        if axis in points:
+            shape = [1] * len(axes)
+            shape[axes.index(axis)] = -1
+            inputs[axis] = points[axis].reshape(shape)
+        else:
+            inputs[axis] = base[axis]
+
+    if "purchase_price" not in points and base["purchase_price"] <= 0:
+        raise ValueError("Unable to determine property value from database records; provide a purchase price range")
+    if "monthly_rent" not in points and base["monthly_rent"] <= 0:
+        raise ValueError("Unable to estimate rent from database records; provide a monthly rent range")
+
+    value = inputs["purchase_price"]
+    annual_rent = inputs["monthly_rent"] * 12.0
+
+    rent_rate = (
+        inputs["property_management_rate"]
+        + rates["maintenance_repairs"]
+        + inputs["vacancy_allowance_rate"]
+        + rates["utilities_rate"]
+    )
+    taxes_annual = components["taxes_annual"]
+    if taxes_annual is None:
+        taxes_annual = value * rates["property_tax_rate"]
+    expenses = annual_rent * rent_rate + value * rates["insurance_rate"] + taxes_annual + components["hoa_annual"]
+
+    noi = np.maximum(0.0, annual_rent - expenses)
+    cap_rate = np.round(np.broadcast_to(noi / value * 100.0, [len(points[a]) for a in axes]), 2)
+
+    return {
+        "axes": axes,
+        "values": {axis: np.round(points[axis], 6).tolist() for axis in axes},
+        "base": {axis: round(float(base[axis]), 6) for axis in SENSITIVITY_AXES if axis not in points},
+        "cap_rate_percent": cap_rate.tolist(),
+        "min_cap_rate_percent": float(cap_rate.min()),
+        "max_cap_rate_percent": float(cap_rate.max()),
+    }
@@ -0,0 +1,59 @@
+"""Added normalized filter keys and composite browse indexes
+
+Revision ID: a3f1c9d2b7e4
+Revises: c5dfddcc01e5
+Create Date: 2026-10-18 10:12:04.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9d2b7e4'
+down_revision: Union[str, None] = 'c5dfddcc01e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('properties', sa.Column('city_key', sa.String(), nullable=True))
+    op.add_column('properties', sa.Column('state_key', sa.String(), nullable=True))
+    op.add_column('properties', sa.Column('property_type_key', sa.String(), nullable=True))
+
+    # Backfill with the same normalization as app.models.property.normalize_filter_value
+    op.execute("""
+        UPDATE properties SET
+            city_key = NULLIF(lower(regexp_replace(btrim(city), '\\s+', ' ', 'g')), ''),
+            state_key = NULLIF(lower(regexp_replace(btrim(state), '\\s+', ' ', 'g')), ''),
+            property_type_key = NULLIF(lower(regexp_replace(btrim(property_type), '\\s+', ' ', 'g')), '')
+    """)
+
+    op.create_index('ix_properties_state_city_price', 'properties', ['state_key', 'city_key', 'last_sale_price'], unique=False)
+    op.create_index('ix_properties_city_price', 'properties', ['city_key', 'last_sale_price'], unique=False)
+    op.create_index('ix_properties_state_type_price', 'properties', ['state_key', 'property_type_key', 'last_sale_price'], unique=False)
+    op.create_index('ix_properties_type_bedrooms_price', 'properties', ['property_type_key', 'bedrooms', 'last_sale_price'], unique=False)
+    op.create_index('ix_properties_last_sale_price', 'properties', ['last_sale_price'], unique=False)
+
+    # Superseded by the composite indexes on the normalized keys
+    op.drop_index('ix_properties_city', table_name='properties')
+    op.drop_index('ix_properties_state', table_name='properties')
+    op.drop_index('ix_properties_property_type', table_name='properties')
+
+
+def downgrade() -> None:
+    op.create_index('ix_properties_property_type', 'properties', ['property_type'], unique=False)
+    op.create_index('ix_properties_state', 'properties', ['state'], unique=False)
+    op.create_index('ix_properties_city', 'properties', ['city'], unique=False)
+
+    op.drop_index('ix_properties_last_sale_price', table_name='properties')
+    op.drop_index('ix_properties_type_bedrooms_price', table_name='properties')
+    op.drop_index('ix_properties_state_type_price', table_name='properties')
+    op.drop_index('ix_properties_city_price', table_name='properties')
+    op.drop_index('ix_properties_state_city_price', table_name='properties')
+
+    op.drop_column('properties', 'property_type_key')
+    op.drop_column('properties', 'state_key')
+    op.drop_column('properties', 'city_key')
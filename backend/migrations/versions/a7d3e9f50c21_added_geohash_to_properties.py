@@ -0,0 +1,87 @@
+"""Added geohash to properties for radius and bounding-box queries
+
+Revision ID: a7d3e9f50c21
+Revises: f2b6c8d41a95
+Create Date: 2026-10-19 16:48:05.220917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e9f50c21'
+down_revision: Union[str, None] = 'f2b6c8d41a95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 5000
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+
+
+# Frozen copy of app.utils.geo.geohash_encode as of this revision, so the backfill does
+# not change when the app code does
+def _geohash(lat, lon, precision=GEOHASH_PRECISION):
+    if lat is None or lon is None or not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
+        return None
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, ch, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            ch = (ch << 1) | (lon >= mid)
+            lon_lo, lon_hi = (mid, lon_hi) if lon >= mid else (lon_lo, mid)
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            ch = (ch << 1) | (lat >= mid)
+            lat_lo, lat_hi = (mid, lat_hi) if lat >= mid else (lat_lo, mid)
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[ch])
+            bits, ch = 0, 0
+    return "".join(chars)
+
+
+def upgrade() -> None:
+    op.add_column('properties', sa.Column('geohash', sa.String(length=12), nullable=True))
+
+    # Backfill with the same encoding the model applies on write, in id-ordered pages
+    conn = op.get_bind()
+    properties = sa.table(
+        'properties',
+        sa.column('id', sa.Integer), sa.column('latitude', sa.Float), sa.column('longitude', sa.Float),
+        sa.column('geohash', sa.String),
+    )
+    update = properties.update().where(properties.c.id == sa.bindparam('row_id')).values(
+        geohash=sa.bindparam('geohash')
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(properties.c.id, properties.c.latitude, properties.c.longitude)
+            .where(properties.c.id > last_id,
+                   properties.c.latitude.isnot(None), properties.c.longitude.isnot(None))
+            .order_by(properties.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for row in rows:
+            geohash = _geohash(row.latitude, row.longitude)
+            if geohash is not None:
+                params.append({'row_id': row.id, 'geohash': geohash})
+        if params:
+            conn.execute(update, params)
+        last_id = rows[-1].id
+
+    op.create_index('ix_properties_geohash', 'properties', ['geohash'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_properties_geohash', table_name='properties')
+    op.drop_column('properties', 'geohash')
@@ -0,0 +1,93 @@
+"""Added geo_clusters table for precomputed map clusters
+
+Revision ID: b3c8f1d27e64
+Revises: a7d3e9f50c21
+Create Date: 2026-10-19 17:35:52.610384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import math
+from collections import defaultdict
+
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c8f1d27e64'
+down_revision: Union[str, None] = 'a7d3e9f50c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+# Frozen copies of app.models.geo_cluster's STORED_CLUSTER_PRECISIONS and price_bucket()
+# as of this revision, so the backfill does not change when the app code does
+STORED_PRECISIONS = range(3, 8)
+PRICE_BUCKET_RATIO = 1.1
+UNPRICED_BUCKET = -1
+
+UPSERT = sa.text(
+    "INSERT INTO geo_clusters (geohash_precision, cell, price_bucket, property_count, latitude_sum, longitude_sum) "
+    "VALUES (:precision, :cell, :price_bucket, :count, :lat, :lon) "
+    "ON CONFLICT (geohash_precision, cell, price_bucket) DO UPDATE SET "
+    "property_count = geo_clusters.property_count + EXCLUDED.property_count, "
+    "latitude_sum = geo_clusters.latitude_sum + EXCLUDED.latitude_sum, "
+    "longitude_sum = geo_clusters.longitude_sum + EXCLUDED.longitude_sum"
+)
+
+
+def _price_bucket(price):
+    if not isinstance(price, (int, float)) or price <= 0:
+        return UNPRICED_BUCKET
+    return int(math.floor(math.log(price) / math.log(PRICE_BUCKET_RATIO)))
+
+
+def upgrade() -> None:
+    op.create_table('geo_clusters',
+    sa.Column('geohash_precision', sa.Integer(), nullable=False),
+    sa.Column('cell', sa.String(length=12), nullable=False),
+    sa.Column('price_bucket', sa.Integer(), nullable=False),
+    sa.Column('property_count', sa.Integer(), nullable=False),
+    sa.Column('latitude_sum', sa.Float(), nullable=False),
+    sa.Column('longitude_sum', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('geohash_precision', 'cell', 'price_bucket')
+    )
+
+    # Backfill from existing properties (geohash was filled by a7d3e9f50c21) in id-ordered
+    # pages, adding each page's totals onto the table; the model's write listeners keep it
+    # current from here
+    conn = op.get_bind()
+    properties = sa.table(
+        'properties',
+        sa.column('id', sa.Integer), sa.column('geohash', sa.String), sa.column('latitude', sa.Float),
+        sa.column('longitude', sa.Float), sa.column('last_sale_price', sa.Float),
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(properties.c.id, properties.c.geohash, properties.c.latitude,
+                      properties.c.longitude, properties.c.last_sale_price)
+            .where(properties.c.id > last_id, properties.c.geohash.isnot(None))
+            .order_by(properties.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        totals = defaultdict(lambda: [0, 0.0, 0.0])
+        for row in rows:
+            bucket = _price_bucket(row.last_sale_price)
+            for precision in STORED_PRECISIONS:
+                entry = totals[(precision, row.geohash[:precision], bucket)]
+                entry[0] += 1
+                entry[1] += row.latitude
+                entry[2] += row.longitude
+        conn.execute(UPSERT, [
+            {'precision': precision, 'cell': cell, 'price_bucket': bucket,
+             'count': count, 'lat': lat_sum, 'lon': lon_sum}
+            for (precision, cell, bucket), (count, lat_sum, lon_sum) in sorted(totals.items())
+        ])
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_table('geo_clusters')
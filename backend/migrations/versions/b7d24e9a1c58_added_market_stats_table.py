@@ -0,0 +1,47 @@
+"""Added market_stats table
+
+Revision ID: b7d24e9a1c58
+Revises: a3f1c9d2b7e4
+Create Date: 2026-10-18 11:40:52.306117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d24e9a1c58'
+down_revision: Union[str, None] = 'a3f1c9d2b7e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('market_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('region_type', sa.String(), nullable=False),
+    sa.Column('region_key', sa.String(), nullable=False),
+    sa.Column('state', sa.String(), nullable=True),
+    sa.Column('property_count', sa.Integer(), nullable=True),
+    sa.Column('median_price_per_sqft', sa.Float(), nullable=True),
+    sa.Column('median_rent_per_sqft', sa.Float(), nullable=True),
+    sa.Column('sales_last_12_months', sa.Integer(), nullable=True),
+    sa.Column('sales_per_month', sa.Float(), nullable=True),
+    sa.Column('price_trend_pct', sa.Float(), nullable=True),
+    sa.Column('neighborhood_trend', sa.String(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('region_type', 'region_key', name='unique_market_region')
+    )
+    op.create_index(op.f('ix_market_stats_id'), 'market_stats', ['id'], unique=False)
+    op.create_index(op.f('ix_properties_zip_code'), 'properties', ['zip_code'], unique=False)
+    op.create_index('ix_properties_county_fips', 'properties', ['state_fips', 'county_fips'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_properties_county_fips', table_name='properties')
+    op.drop_index(op.f('ix_properties_zip_code'), table_name='properties')
+    op.drop_index(op.f('ix_market_stats_id'), table_name='market_stats')
+    op.drop_table('market_stats')
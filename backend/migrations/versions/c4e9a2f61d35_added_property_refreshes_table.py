@@ -0,0 +1,44 @@
+"""Added property_refreshes table for background RentCast refreshes
+
+Revision ID: c4e9a2f61d35
+Revises: b3c8f1d27e64
+Create Date: 2026-10-19 19:04:18.226317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e9a2f61d35'
+down_revision: Union[str, None] = 'b3c8f1d27e64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('property_refreshes',
+    sa.Column('property_id', sa.Integer(), nullable=False),
+    sa.Column('value', sa.Float(), nullable=True),
+    sa.Column('value_low', sa.Float(), nullable=True),
+    sa.Column('value_high', sa.Float(), nullable=True),
+    sa.Column('rent', sa.Float(), nullable=True),
+    sa.Column('rent_low', sa.Float(), nullable=True),
+    sa.Column('rent_high', sa.Float(), nullable=True),
+    sa.Column('rent_comparables', sa.JSON(), nullable=True),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+    sa.Column('attempted_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('recent_views', sa.Float(), nullable=False),
+    sa.Column('views_updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['property_id'], ['properties.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('property_id')
+    )
+    op.create_index(op.f('ix_property_refreshes_refreshed_at'), 'property_refreshes', ['refreshed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_property_refreshes_refreshed_at'), table_name='property_refreshes')
+    op.drop_table('property_refreshes')
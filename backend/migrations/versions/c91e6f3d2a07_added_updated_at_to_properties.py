@@ -0,0 +1,27 @@
+"""Added updated_at to properties
+
+Revision ID: c91e6f3d2a07
+Revises: b7d24e9a1c58
+Create Date: 2026-10-18 13:05:19.442861
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c91e6f3d2a07'
+down_revision: Union[str, None] = 'b7d24e9a1c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # server_default backfills existing rows; the ORM maintains the value from here on
+    op.add_column('properties', sa.Column('updated_at', sa.DateTime(), server_default=sa.text("(now() at time zone 'utc')"), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('properties', 'updated_at')
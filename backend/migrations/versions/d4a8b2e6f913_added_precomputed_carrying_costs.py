@@ -0,0 +1,98 @@
+"""Added precomputed tax/HOA carrying costs to properties
+
+Revision ID: d4a8b2e6f913
+Revises: c91e6f3d2a07
+Create Date: 2026-10-19 09:21:47.530218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8b2e6f913'
+down_revision: Union[str, None] = 'c91e6f3d2a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+# Frozen copies of app.models.property.extract_latest_tax/extract_annual_hoa as of this
+# revision, so the backfill does not change when the app code does
+def _latest_tax(property_taxes):
+    if not isinstance(property_taxes, dict) or not property_taxes:
+        return None, None
+    try:
+        year = max(property_taxes.keys(), key=lambda x: int(x))
+    except Exception:
+        return None, None
+    entry = property_taxes.get(year)
+    total = entry.get("total") if isinstance(entry, dict) else None
+    if isinstance(total, (int, float)) and total > 0:
+        return int(year), float(total)
+    return int(year), None
+
+
+def _annual_hoa(hoa):
+    monthly = 0
+    if isinstance(hoa, dict):
+        monthly = hoa.get("fee") or hoa.get("monthlyFee") or 0
+    if isinstance(monthly, (int, float)) and monthly > 0:
+        return float(monthly) * 12.0
+    return 0.0
+
+
+def upgrade() -> None:
+    op.add_column('properties', sa.Column('latest_tax_year', sa.Integer(), nullable=True))
+    op.add_column('properties', sa.Column('annual_tax', sa.Float(), nullable=True))
+    op.add_column('properties', sa.Column('annual_hoa', sa.Float(), nullable=True))
+    op.add_column('properties', sa.Column('monthly_carrying_cost', sa.Float(), nullable=True))
+
+    # Backfill with the extraction the ORM runs on insert/update, in id-ordered pages
+    conn = op.get_bind()
+    properties = sa.table(
+        'properties',
+        sa.column('id', sa.Integer), sa.column('property_taxes', sa.JSON), sa.column('hoa', sa.JSON),
+        sa.column('latest_tax_year', sa.Integer), sa.column('annual_tax', sa.Float),
+        sa.column('annual_hoa', sa.Float), sa.column('monthly_carrying_cost', sa.Float),
+    )
+    update = properties.update().where(properties.c.id == sa.bindparam('row_id')).values(
+        latest_tax_year=sa.bindparam('latest_tax_year'),
+        annual_tax=sa.bindparam('annual_tax'),
+        annual_hoa=sa.bindparam('annual_hoa'),
+        monthly_carrying_cost=sa.bindparam('monthly_carrying_cost'),
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(properties.c.id, properties.c.property_taxes, properties.c.hoa)
+            .where(properties.c.id > last_id).order_by(properties.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for row in rows:
+            year, tax = _latest_tax(row.property_taxes)
+            hoa = _annual_hoa(row.hoa)
+            params.append({
+                'row_id': row.id,
+                'latest_tax_year': year,
+                'annual_tax': tax,
+                'annual_hoa': hoa,
+                'monthly_carrying_cost': round((tax + hoa) / 12.0, 2) if tax is not None else None,
+            })
+        conn.execute(update, params)
+        last_id = rows[-1].id
+
+    op.create_index('ix_properties_monthly_carrying_cost', 'properties', ['monthly_carrying_cost'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_properties_monthly_carrying_cost', table_name='properties')
+    op.drop_column('properties', 'monthly_carrying_cost')
+    op.drop_column('properties', 'annual_hoa')
+    op.drop_column('properties', 'annual_tax')
+    op.drop_column('properties', 'latest_tax_year')
@@ -0,0 +1,150 @@
+"""Added property_sales table and regional appreciation to market_stats
+
+Revision ID: d8f2b5c03a19
+Revises: c4e9a2f61d35
+Create Date: 2026-10-19 20:11:43.517209
+
+"""
+from datetime import date, datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f2b5c03a19'
+down_revision: Union[str, None] = 'c4e9a2f61d35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 5000
+# Frozen copies of app.crud.sales.MIN_HOLD_DAYS and app.crud.market's MIN_SAMPLE_SIZE and
+# APPRECIATION_WINDOW_YEARS as of this revision
+MIN_HOLD_DAYS = 365
+MIN_SAMPLE_SIZE = 5
+APPRECIATION_WINDOW_YEARS = 10
+
+
+# Frozen copy of app.models.sale.extract_sales as of this revision, so the backfill does
+# not change when the app code does
+def _sale_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+def _sales(sale_history, last_sale_date, last_sale_price):
+    by_date = {}
+
+    def add(day, price):
+        day = _sale_date(day)
+        if day is None:
+            return
+        price = float(price) if isinstance(price, (int, float)) and price > 0 else None
+        if by_date.get(day) is None:
+            by_date[day] = price
+
+    if isinstance(sale_history, dict):
+        for key, entry in sale_history.items():
+            if not isinstance(entry, dict) or entry.get("event", "Sale") != "Sale":
+                continue
+            add(entry.get("date") or key, entry.get("price"))
+    if last_sale_date:
+        add(last_sale_date, last_sale_price)
+    return [{"sale_date": day, "price": by_date[day]} for day in sorted(by_date)]
+
+
+# Median annualized appreciation across each region's repeat sales (the same pairing and
+# thresholds as app.crud.market._region_appreciation), written onto the existing rows
+APPRECIATION_UPDATE = """
+WITH pairs AS (
+    SELECT s.zip_code, p.state_fips || p.county_fips AS county_key, s.sale_date, s.price,
+           lag(s.sale_date) OVER w AS prev_date, lag(s.price) OVER w AS prev_price
+    FROM property_sales s JOIN properties p ON p.id = s.property_id
+    WHERE s.price > 0
+    WINDOW w AS (PARTITION BY s.property_id ORDER BY s.sale_date)
+), rates AS (
+    SELECT zip_code, county_key,
+           power(price / prev_price, 365.25 / CAST(sale_date - prev_date AS FLOAT)) - 1.0 AS rate
+    FROM pairs
+    WHERE prev_price > 0 AND sale_date - prev_date >= :min_hold_days AND sale_date >= :since
+), regions AS (
+    SELECT 'zip' AS region_type, zip_code AS region_key, count(*) AS n,
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY rate) AS median
+    FROM rates WHERE zip_code IS NOT NULL GROUP BY zip_code
+    UNION ALL
+    SELECT 'county', county_key, count(*), percentile_cont(0.5) WITHIN GROUP (ORDER BY rate)
+    FROM rates WHERE county_key IS NOT NULL GROUP BY county_key
+)
+UPDATE market_stats m
+SET annual_appreciation_pct = round(CAST(r.median * 100.0 AS NUMERIC), 2)
+FROM regions r
+WHERE m.region_type = r.region_type AND m.region_key = r.region_key
+  AND r.n >= :min_sample_size AND r.median <> 0
+"""
+
+
+def upgrade() -> None:
+    op.create_table('property_sales',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('property_id', sa.Integer(), nullable=False),
+    sa.Column('zip_code', sa.String(), nullable=True),
+    sa.Column('sale_date', sa.Date(), nullable=False),
+    sa.Column('price', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['property_id'], ['properties.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('property_id', 'sale_date', name='unique_property_sale')
+    )
+    op.create_index('ix_property_sales_zip_date', 'property_sales', ['zip_code', 'sale_date'], unique=False)
+    op.add_column('market_stats', sa.Column('annual_appreciation_pct', sa.Float(), nullable=True))
+
+    # Backfill from existing sale_history in id-ordered pages; the model's write listeners
+    # keep it current from here
+    conn = op.get_bind()
+    properties = sa.table(
+        'properties',
+        sa.column('id', sa.Integer), sa.column('zip_code', sa.String), sa.column('sale_history', sa.JSON),
+        sa.column('last_sale_date', sa.Date), sa.column('last_sale_price', sa.Float),
+    )
+    property_sales = sa.table(
+        'property_sales',
+        sa.column('property_id', sa.Integer), sa.column('zip_code', sa.String),
+        sa.column('sale_date', sa.Date), sa.column('price', sa.Float),
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(properties.c.id, properties.c.zip_code, properties.c.sale_history,
+                      properties.c.last_sale_date, properties.c.last_sale_price)
+            .where(properties.c.id > last_id).order_by(properties.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        sales = [
+            {'property_id': row.id, 'zip_code': row.zip_code, **sale}
+            for row in rows for sale in _sales(row.sale_history, row.last_sale_date, row.last_sale_price)
+        ]
+        if sales:
+            conn.execute(property_sales.insert(), sales)
+        last_id = rows[-1].id
+
+    # One pass over the new table for every existing region, instead of waiting for each
+    # region's next write. Stored metrics that age old sales by this rate are re-scored by
+    # scripts/refresh_market_stats.py.
+    since = date.today() - timedelta(days=round(365.25 * APPRECIATION_WINDOW_YEARS))
+    conn.execute(sa.text(APPRECIATION_UPDATE), {
+        'min_hold_days': MIN_HOLD_DAYS, 'since': since, 'min_sample_size': MIN_SAMPLE_SIZE,
+    })
+
+
+def downgrade() -> None:
+    op.drop_column('market_stats', 'annual_appreciation_pct')
+    op.drop_index('ix_property_sales_zip_date', table_name='property_sales')
+    op.drop_table('property_sales')
@@ -0,0 +1,44 @@
+"""Added precomputed investment metrics to properties
+
+The columns start out NULL. Fill them after upgrading with
+    python scripts/batch_analyze_properties.py --write-db
+which scores with the current market stats and app code; after that, property
+writes and market stats refreshes keep them current.
+
+Revision ID: e5f0a7c3b182
+Revises: d4a8b2e6f913
+Create Date: 2026-10-19 11:04:12.318840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f0a7c3b182'
+down_revision: Union[str, None] = 'd4a8b2e6f913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+METRIC_COLUMNS = ('estimated_value', 'estimated_monthly_rent', 'annual_noi', 'cap_rate', 'rent_to_value')
+
+
+def upgrade() -> None:
+    for name in METRIC_COLUMNS:
+        op.add_column('properties', sa.Column(name, sa.Float(), nullable=True))
+
+    op.create_index('ix_properties_cap_rate', 'properties', ['cap_rate', 'id'], unique=False)
+    op.create_index('ix_properties_state_cap_rate', 'properties', ['state_key', 'cap_rate', 'id'], unique=False)
+    op.create_index('ix_properties_state_annual_noi', 'properties', ['state_key', 'annual_noi', 'id'], unique=False)
+    op.create_index('ix_properties_state_rent_to_value', 'properties', ['state_key', 'rent_to_value', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_properties_state_rent_to_value', table_name='properties')
+    op.drop_index('ix_properties_state_annual_noi', table_name='properties')
+    op.drop_index('ix_properties_state_cap_rate', table_name='properties')
+    op.drop_index('ix_properties_cap_rate', table_name='properties')
+    for name in reversed(METRIC_COLUMNS):
+        op.drop_column('properties', name)
@@ -0,0 +1,35 @@
+"""Added analysis_results table for cross-worker analysis coalescing
+
+Revision ID: f2b6c8d41a95
+Revises: e5f0a7c3b182
+Create Date: 2026-10-19 15:22:37.904125
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b6c8d41a95'
+down_revision: Union[str, None] = 'e5f0a7c3b182'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # UNLOGGED: rows live for seconds and are safe to lose on a crash, so skip the WAL
+    op.create_table('analysis_results',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key'),
+    prefixes=['UNLOGGED']
+    )
+    op.create_index(op.f('ix_analysis_results_created_at'), 'analysis_results', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_analysis_results_created_at'), table_name='analysis_results')
+    op.drop_table('analysis_results')
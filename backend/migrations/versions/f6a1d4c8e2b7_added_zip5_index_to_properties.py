@@ -0,0 +1,26 @@
+"""Added a 5-digit ZIP expression index to properties for duplicate detection
+
+Revision ID: f6a1d4c8e2b7
+Revises: d8f2b5c03a19
+Create Date: 2026-10-19 21:14:36.802511
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a1d4c8e2b7'
+down_revision: Union[str, None] = 'd8f2b5c03a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_properties_zip5', 'properties', [sa.text('left(zip_code, 5)')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_properties_zip5', table_name='properties')
@@ -0,0 +1,115 @@
+import sys
+import os
+import json
+import time
+import argparse
+from typing import Any, Dict, List
+
+# Add the backend directory to sys.path so we can import from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine, SessionLocal
+from app.core.config import settings
+from app.core.cache import invalidation_bus
+from app.crud.duplicates import iter_duplicate_blocks, merge_duplicate_group
+from app.crud.market import regions_for
+from app.crud.property import PROPERTY_FIELDS, get_properties_by_ids, refresh_regions
+from app.utils.dedup import blocking_key, duplicate_groups
+
+# One-off audit for near-duplicate properties ("123 Main St" vs "123 Main Street, Unit 1")
+# that unique_full_address lets through. Properties are blocked by ZIP code and street
+# number in one ordered pass over the table and only compared within their block, so the
+# audit scales with the number of rows. Each duplicate group is written to a JSON-lines
+# report; with --merge the most complete row of each group is kept, its empty fields are
+# filled from the others, favorites are re-pointed and the others are deleted.
+#
+# Examples:
+#   python scripts/audit_duplicate_properties.py --report duplicates.jsonl
+#   python scripts/audit_duplicate_properties.py --report duplicates.jsonl --merge
+
+
+def find_groups(db) -> tuple:
+    """(duplicate groups as report dicts, number of blocks compared)."""
+    groups, blocks = [], 0
+    for block in iter_duplicate_blocks(db):
+        blocks += 1
+        for group in duplicate_groups(block):
+            zip_code, number = blocking_key(group[0][0])
+            groups.append({
+                "zip_code": zip_code,
+                "street_number": number,
+                "properties": [
+                    {"id": record["id"], "address": record["formatted_address"] or record["address_line1"],
+                     "assessor_id": record["assessor_id"], "matched_by": reason}
+                    for record, reason in group
+                ],
+                "action": "flagged",
+            })
+    return groups, blocks
+
+
+def merge_groups(db, groups: List[Dict[str, Any]]) -> int:
+    """Merge every group (one commit each), then refresh the derived data they touched."""
+    merged = 0
+    zip_codes, county_keys, survivors = set(), set(), []
+    for group in groups:
+        ids = [p["id"] for p in group["properties"]]
+        touched_zips, touched_counties = regions_for(get_properties_by_ids(db, ids, list(PROPERTY_FIELDS)))
+        try:
+            result = merge_duplicate_group(db, ids)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            group["action"] = "merge_failed"
+            group["error"] = str(e)
+            print(f"❌ Could not merge properties {ids}: {str(e)}")
+            continue
+        if result is None:
+            continue
+        group.update(action="merged", **result)
+        zip_codes |= touched_zips
+        county_keys |= touched_counties
+        survivors.append(result["survivor"])
+        merged += len(result["removed"])
+
+    if survivors:
+        invalidation_bus.start(engine, settings.CACHE_INVALIDATION_CHANNEL, listen=False)
+        # Re-scores the survivors along with the rest of their regions
+        refreshed, _ = refresh_regions(db, zip_codes, county_keys)
+        print(f"📈 Refreshed market stats for {refreshed} ZIP/county regions")
+        invalidation_bus.publish("property_bulk_write", {"count": merged})
+    return merged
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Find (and optionally merge) near-duplicate properties")
+    parser.add_argument("--report", default="duplicate_properties.jsonl", help="JSON-lines report, one group per line")
+    parser.add_argument("--merge", action="store_true", help="Keep the most complete row per group and delete the rest")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    engine.echo = False
+    started = time.monotonic()
+
+    db = SessionLocal()
+    try:
+        groups, blocks = find_groups(db)
+        duplicates = sum(len(g["properties"]) - 1 for g in groups)
+        print(f"🔍 Compared {blocks:,} ZIP/street-number blocks: {len(groups):,} duplicate groups, "
+              f"{duplicates:,} duplicate rows")
+        merged = merge_groups(db, groups) if args.merge and groups else 0
+    finally:
+        db.close()
+
+    with open(args.report, "w") as f:
+        for group in groups:
+            f.write(json.dumps(group, default=str) + "\n")
+
+    print(f"🎉 Audit finished in {time.monotonic() - started:,.1f}s → {args.report}"
+          f"{f' ({merged:,} rows merged away)' if args.merge else ''}")
+
+
+if __name__ == "__main__":
+    main()
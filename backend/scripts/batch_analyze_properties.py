@@ -0,0 +1,335 @@
+import sys
+import os
+import csv
+import json
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Dict, Any, Iterator
+
+# Add the backend directory to sys.path so we can import from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, func, update
+from sqlalchemy import Integer, String, Float
+from app.core.database import engine, SessionLocal
+from app.core.config import settings
+from app.core.cache import invalidation_bus
+from app.crud.property import SCALAR_FIELDS, apply_property_filters, iter_property_chunks, \
+    find_property_by_components
+from app.crud.refresh import get_refreshed_estimates_for
+from app.models.property import Property
+from app.core.prompts import build_batch_block
+from app.utils.investment_metrics import analyze_investment, generate_investment_report, investment_metrics_for
+from app.utils.ai_investment_analysis import StubModels, analyze_prompt_blocks, BATCH_SIZE, BATCH_CONCURRENCY
+from app.utils.property_export import iter_csv, iter_parquet
+
+# Offline analysis of many properties at once: runs analyze_investment (and optionally
+# generate_investment_report) over every property matching the browse filters, or over
+# a CSV of addresses (street,city,state,zip), across a process pool. With --ai, Gemini
+# analyses are added in batched structured-output requests (several properties each).
+# --write-db stores the screener metrics the way the API re-scores them, preferring the
+# background-refreshed RentCast estimates over the DB heuristics.
+#
+# Examples:
+#   python scripts/batch_analyze_properties.py --state TX --output tx.parquet
+#   python scripts/batch_analyze_properties.py --addresses input.csv --output results.csv
+#   python scripts/batch_analyze_properties.py --write-db           # nightly re-scoring
+#   python scripts/batch_analyze_properties.py --city Austin --ai --output austin.csv
+#   python scripts/batch_analyze_properties.py --ai --ai-stub --ai-batch-size 1 --output /tmp/x.csv  # offline
+
+RESULT_COLUMNS = [
+    "id", "formatted_address", "cap_rate_percent", "recommendation", "value", "monthly_rent",
+    "annual_rent", "annual_expenses", "noi", "explanation", "report",
+]
+RESULT_TYPES = [
+    Integer(), String(), Float(), String(), Float(), Float(),
+    Float(), Float(), Float(), String(), String(),
+]
+AI_COLUMNS = ["ai_decision", "ai_analysis"]
+AI_TYPES = [String(), String()]
+
+
+def _init_worker():
+    # Forked workers must not reuse the parent's pooled connections; each opens its own
+    # when the market stats snapshot loads.
+    engine.dispose(close=False)
+    engine.echo = False
+
+
+def analyze_chunk(rows: List[Dict[str, Any]], overrides: Optional[Dict[str, Any]], with_report: bool,
+                  with_ai: bool = False) -> List[tuple]:
+    """Worker entry point: analyze one chunk of property dicts into RESULT_COLUMNS tuples.
+
+    With with_ai, each tuple also carries the property's compact prompt block, which
+    add_ai_analysis replaces with the AI_COLUMNS.
+    """
+    results = []
+    for data in rows:
+        analysis = analyze_investment(data, overrides=overrides)
+        details = analysis.get("details", {})
+        report = generate_investment_report(data, analysis) if with_report else None
+        row = (
+            data["id"],
+            data.get("formatted_address"),
+            analysis["cap_rate_percent"],
+            analysis["recommendation"],
+            details.get("value"),
+            details.get("monthly_rent"),
+            details.get("annual_rent"),
+            details.get("annual_expenses"),
+            details.get("noi"),
+            analysis["explanation"],
+            report,
+        )
+        if with_ai:
+            row += (build_batch_block(data["id"], data, analysis["cap_rate_percent"]),)
+        results.append(row)
+    return results
+
+
+def count_matching(filters: Dict[str, Any]) -> int:
+    db = SessionLocal()
+    try:
+        return db.execute(apply_property_filters(select(func.count(Property.id)), **filters)).scalar()
+    finally:
+        db.close()
+
+
+def iter_filtered_chunks(filters: Dict[str, Any], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    db = SessionLocal()
+    try:
+        for chunk in iter_property_chunks(db, list(SCALAR_FIELDS), chunk_size=chunk_size, **filters):
+            yield [dict(zip(SCALAR_FIELDS, row)) for row in chunk]
+    finally:
+        db.close()
+
+
+def read_addresses(path: str) -> List[Dict[str, str]]:
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        missing = {"street", "city", "state", "zip"} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"Address file is missing column(s): {', '.join(sorted(missing))}")
+        return list(reader)
+
+
+def iter_address_chunks(addresses: List[Dict[str, str]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    db = SessionLocal()
+    try:
+        for start in range(0, len(addresses), chunk_size):
+            chunk = []
+            for row in addresses[start:start + chunk_size]:
+                prop = find_property_by_components(db, row["street"], row["city"], row["state"], row["zip"])
+                if prop is None:
+                    print(f"⚠️ No property found for {row['street']}, {row['city']}, {row['state']} {row['zip']}")
+                    continue
+                chunk.append({name: getattr(prop, name) for name in SCALAR_FIELDS})
+            db.expunge_all()
+            yield chunk
+    finally:
+        db.close()
+
+
+class Progress:
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.started = time.monotonic()
+
+    def update(self, count: int):
+        self.done += count
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        rate = self.done / elapsed
+        remaining = (self.total - self.done) / rate if rate and self.total else 0
+        percent = self.done / self.total * 100 if self.total else 100.0
+        print(f"⏱️ {self.done:,}/{self.total:,} ({percent:.1f}%) | {rate:,.0f} properties/s | ETA {remaining:,.0f}s",
+              flush=True)
+
+
+def run_pool(chunks: Iterator[List[Dict[str, Any]]], workers: int, overrides, with_report: bool,
+             with_ai: bool, progress: Progress) -> Iterator[List[tuple]]:
+    """Yield analyzed chunks in input order while keeping at most 2 chunks per worker in flight."""
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = deque()
+        for chunk in chunks:
+            if chunk:
+                pending.append(pool.submit(analyze_chunk, chunk, overrides, with_report, with_ai))
+            while len(pending) >= workers * 2:
+                results = pending.popleft().result()
+                progress.update(len(results))
+                yield results
+        while pending:
+            results = pending.popleft().result()
+            progress.update(len(results))
+            yield results
+
+
+class AIStats:
+    def __init__(self):
+        self.properties = 0
+        self.errors = 0
+        self.requests = 0.0
+        self.tokens = 0.0
+        self.seconds = 0.0
+
+    def summary(self) -> str:
+        done = max(self.properties, 1)
+        per_minute = self.properties / self.seconds * 60 if self.seconds else 0
+        return (f"🤖 AI: {self.properties:,} properties in {self.requests:,.0f} request(s), "
+                f"{self.errors:,} failed | {self.tokens / done:,.0f} tokens/property | {per_minute:,.0f} properties/min")
+
+
+def add_ai_analysis(result_chunks: Iterator[List[tuple]], batch_size: int, concurrency: int, models,
+                    stats: AIStats) -> Iterator[List[tuple]]:
+    """Replace each row's trailing prompt block with its AI decision and analysis JSON."""
+    for chunk in result_chunks:
+        started = time.monotonic()
+        blocks = [(row[0], row[-1]) for row in chunk]
+        analyses = dict(analyze_prompt_blocks(blocks, batch_size, concurrency, models))
+        stats.seconds += time.monotonic() - started
+        rows = []
+        for row in chunk:
+            result = analyses[row[0]]
+            usage = result.get("usage", {})
+            stats.properties += 1
+            stats.requests += usage.get("requests", 0)
+            stats.tokens += usage.get("total_tokens", 0)
+            if "error" in result:
+                stats.errors += 1
+                rows.append(row[:-1] + (None, json.dumps({"error": result["error"]})))
+            else:
+                analysis = result["investment_analysis"]
+                rows.append(row[:-1] + (analysis["recommendation"]["decision"], json.dumps(analysis)))
+        yield rows
+
+
+def write_file(result_chunks: Iterator[List[tuple]], path: str, with_ai: bool = False):
+    columns = RESULT_COLUMNS + AI_COLUMNS if with_ai else RESULT_COLUMNS
+    if path.endswith(".parquet"):
+        encoded = iter_parquet(result_chunks, columns, RESULT_TYPES + AI_TYPES if with_ai else RESULT_TYPES)
+    else:
+        encoded = iter_csv(result_chunks, columns)
+    with open(path, "wb") as f:
+        for data in encoded:
+            f.write(data)
+
+
+def store_metrics(db, chunk: List[tuple]) -> int:
+    """Store default-assumption metrics in the screener's metric columns (bulk UPDATE by id).
+
+    Scored like the CRUD re-scoring (investment_metrics_for), so properties with stored
+    RentCast estimates keep them instead of getting the DB-only heuristics back.
+    """
+    ids = [row[0] for row in chunk]
+    if not ids:
+        return 0
+    rows = db.execute(
+        select(*[getattr(Property, name) for name in SCALAR_FIELDS]).where(Property.id.in_(ids))
+    ).mappings().all()
+    refreshed = get_refreshed_estimates_for(db, ids)
+    params = [{"id": row["id"], **investment_metrics_for(dict(row), refreshed.get(row["id"]))} for row in rows]
+    if params:
+        db.execute(update(Property), params)
+        db.commit()
+    return len(params)
+
+
+def persist(result_chunks: Iterator[List[tuple]], db) -> Iterator[List[tuple]]:
+    for chunk in result_chunks:
+        store_metrics(db, chunk)
+        yield chunk
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Batch investment analysis over stored properties")
+    source = parser.add_argument_group("source (filters, or an address file)")
+    source.add_argument("--addresses", help="CSV with street,city,state,zip columns")
+    source.add_argument("--city")
+    source.add_argument("--state")
+    source.add_argument("--property-type")
+    source.add_argument("--min-price", type=float)
+    source.add_argument("--max-price", type=float)
+    source.add_argument("--bedrooms", type=int)
+    source.add_argument("--max-carrying-cost", type=float)
+
+    parser.add_argument("--output", help="Results file (.parquet or .csv)")
+    parser.add_argument("--write-db", action="store_true", help="Update the stored investment metrics")
+    parser.add_argument("--overrides", help="ExpenseOverrides as JSON, e.g. '{\"vacancy_allowance_rate\": 0.08}'")
+    parser.add_argument("--no-report", action="store_true", help="Skip the narrative report column")
+    parser.add_argument("--ai", action="store_true", help="Add Gemini analyses (ai_decision, ai_analysis columns)")
+    parser.add_argument("--ai-batch-size", type=int, default=BATCH_SIZE, help="Properties per Gemini request")
+    parser.add_argument("--ai-concurrency", type=int, default=BATCH_CONCURRENCY, help="Gemini requests in flight")
+    parser.add_argument("--ai-stub", action="store_true", help="Use the offline stub model instead of Gemini")
+    parser.add_argument("--ai-stub-latency", type=float, default=1.0, help="Seconds per stub request")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not args.output and not args.write_db:
+        print("❌ Choose an output: --output <file.parquet|file.csv> and/or --write-db")
+        sys.exit(1)
+    if args.output and not args.output.endswith((".parquet", ".csv")):
+        print("❌ --output must end in .parquet or .csv")
+        sys.exit(1)
+
+    overrides = json.loads(args.overrides) if args.overrides else None
+    if overrides and args.write_db:
+        # The stored metrics are the default-assumption scores the screener ranks by
+        print("❌ --write-db stores default-assumption metrics; it cannot be combined with --overrides")
+        sys.exit(1)
+    if args.ai and not args.output:
+        print("❌ --ai needs --output; AI analyses are not stored in the database")
+        sys.exit(1)
+
+    engine.echo = False
+    filters = dict(
+        city=args.city, state=args.state, property_type=args.property_type,
+        min_price=args.min_price, max_price=args.max_price, bedrooms=args.bedrooms,
+        max_carrying_cost=args.max_carrying_cost
+    )
+    if args.addresses:
+        addresses = read_addresses(args.addresses)
+        total = len(addresses)
+        chunks = iter_address_chunks(addresses, args.chunk_size)
+    else:
+        total = count_matching(filters)
+        chunks = iter_filtered_chunks(filters, args.chunk_size)
+
+    print(f"🚀 Analyzing {total:,} properties on {args.workers} worker(s), {args.chunk_size} per chunk")
+    progress = Progress(total)
+    results = run_pool(chunks, args.workers, overrides, not args.no_report and bool(args.output), args.ai, progress)
+    ai_stats = AIStats()
+    if args.ai:
+        models = StubModels(latency=args.ai_stub_latency) if args.ai_stub else None
+        results = add_ai_analysis(results, args.ai_batch_size, args.ai_concurrency, models, ai_stats)
+
+    db = SessionLocal()
+    try:
+        if args.write_db:
+            results = persist(results, db)
+        if args.output:
+            write_file(results, args.output, args.ai)
+        else:
+            for _ in results:
+                pass
+    finally:
+        db.close()
+
+    if args.write_db:
+        invalidation_bus.start(engine, settings.CACHE_INVALIDATION_CHANNEL, listen=False)
+        invalidation_bus.publish("property_bulk_write", {"count": progress.done})
+
+    elapsed = time.monotonic() - progress.started
+    if args.ai:
+        print(ai_stats.summary())
+    print(f"🎉 Analyzed {progress.done:,} properties in {elapsed:,.1f}s"
+          f"{f' → {args.output}' if args.output else ''}{' (metrics stored)' if args.write_db else ''}")
+
+
+if __name__ == "__main__":
+    main()
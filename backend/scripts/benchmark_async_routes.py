@@ -0,0 +1,102 @@
+import sys
+import os
+import time
+import asyncio
+import argparse
+import statistics
+
+# Add the backend directory to sys.path so we can import from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI, Depends
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core import get_db, get_async_db
+from app.core.database import engine, async_engine
+from app.crud.property import get_all_properties, get_property_versions, get_all_properties_async, \
+    get_property_versions_async
+from app.schemas.property import PropertySummary
+
+# Compares the property list path (ETag probe + page fetch) on the sync Session, which
+# FastAPI runs on its threadpool, against the AsyncSession version used by the routes.
+# Requests go through the ASGI stack in-process, against the configured DATABASE_URL.
+#
+#   python scripts/benchmark_async_routes.py --requests 2000 --concurrency 10 50 200
+#   python scripts/benchmark_async_routes.py --slow-ms 50     # emulate a slow query (Postgres)
+
+bench = FastAPI()
+SLOW_MS = 0
+
+
+@bench.get("/sync")
+def list_sync(skip: int = 0, db: Session = Depends(get_db)):
+    if SLOW_MS:
+        db.execute(text("SELECT pg_sleep(:s)"), {"s": SLOW_MS / 1000})
+    get_property_versions(db, skip=skip, limit=25)
+    rows = get_all_properties(db, skip=skip, limit=25)
+    return [PropertySummary.model_validate(p).model_dump(by_alias=True) for p in rows]
+
+
+@bench.get("/async")
+async def list_async(skip: int = 0, db: AsyncSession = Depends(get_async_db)):
+    if SLOW_MS:
+        await db.execute(text("SELECT pg_sleep(:s)"), {"s": SLOW_MS / 1000})
+    await get_property_versions_async(db, skip=skip, limit=25)
+    rows = await get_all_properties_async(db, skip=skip, limit=25)
+    return [PropertySummary.model_validate(p).model_dump(by_alias=True) for p in rows]
+
+
+async def run_level(client: httpx.AsyncClient, path: str, total: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    queue = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in queue:
+            started = time.perf_counter()
+            response = await client.get(path, params={"skip": (i * 25) % 500})
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+async def main():
+    global SLOW_MS
+    parser = argparse.ArgumentParser(description="Sync vs async DB route throughput")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--slow-ms", type=int, default=0, help="Add pg_sleep to every request (Postgres only)")
+    args = parser.parse_args()
+    SLOW_MS = args.slow_ms
+
+    engine.echo = False
+    transport = httpx.ASGITransport(app=bench)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        # Warm both pools so connection setup is not measured
+        await client.get("/sync")
+        await client.get("/async")
+        print(f"🚀 {args.requests} requests per run{f', +{SLOW_MS}ms per query' if SLOW_MS else ''}")
+        print(f"{'concurrency':>11} | {'mode':>5} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | errors")
+        for concurrency in args.concurrency:
+            for mode in ("sync", "async"):
+                r = await run_level(client, f"/{mode}", args.requests, concurrency)
+                print(f"{concurrency:>11} | {mode:>5} | {r['rps']:>8.0f} | {r['p50']:>8.1f} | {r['p95']:>8.1f} | {r['errors']}")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
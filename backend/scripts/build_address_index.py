@@ -0,0 +1,52 @@
+import sys
+import os
+import time
+import argparse
+
+# Add the backend directory to sys.path so we can import from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine
+from app.core.config import settings
+from app.crud.autocomplete import write_address_snapshot
+
+# Builds the address autocomplete snapshot from the properties table and writes it to
+# AUTOCOMPLETE_SNAPSHOT_PATH, replacing the previous file atomically. API workers map the
+# file (sharing its pages) and pick up a new one within AUTOCOMPLETE_RELOAD_SECONDS; writes
+# made through the API in between are served from each worker's overlay. Run it once
+# after deploying, then on a schedule (cron) or as a long-running process with --every.
+#
+# Examples:
+#   python scripts/build_address_index.py
+#   python scripts/build_address_index.py --every 600
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the address autocomplete snapshot")
+    parser.add_argument("--path", default=settings.AUTOCOMPLETE_SNAPSHOT_PATH, help="Snapshot file to write")
+    parser.add_argument("--every", type=float, help="Keep rebuilding, this many seconds apart")
+    return parser.parse_args()
+
+
+def build(path: str):
+    started = time.monotonic()
+    snapshot = write_address_snapshot(path)
+    print(f"📇 Wrote {len(snapshot):,} addresses ({len(snapshot.tokens):,} tokens, "
+          f"{snapshot.dropped:,} dropped) to {path} in {time.monotonic() - started:.1f}s")
+
+
+def main():
+    args = parse_args()
+    engine.echo = False
+    build(args.path)
+    while args.every:
+        time.sleep(args.every)
+        try:
+            build(args.path)
+        except Exception as e:
+            # Workers keep serving the previous file
+            print(f"❌ Address index build failed: {str(e)}")
+
+
+if __name__ == "__main__":
+    main()
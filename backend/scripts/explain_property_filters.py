@@ -0,0 +1,124 @@
+import sys
+import os
+import json
+
+# Add the backend directory to sys.path so we can import from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.core.database import engine
+from app.crud.property import _properties_page_stmt
+
+# Runs EXPLAIN on the browse route's page query for every supported filter combination
+# against a large synthetic copy of the properties table, and fails if any combination
+# does not scan the composite index it was built for.
+#
+# The synthetic rows live in a TEMP table named "properties", which shadows the real
+# table for this connection only (pg_temp is first on the search path), so the real
+# data is never touched.
+
+# The page EXPLAINed. Broad filters match rows all over the table, so for their first
+# few thousand rows walking the id index and stopping after the page is rightly cheaper
+# than any filter index; past that, the filter index has to carry the query.
+PAGE_SKIP = 15000
+PAGE_SIZE = 25
+
+# Any index leading with state_key serves a state-only browse equally well
+STATE_INDEXES = ("ix_properties_state_city_price", "ix_properties_state_type_price", "ix_properties_state_cap_rate",
+                 "ix_properties_state_annual_noi", "ix_properties_state_rent_to_value")
+
+# Each browse filter combination and the index(es) that page may scan. No index leads
+# with bedrooms, so a bedrooms-only browse walks the id index.
+FILTER_COMBOS = [
+    ({"state": "TX"}, STATE_INDEXES),
+    ({"city": "City 17"}, ("ix_properties_city_price",)),
+    ({"state": "TX", "city": "City 17"}, ("ix_properties_state_city_price",)),
+    ({"state": "TX", "city": "City 17", "min_price": 200000, "max_price": 350000},
+     ("ix_properties_state_city_price",)),
+    ({"property_type": "Townhouse", "bedrooms": 3}, ("ix_properties_type_bedrooms_price",)),
+    ({"property_type": "Townhouse", "bedrooms": 3, "max_price": 250000}, ("ix_properties_type_bedrooms_price",)),
+    ({"state": "TX", "property_type": "Condo"}, ("ix_properties_state_type_price",)),
+    ({"state": "TX", "property_type": "Condo", "min_price": 150000, "max_price": 300000},
+     ("ix_properties_state_type_price",)),
+    ({"min_price": 200000, "max_price": 205000}, ("ix_properties_last_sale_price",)),
+    ({"bedrooms": 6}, ("ix_properties_id",)),
+]
+
+STATES = ["TX", "CA", "FL", "NY", "PA", "OH", "GA", "NC", "MI", "NJ", "VA", "WA", "AZ", "MA", "TN",
+          "IN", "MO", "MD", "WI", "CO", "MN", "SC", "AL", "LA", "KY", "OR", "OK", "CT", "UT", "IA",
+          "NV", "AR", "MS", "KS", "NM", "NE", "ID", "WV", "HI", "NH", "ME", "MT", "RI", "DE", "SD",
+          "ND", "AK", "VT", "WY", "DC"]
+TYPES = ["Single Family", "Condo", "Townhouse", "Multi-Family", "Manufactured", "Apartment", "Land"]
+
+
+def seed_synthetic_table(conn, rows: int):
+    print(f"🧪 Seeding {rows:,} synthetic properties into a temp table...")
+    conn.execute(text("CREATE TEMP TABLE properties (LIKE public.properties INCLUDING ALL EXCLUDING INDEXES)"))
+    conn.execute(text("""
+        INSERT INTO properties (id, formatted_address, city, state, property_type, bedrooms,
+                                last_sale_price, city_key, state_key, property_type_key)
+        SELECT g,
+               'Synthetic ' || g,
+               'City ' || (g % 2000),
+               s.state,
+               t.ptype,
+               1 + (g % 6),
+               50000 + (hashtext(g::text) & 1048575),
+               'city ' || (g % 2000),
+               lower(s.state),
+               lower(t.ptype)
+        FROM generate_series(1, :rows) AS g
+        CROSS JOIN LATERAL (SELECT (:states)[1 + (g % :n_states)] AS state) s
+        CROSS JOIN LATERAL (SELECT (:types)[1 + ((g / 7) % :n_types)] AS ptype) t
+    """), {"rows": rows, "states": STATES, "n_states": len(STATES), "types": TYPES, "n_types": len(TYPES)})
+    # Same index names as the real table (LIKE ... INCLUDING INDEXES would rename them),
+    # so plans can be checked against the index each combination should use
+    for (definition,) in conn.execute(text(
+        "SELECT indexdef FROM pg_indexes WHERE schemaname = 'public' AND tablename = 'properties'"
+    )):
+        conn.execute(text(definition.replace(" ON public.properties ", " ON pg_temp.properties ")))
+    conn.execute(text("ANALYZE properties"))
+
+
+def plan_indexes(plan: dict) -> list:
+    """(node type, index name) of every scan in the plan, outermost first."""
+    scans = [(plan["Node Type"], plan.get("Index Name"))] if "Scan" in plan.get("Node Type", "") else []
+    for child in plan.get("Plans", []):
+        scans.extend(plan_indexes(child))
+    return scans
+
+
+def explain_combo(conn, filters: dict) -> list:
+    # The statement the browse route runs: summary columns, ORDER BY id, LIMIT/OFFSET
+    stmt = _properties_page_stmt(PAGE_SKIP, PAGE_SIZE, None, **filters)
+    compiled = stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    result = conn.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+    plan = result if isinstance(result, list) else json.loads(result)
+    return plan_indexes(plan[0]["Plan"])
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    failures = 0
+    with engine.connect() as conn:
+        seed_synthetic_table(conn, rows)
+        for filters, expected in FILTER_COMBOS:
+            scans = explain_combo(conn, filters)
+            uses_index = any(index in expected for _, index in scans)
+            marker = "✅" if uses_index else "❌"
+            plan = " -> ".join(f"{node} ({index})" if index else node for node, index in scans)
+            missed = "" if uses_index else f", expected {' or '.join(expected)}"
+            print(f"{marker} {filters}: {plan}{missed}")
+            if not uses_index:
+                failures += 1
+        conn.rollback()
+
+    if failures:
+        print(f"❌ {failures} filter combination(s) did not use their expected index")
+        sys.exit(1)
+    print("🎉 All filter combinations use their expected index")
+
+
+if __name__ == "__main__":
+    main()
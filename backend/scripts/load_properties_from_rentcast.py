@@ -8,6 +8,10 @@ from sqlalchemy.orm import Session
 from app.core.database import get_db, engine
 from app.models.property import Property
 from app.core.config import settings
+from app.core.cache import invalidation_bus
+from app.crud.market import regions_for
+from app.crud.property import refresh_regions
+from app.crud.duplicates import find_near_duplicates, merge_into
 
 # Add the backend directory to sys.path so we can import from app
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -15,12 +19,13 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 class RentCastPropertyLoader:
     def __init__(self):
         self.api_key = settings.RENTCAST_API_KEY
-        self.BASE_URL = "https://api.rentcast.io/v1"
+        self.BASE_URL = settings.RENTCAST_BASE_URL.rstrip("/")
 
         if not self.api_key:
             raise ValueError("RENTCAST_API_KEY not found in settings")
 
         print(f"🔑 API Key configured: {self.api_key[:8]}...{self.api_key[-4:] if len(self.api_key) > 12 else 'short'}")
+        print(f"🌐 RentCast base URL: {self.BASE_URL}")
 
     def fetch_random_properties(self, count: int = 100) -> list:
         all_properties = []
@@ -138,6 +143,9 @@ class RentCastPropertyLoader:
         print(f"💾 Loading {len(properties)} properties to database...")
 
         loaded_count = 0
+        loaded_properties = []
+        # Near-duplicates of stored rows: their new fields are merged into the stored row
+        self.duplicates = []
 
         db = next(get_db())
 
@@ -156,10 +164,40 @@ class RentCastPropertyLoader:
                 property_obj = self.create_property_from_api_data(prop_data, db)
 
                 if property_obj:
+                    matches = find_near_duplicates(db, property_obj)
+                    if matches:
+                        existing, reason = matches[0]
+                        try:
+                            filled = merge_into(existing, property_obj)
+                            db.commit()
+                        except Exception as e:
+                            print(f"❌ Database error merging into property {existing.id}: {str(e)}")
+                            db.rollback()
+                            continue
+                        self.duplicates.append({
+                            "address": formatted_address, "duplicate_of": existing.id,
+                            "reason": reason, "filled": filled,
+                        })
+                        if filled:
+                            loaded_properties.append({
+                                "id": existing.id,
+                                "zip_code": existing.zip_code,
+                                "state_fips": existing.state_fips,
+                                "county_fips": existing.county_fips,
+                            })
+                        print(f"⚠️ Near-duplicate of property {existing.id} ({reason}), merged {len(filled)} fields: {formatted_address}")
+                        continue
+
                     try:
                         db.add(property_obj)
                         db.commit()
                         loaded_count += 1
+                        loaded_properties.append({
+                            "id": property_obj.id,
+                            "zip_code": prop_data.get("zipCode"),
+                            "state_fips": prop_data.get("stateFips"),
+                            "county_fips": prop_data.get("countyFips"),
+                        })
                         print(f"✅ Loaded property {loaded_count}: {formatted_address}")
 
                     except Exception as e:
@@ -169,6 +207,14 @@ class RentCastPropertyLoader:
                 else:
                     print(f"❌ Failed to create property object")
 
+            if loaded_properties:
+                # Let running API workers reload market stats and drop cached property reads
+                invalidation_bus.start(engine, settings.CACHE_INVALIDATION_CHANNEL, listen=False)
+                refreshed, rescored = refresh_regions(db, *regions_for(loaded_properties))
+                print(f"📈 Refreshed market stats for {refreshed} ZIP/county regions")
+                print(f"📊 Updated investment metrics for {rescored} properties in those regions")
+                invalidation_bus.publish("property_bulk_write", {"count": loaded_count})
+
         except Exception as e:
             print(f"❌ Critical error during loading: {str(e)}")
             db.rollback()
@@ -176,6 +222,10 @@ class RentCastPropertyLoader:
             db.close()
 
         print(f"🎉 Successfully loaded {loaded_count} properties!")
+        if self.duplicates:
+            print(f"🔁 Merged {len(self.duplicates)} near-duplicates into existing properties:")
+            for dup in self.duplicates:
+                print(f"   {dup['address']} -> property {dup['duplicate_of']} ({dup['reason']})")
         return loaded_count
 
     def run(self, mode: str = "random", count: int = 100):
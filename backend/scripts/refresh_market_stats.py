@@ -0,0 +1,69 @@
+import sys
+import os
+import time
+import argparse
+
+# Add the backend directory to sys.path so we can import from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import distinct, select
+
+from app.core.database import engine, SessionLocal
+from app.core.config import settings
+from app.core.cache import invalidation_bus
+from app.crud.market import county_key_for
+from app.crud.property import refresh_regions
+from app.models.property import Property
+
+# Recomputes the market stats of every ZIP code and county and re-scores the stored
+# investment metrics of their properties, a batch of regions at a time. Property writes
+# refresh only the regions they touch, so run this once after a migration that adds a
+# derived stat (e.g. annual_appreciation_pct) or changes how metrics are computed.
+#
+# Examples:
+#   python scripts/refresh_market_stats.py
+#   python scripts/refresh_market_stats.py --batch-size 50
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Refresh the market stats and stored metrics of every region")
+    parser.add_argument("--batch-size", type=int, default=200, help="Regions refreshed per transaction")
+    return parser.parse_args()
+
+
+def all_regions(db) -> tuple:
+    zip_codes = sorted(z for z in db.scalars(select(distinct(Property.zip_code))) if z)
+    county_keys = sorted(filter(None, (
+        county_key_for(state_fips, county_fips)
+        for state_fips, county_fips in db.execute(select(Property.state_fips, Property.county_fips).distinct())
+    )))
+    return zip_codes, county_keys
+
+
+def main():
+    args = parse_args()
+    engine.echo = False
+    started = time.monotonic()
+    invalidation_bus.start(engine, settings.CACHE_INVALIDATION_CHANNEL, listen=False)
+
+    db = SessionLocal()
+    refreshed = rescored = 0
+    try:
+        zip_codes, county_keys = all_regions(db)
+        print(f"🚀 Refreshing {len(zip_codes):,} ZIP codes and {len(county_keys):,} counties")
+        regions = [(z, None) for z in zip_codes] + [(None, k) for k in county_keys]
+        for start in range(0, len(regions), args.batch_size):
+            batch = regions[start:start + args.batch_size]
+            done, changed = refresh_regions(db, [z for z, _ in batch if z], [k for _, k in batch if k])
+            refreshed += done
+            rescored += changed
+            print(f"📈 {start + len(batch):,}/{len(regions):,} regions, {rescored:,} properties re-scored")
+    finally:
+        db.close()
+
+    print(f"🎉 Refreshed {refreshed:,} regions and re-scored {rescored:,} properties "
+          f"in {time.monotonic() - started:,.1f}s")
+
+
+if __name__ == "__main__":
+    main()
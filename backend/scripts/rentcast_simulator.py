@@ -0,0 +1,349 @@
+import math
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Local stand-in for the RentCast API (/properties/random, /avm/value, /avm/rent/long-term)
+# so the loader, the analyzer and the refresh scheduler can be load- and failure-tested
+# without spending the real monthly quota. Payloads follow RentCast's response shapes;
+# AVM answers are deterministic per address. Latency is log-normal (median / p99), and a
+# share of requests fail with 429, 5xx or a hang past the client's read timeout.
+#
+#   python scripts/rentcast_simulator.py --port 8090 --latency-median-ms 150 --latency-p99-ms 1200 \
+#       --error-rate 0.02 --rate-limit-rate 0.01 --api-key sim-key
+#
+# then run the backend or the loader with:
+#   RENTCAST_BASE_URL=http://localhost:8090/v1 RENTCAST_API_KEY=sim-key \
+#   RENTCAST_MONTHLY_CALL_LIMIT=100000 RENTCAST_RATE_LIMIT_FILE=rentcast_sim_rate_limit.json
+#
+# GET /v1/_simulator/stats returns request counts by path and status.
+
+# city, state, state FIPS, county, county FIPS, ZIP codes, latitude, longitude, $/sqft, monthly rent $/sqft
+MARKETS = [
+    ("Austin", "TX", "48", "Travis", "453", ("78701", "78702", "78704", "78745", "78758"), 30.2672, -97.7431, 330, 1.55),
+    ("Dallas", "TX", "48", "Dallas", "113", ("75201", "75204", "75214", "75228"), 32.7767, -96.7970, 240, 1.35),
+    ("Phoenix", "AZ", "04", "Maricopa", "013", ("85003", "85008", "85016", "85032"), 33.4484, -112.0740, 275, 1.30),
+    ("Atlanta", "GA", "13", "Fulton", "121", ("30303", "30308", "30312", "30318"), 33.7490, -84.3880, 250, 1.45),
+    ("Charlotte", "NC", "37", "Mecklenburg", "119", ("28202", "28205", "28209", "28215"), 35.2271, -80.8431, 260, 1.35),
+    ("Columbus", "OH", "39", "Franklin", "049", ("43201", "43206", "43215", "43224"), 39.9612, -82.9988, 190, 1.20),
+    ("Tampa", "FL", "12", "Hillsborough", "057", ("33602", "33606", "33611", "33617"), 27.9506, -82.4572, 290, 1.60),
+    ("Denver", "CO", "08", "Denver", "031", ("80202", "80205", "80210", "80219"), 39.7392, -104.9903, 380, 1.70),
+    ("Philadelphia", "PA", "42", "Philadelphia", "101", ("19103", "19125", "19143", "19147"), 39.9526, -75.1652, 210, 1.50),
+    ("Kansas City", "MO", "29", "Jackson", "095", ("64106", "64109", "64111", "64130"), 39.0997, -94.5786, 170, 1.15),
+]
+NATIONAL_PRICE_PER_SQFT = 230
+NATIONAL_RENT_PER_SQFT = 1.35
+
+STREET_NAMES = ["Main", "Oak", "Pine", "Maple", "Cedar", "Elm", "Park", "Lake", "Hill", "Washington",
+                "Lincoln", "Jefferson", "Sunset", "Ridge", "Meadow", "River", "Highland", "Forest", "Church", "Mill"]
+STREET_SUFFIXES = ["St", "Ave", "Dr", "Ln", "Rd", "Ct", "Blvd", "Way", "Pl", "Cir"]
+# property type, share of properties, bedroom range, sqft range
+PROPERTY_TYPES = [
+    ("Single Family", 0.62, (2, 5), (1100, 3600)),
+    ("Condo", 0.14, (1, 3), (550, 1600)),
+    ("Townhouse", 0.10, (2, 4), (1000, 2200)),
+    ("Multi-Family", 0.08, (4, 8), (1800, 4200)),
+    ("Manufactured", 0.06, (2, 3), (800, 1600)),
+]
+FIRST_NAMES = ["James", "Maria", "Robert", "Linda", "Michael", "Patricia", "David", "Jennifer", "Daniel", "Susan"]
+LAST_NAMES = ["Smith", "Johnson", "Garcia", "Brown", "Miller", "Davis", "Martinez", "Wilson", "Anderson", "Lee"]
+# Values and rents appreciate about this much per year, used to back-date sale prices
+ANNUAL_APPRECIATION = 0.045
+
+
+class SimulatorConfig:
+    def __init__(self, api_key: str = "", latency_median_ms: float = 120.0, latency_p99_ms: float = 900.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, hang_rate: float = 0.0,
+                 hang_seconds: float = 30.0, quota: int = 0, seed: Optional[int] = None):
+        self.api_key = api_key
+        self.latency_median_ms = latency_median_ms
+        self.latency_p99_ms = max(latency_p99_ms, latency_median_ms)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.quota = quota
+        self.rng = random.Random(seed)
+
+
+def _stable_rng(*parts: Any) -> random.Random:
+    """RNG seeded by the request's identifying inputs, so repeated AVM calls agree."""
+    digest = hashlib.sha256("|".join(str(p) for p in parts).lower().encode("utf-8")).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+
+def _market_for(city: Optional[str] = None, state: Optional[str] = None, zip_code: Optional[str] = None):
+    for market in MARKETS:
+        if zip_code and zip_code[:5] in market[5]:
+            return market
+    for market in MARKETS:
+        if city and state and market[0].lower() == city.lower() and market[1].lower() == state.lower():
+            return market
+    return None
+
+
+def _iso(day: date) -> str:
+    return f"{day.isoformat()}T00:00:00.000Z"
+
+
+def generate_property(rng: random.Random, market=None, today: Optional[date] = None) -> Dict[str, Any]:
+    """One property record shaped like a RentCast /properties response item."""
+    today = today or date.today()
+    market = market or rng.choice(MARKETS)
+    city, state, state_fips, county, county_fips, zips, lat, lon, price_per_sqft, _ = market
+    property_type, _, bedrooms_range, sqft_range = rng.choices(PROPERTY_TYPES, weights=[t[1] for t in PROPERTY_TYPES])[0]
+
+    number = rng.randint(100, 9999)
+    line1 = f"{number} {rng.choice(STREET_NAMES)} {rng.choice(STREET_SUFFIXES)}"
+    line2 = f"Unit {rng.randint(1, 40)}" if property_type == "Condo" and rng.random() < 0.8 else None
+    zip_code = rng.choice(zips)
+    street = f"{line1}, {line2}" if line2 else line1
+    formatted = f"{street}, {city}, {state} {zip_code}"
+
+    bedrooms = rng.randint(*bedrooms_range)
+    sqft = int(round(rng.uniform(*sqft_range) / 10) * 10)
+    year_built = rng.randint(1940, today.year - 1)
+    value = sqft * price_per_sqft * rng.uniform(0.75, 1.3)
+
+    # Sale history: one to four sales, the latest being lastSale*, priced off today's value
+    history = {}
+    sale_day = today - timedelta(days=rng.randint(60, 365 * 25))
+    for _ in range(rng.randint(1, 4)):
+        if sale_day.year < year_built:
+            break
+        years_ago = (today - sale_day).days / 365.25
+        price = round(value / (1 + ANNUAL_APPRECIATION) ** years_ago * rng.uniform(0.92, 1.08), -3)
+        history[sale_day.isoformat()] = {"event": "Sale", "date": _iso(sale_day), "price": price}
+        sale_day -= timedelta(days=rng.randint(365 * 2, 365 * 12))
+    last_sale = max(history) if history else None
+
+    tax_assessments, property_taxes = {}, {}
+    for year in range(today.year - 3, today.year):
+        assessed = round(value * rng.uniform(0.7, 0.95) / (1 + ANNUAL_APPRECIATION) ** (today.year - year), -2)
+        land = round(assessed * rng.uniform(0.2, 0.4), -2)
+        tax_assessments[str(year)] = {"year": year, "value": assessed, "land": land, "improvements": assessed - land}
+        property_taxes[str(year)] = {"year": year, "total": round(assessed * rng.uniform(0.011, 0.024))}
+
+    record = {
+        "id": formatted.replace(" ", "-"),
+        "formattedAddress": formatted,
+        "addressLine1": line1,
+        "addressLine2": line2,
+        "city": city,
+        "state": state,
+        "stateFips": state_fips,
+        "zipCode": zip_code,
+        "county": county,
+        "countyFips": county_fips,
+        "latitude": round(lat + rng.uniform(-0.12, 0.12), 6),
+        "longitude": round(lon + rng.uniform(-0.12, 0.12), 6),
+        "propertyType": property_type,
+        "bedrooms": bedrooms,
+        "bathrooms": max(1.0, bedrooms - rng.choice([0, 0.5, 1, 1.5])),
+        "squareFootage": sqft,
+        "lotSize": None if property_type == "Condo" else rng.randint(2500, 20000),
+        "yearBuilt": year_built,
+        "assessorID": f"{county_fips}-{rng.randint(10 ** 7, 10 ** 8 - 1)}",
+        "legalDescription": f"LOT {rng.randint(1, 60)} BLK {rng.choice('ABCDEFGH')} {rng.choice(STREET_NAMES).upper()} ADDN",
+        "subdivision": f"{rng.choice(STREET_NAMES).upper()} {rng.choice(['ESTATES', 'PARK', 'HEIGHTS', 'ADDN'])}",
+        "zoning": rng.choice(["SF-2", "SF-3", "MF-2", "R-1", "R-2", "PUD"]),
+        "lastSaleDate": history[last_sale]["date"] if last_sale else None,
+        "lastSalePrice": history[last_sale]["price"] if last_sale else None,
+        "ownerOccupied": rng.random() < 0.6,
+        "features": {
+            "architectureType": rng.choice(["Contemporary", "Ranch", "Colonial", "Craftsman", "Traditional"]),
+            "cooling": True,
+            "coolingType": "Central",
+            "garage": property_type != "Condo",
+            "garageSpaces": 0 if property_type == "Condo" else rng.randint(1, 3),
+            "heating": True,
+            "heatingType": rng.choice(["Forced Air", "Heat Pump", "Baseboard"]),
+            "pool": rng.random() < 0.15,
+            "floorCount": rng.randint(1, 3),
+            "unitCount": rng.randint(2, 4) if property_type == "Multi-Family" else 1,
+        },
+        "taxAssessments": tax_assessments,
+        "propertyTaxes": property_taxes,
+        "history": history,
+        "owner": {
+            "names": [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"],
+            "type": "Individual" if rng.random() < 0.85 else "Organization",
+            "mailingAddress": {"formattedAddress": formatted, "addressLine1": line1, "city": city,
+                               "state": state, "zipCode": zip_code},
+        },
+    }
+    if property_type in ("Condo", "Townhouse") or rng.random() < 0.2:
+        record["hoa"] = {"fee": rng.choice([75, 120, 180, 250, 350, 450])}
+    return {k: v for k, v in record.items() if v is not None}
+
+
+def _comparables(rng: random.Random, market, latitude: float, longitude: float, per_sqft: float,
+                 kind: str, count: int) -> List[Dict[str, Any]]:
+    comps = []
+    for _ in range(count):
+        comp = generate_property(rng, market)
+        comp["latitude"] = round(latitude + rng.uniform(-0.02, 0.02), 6)
+        comp["longitude"] = round(longitude + rng.uniform(-0.02, 0.02), 6)
+        sqft = comp.get("squareFootage") or 1500
+        key = "price" if kind == "value" else "rent"
+        amount = sqft * per_sqft * rng.uniform(0.85, 1.15)
+        comps.append({
+            **{k: comp[k] for k in ("id", "formattedAddress", "city", "state", "zipCode", "latitude", "longitude",
+                                    "propertyType", "bedrooms", "bathrooms", "squareFootage", "yearBuilt")},
+            key: round(amount, -3) if kind == "value" else round(amount, -1),
+            "listingType": "Standard",
+            "daysOnMarket": rng.randint(3, 120),
+            "distance": round(rng.uniform(0.05, 1.5), 4),
+            "correlation": round(rng.uniform(0.9, 0.99), 4),
+        })
+    return sorted(comps, key=lambda c: -c["correlation"])
+
+
+def avm_estimate(params: Dict[str, Any], kind: str) -> Dict[str, Any]:
+    """/avm/value (kind="value") or /avm/rent/long-term (kind="rent") response for the query params."""
+    address = params.get("address") or f"{params.get('latitude')},{params.get('longitude')}"
+    rng = _stable_rng(kind, address)
+    market = _market_for(params.get("city"), params.get("state"), params.get("zipCode"))
+    price_per_sqft, rent_per_sqft = (market[8], market[9]) if market else (NATIONAL_PRICE_PER_SQFT, NATIONAL_RENT_PER_SQFT)
+    latitude = float(params.get("latitude") or (market[6] if market else 39.5))
+    longitude = float(params.get("longitude") or (market[7] if market else -98.35))
+
+    sqft = float(params.get("squareFootage") or rng.randint(900, 2600))
+    bedrooms = float(params.get("bedrooms") or 3)
+    if kind == "value":
+        per_sqft = price_per_sqft * rng.uniform(0.85, 1.2)
+        estimate = round(sqft * per_sqft + bedrooms * 4000, -3)
+        spread = rng.uniform(0.06, 0.15)
+        result = {"price": estimate, "priceRangeLow": round(estimate * (1 - spread), -3),
+                  "priceRangeHigh": round(estimate * (1 + spread), -3)}
+    else:
+        per_sqft = rent_per_sqft * rng.uniform(0.85, 1.2)
+        estimate = round(sqft * per_sqft + bedrooms * 60, -1)
+        spread = rng.uniform(0.05, 0.12)
+        result = {"rent": estimate, "rentRangeLow": round(estimate * (1 - spread), -1),
+                  "rentRangeHigh": round(estimate * (1 + spread), -1)}
+    result.update({
+        "latitude": latitude,
+        "longitude": longitude,
+        "comparables": _comparables(rng, market, latitude, longitude, per_sqft, kind, rng.randint(5, 15)),
+    })
+    return result
+
+
+def _error(status: int, error: str, message: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    return JSONResponse(status_code=status, content={"status": status, "error": error, "message": message},
+                        headers=headers)
+
+
+def create_app(config: SimulatorConfig) -> FastAPI:
+    app = FastAPI(title="RentCast simulator")
+    counts: Counter = Counter()
+    lock = threading.Lock()
+    started = time.monotonic()
+    served = {"calls": 0}
+    # log-normal latency: median e^mu, p99 = median * e^(2.326 sigma)
+    mu = math.log(max(config.latency_median_ms, 0.001))
+    sigma = math.log(config.latency_p99_ms / max(config.latency_median_ms, 0.001)) / 2.326
+
+    @app.middleware("http")
+    async def simulate_conditions(request: Request, call_next):
+        path = request.url.path
+        if path.endswith("/_simulator/stats"):
+            return await call_next(request)
+        if config.latency_median_ms > 0:
+            await asyncio.sleep(config.rng.lognormvariate(mu, sigma) / 1000.0)
+
+        roll = config.rng.random()
+        if config.api_key and request.headers.get("X-Api-Key") != config.api_key:
+            response = _error(401, "auth/api-key-invalid", "Invalid or missing API key")
+        elif config.quota and served["calls"] >= config.quota:
+            response = _error(429, "billing/limit-exceeded", "Monthly request quota exceeded")
+        elif roll < config.rate_limit_rate:
+            response = _error(429, "rate-limit/exceeded", "Too many requests", {"Retry-After": "1"})
+        elif roll < config.rate_limit_rate + config.error_rate:
+            status = config.rng.choice([500, 502, 503])
+            response = _error(status, "server/unavailable", "Simulated upstream failure")
+        elif roll < config.rate_limit_rate + config.error_rate + config.hang_rate:
+            await asyncio.sleep(config.hang_seconds)
+            response = _error(504, "server/timeout", "Simulated hang")
+        else:
+            response = await call_next(request)
+            if response.status_code == 200:
+                served["calls"] += 1
+        with lock:
+            counts[(path, response.status_code)] += 1
+        return response
+
+    @app.get("/v1/properties/random")
+    def random_properties(limit: int = 100):
+        if limit < 1 or limit > 500:
+            return _error(400, "request/invalid-parameters", "limit must be between 1 and 500")
+        return [generate_property(config.rng) for _ in range(limit)]
+
+    @app.get("/v1/avm/value")
+    def value_estimate(request: Request):
+        params = dict(request.query_params)
+        if not params.get("address") and not (params.get("latitude") and params.get("longitude")):
+            return _error(400, "request/invalid-parameters", "address or latitude/longitude is required")
+        return avm_estimate(params, "value")
+
+    @app.get("/v1/avm/rent/long-term")
+    def rent_estimate(request: Request):
+        params = dict(request.query_params)
+        if not params.get("address") and not (params.get("latitude") and params.get("longitude")):
+            return _error(400, "request/invalid-parameters", "address or latitude/longitude is required")
+        return avm_estimate(params, "rent")
+
+    @app.get("/v1/_simulator/stats")
+    def simulator_stats():
+        with lock:
+            by_path: Dict[str, Dict[str, int]] = {}
+            for (path, status), count in sorted(counts.items()):
+                by_path.setdefault(path, {})[str(status)] = count
+            total = sum(counts.values())
+        elapsed = time.monotonic() - started
+        return {"requests": total, "successful_calls": served["calls"], "uptime_seconds": round(elapsed, 1),
+                "requests_per_second": round(total / elapsed, 2) if elapsed else None, "by_path": by_path}
+
+    return app
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Local RentCast API simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--api-key", default="", help="Required X-Api-Key value (401 otherwise); empty accepts any")
+    parser.add_argument("--latency-median-ms", type=float, default=120.0)
+    parser.add_argument("--latency-p99-ms", type=float, default=900.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing with 500/502/503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered 429")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Share of requests that hang for --hang-seconds")
+    parser.add_argument("--hang-seconds", type=float, default=30.0)
+    parser.add_argument("--quota", type=int, default=0, help="Successful calls before every request is 429; 0 = unlimited")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for generated properties and injected faults")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    config = SimulatorConfig(
+        api_key=args.api_key, latency_median_ms=args.latency_median_ms, latency_p99_ms=args.latency_p99_ms,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds, quota=args.quota, seed=args.seed,
+    )
+    print(f"🧪 RentCast simulator on http://{args.host}:{args.port}/v1")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
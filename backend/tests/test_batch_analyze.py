@@ -0,0 +1,79 @@
+"""--write-db scoring in scripts/batch_analyze_properties.py.
+
+Needs a scratch Postgres database in TEST_DATABASE_URL (see tests/test_single_flight.py).
+"""
+import os
+import sys
+import uuid
+from datetime import date, datetime
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL.startswith("postgres"), reason="TEST_DATABASE_URL must point at a Postgres database"
+)
+# app.core builds its engines (and the Gemini client) at import time
+os.environ.setdefault("DATABASE_URL", TEST_DATABASE_URL or "postgresql://localhost/unused")
+os.environ.setdefault("GOOGLE_GENAI_KEY", "test")
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.core.database import Base  # noqa: E402
+from app.models.property import Property  # noqa: E402
+from app.models.refresh import PropertyRefresh  # noqa: E402
+from batch_analyze_properties import analyze_chunk, store_metrics  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def db():
+    engine = create_engine(TEST_DATABASE_URL)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def _property(db, **values) -> Property:
+    property_obj = Property(
+        formatted_address=f"{uuid.uuid4()} Main St, Austin, TX 78701", city="Austin", state="TX",
+        zip_code="78701", property_type="Single Family", bedrooms=3, bathrooms=2.0, square_footage=1500,
+        last_sale_date=date(2012, 5, 1), last_sale_price=250000.0, **values,
+    )
+    db.add(property_obj)
+    db.commit()
+    return property_obj
+
+
+def _result_chunk(property_obj: Property):
+    data = {column.key: getattr(property_obj, column.key) for column in Property.__table__.columns}
+    return analyze_chunk([data], overrides=None, with_report=False)
+
+
+def test_write_db_keeps_refreshed_estimates(db):
+    property_obj = _property(db)
+    db.add(PropertyRefresh(property_id=property_obj.id, value=410000.0, rent=2900.0, recent_views=0.0,
+                           refreshed_at=datetime.utcnow()))
+    db.commit()
+
+    assert store_metrics(db, _result_chunk(property_obj)) == 1
+    db.refresh(property_obj)
+
+    assert property_obj.estimated_value == 410000.0
+    assert property_obj.estimated_monthly_rent == 2900.0
+    assert property_obj.rent_to_value == round(2900.0 / 410000.0 * 100.0, 3)
+
+
+def test_write_db_scores_unrefreshed_properties_from_the_db(db):
+    property_obj = _property(db)
+    chunk = _result_chunk(property_obj)
+
+    assert store_metrics(db, chunk) == 1
+    db.refresh(property_obj)
+
+    value, rent = chunk[0][4], chunk[0][5]
+    assert property_obj.estimated_value == value
+    assert property_obj.estimated_monthly_rent == rent
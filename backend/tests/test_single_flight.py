@@ -0,0 +1,131 @@
+"""Cross-worker coalescing in app/core/single_flight.py.
+
+Each SingleFlight instance stands in for one web worker (its in-process state is separate),
+so two instances sharing a Postgres database exercise the advisory-lock path. Needs a
+scratch Postgres database in TEST_DATABASE_URL, e.g.
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost:5432/aegis_test python -m pytest tests
+"""
+import os
+import threading
+import time
+import uuid
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL.startswith("postgres"), reason="TEST_DATABASE_URL must point at a Postgres database"
+)
+# app.core builds its engines at import time
+os.environ.setdefault("DATABASE_URL", TEST_DATABASE_URL or "postgresql://localhost/unused")
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from app.core.single_flight import SingleFlight  # noqa: E402
+from app.models.analysis import AnalysisResult  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine(TEST_DATABASE_URL)
+    AnalysisResult.__table__.create(engine, checkfirst=True)
+    yield engine
+    engine.dispose()
+
+
+def _wait_for_lock_waiter(engine, timeout: float = 5.0) -> bool:
+    deadline = time.time() + timeout
+    with engine.connect() as conn:
+        while time.time() < deadline:
+            waiting = conn.execute(
+                text("SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND NOT granted")
+            ).scalar()
+            conn.commit()
+            if waiting:
+                return True
+            time.sleep(0.05)
+    return False
+
+
+def _idle_in_transaction(engine) -> int:
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT count(*) FROM pg_stat_activity "
+                 "WHERE datname = current_database() AND state LIKE 'idle in transaction%'")
+        ).scalar()
+
+
+def _run_leader(worker, key, fn, engine):
+    outcome = {}
+
+    def run():
+        try:
+            outcome["value"] = worker.do_shared(key, fn, engine)
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, outcome
+
+
+def test_waiting_worker_reuses_the_leaders_result(engine):
+    leader, follower = SingleFlight("leader"), SingleFlight("follower")
+    key = f"test:{uuid.uuid4()}"
+    observed = {}
+
+    def compute():
+        observed["follower_waiting"] = _wait_for_lock_waiter(engine)
+        observed["idle_in_transaction"] = _idle_in_transaction(engine)
+        # Leader and waiter hold lock connections of their own, not the app pool's
+        observed["app_pool_checked_out"] = engine.pool.checkedout()
+        return {"cap_rate": 8.5}
+
+    thread, outcome = _run_leader(leader, key, compute, engine)
+    time.sleep(0.2)
+    result = follower.do_shared(key, lambda: pytest.fail("the follower must not recompute"), engine)
+    thread.join(10)
+
+    assert observed == {"follower_waiting": True, "idle_in_transaction": 0, "app_pool_checked_out": 0}
+    assert outcome["value"] == ({"cap_rate": 8.5}, False)
+    assert result == ({"cap_rate": 8.5}, True)
+    assert leader.stats()["executions"] == 1
+    assert follower.stats()["coalesced_across_workers"] == 1
+
+
+def test_waiter_computes_after_the_leader_fails(engine):
+    leader, follower = SingleFlight("leader"), SingleFlight("follower")
+    key = f"test:{uuid.uuid4()}"
+
+    def fail():
+        _wait_for_lock_waiter(engine)
+        raise RuntimeError("RentCast unavailable")
+
+    thread, outcome = _run_leader(leader, key, fail, engine)
+    time.sleep(0.2)
+    result = follower.do_shared(key, lambda: {"cap_rate": 6.0}, engine)
+    thread.join(10)
+
+    assert isinstance(outcome["error"], RuntimeError)
+    assert result == ({"cap_rate": 6.0}, False)
+
+
+def test_waiters_over_the_cap_compute_for_themselves(engine):
+    leader, follower = SingleFlight("leader"), SingleFlight("follower", max_waiters=0)
+    key = f"test:{uuid.uuid4()}"
+    release = threading.Event()
+
+    def compute():
+        release.wait(10)
+        return {"cap_rate": 8.5}
+
+    thread, outcome = _run_leader(leader, key, compute, engine)
+    time.sleep(0.2)
+    result = follower.do_shared(key, lambda: {"cap_rate": 7.0}, engine)
+    release.set()
+    thread.join(10)
+
+    assert result == ({"cap_rate": 7.0}, False)
+    assert outcome["value"] == ({"cap_rate": 8.5}, False)
+    assert follower.stats()["waiters_over_cap"] == 1
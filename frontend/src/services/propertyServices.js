@@ -8,7 +8,8 @@ export async function getProperties({
   propertyType,
   minPrice,
   maxPrice,
-  bedrooms
+  bedrooms,
+  maxCarryingCost
 } = {}) {
   const params = new URLSearchParams();
 
@@ -21,6 +22,7 @@ export async function getProperties({
   if (minPrice) params.append('min_price', minPrice.toString());
   if (maxPrice) params.append('max_price', maxPrice.toString());
   if (bedrooms) params.append('bedrooms', bedrooms.toString());
+  if (maxCarryingCost) params.append('max_carrying_cost', maxCarryingCost.toString());
 
   const response = await apiClient.get(`/api/properties?${params.toString()}`);
   return response.data;